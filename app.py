@@ -2,14 +2,21 @@
 PDF Editor - Flask Web Application
 A web application for loading, viewing, manipulating, and merging PDF files.
 """
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session, jsonify, send_file
 from pathlib import Path
 from werkzeug.utils import secure_filename
+import hashlib
+import json
 import os
+from collections import OrderedDict
 import uuid
 import threading
 import time
-from typing import Dict, Any, Optional
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 
 # Import Flask-Session with error handling
 try:
@@ -20,8 +27,14 @@ except ImportError:
     print("WARNING: Flask-Session not installed. Install with: pip install Flask-Session")
     print("Session data will be stored in-memory (not recommended for production)")
 
-from pdf_manager import PDFManager
+from pdf_manager import PDFManager, SAVE_PROFILES, DEFAULT_SAVE_PROFILE, PIKEPDF_AVAILABLE
 from pdf_viewer import PDFViewer
+from task_store import TaskStore, DEFAULT_DB_PATH, FINISHED_STATUSES
+from jobs import MAINTENANCE_INTERVAL, StoreCancelToken, maintain_store, run_job, mark_task_cancelled
+from upload_store import UploadStore, DEFAULT_BLOB_DIR
+from upload_stream import BufferedUploadForm, StreamedUploadForm, iter_uploads
+from chunked_upload import ChunkedUploads, DEFAULT_PARTIAL_DIR
+from janitor import start_shared_janitor, touch
 
 app = Flask(__name__)
 
@@ -42,14 +55,222 @@ else:
     app.config['SESSION_PERMANENT'] = False
     app.config['PERMANENT_SESSION_LIFETIME'] = 7200
 
-# Global task storage (in production, use Redis or database)
-background_tasks: Dict[str, Dict[str, Any]] = {}
+# Tasks, their progress events and the job queue live in SQLite (WAL mode), so
+# any web worker can answer status requests and tasks survive restarts
+task_store = TaskStore(DEFAULT_DB_PATH)
+
+# Jobs run on this process's bounded pool unless EXTERNAL_WORKERS=1, in which
+# case separate `python worker.py` processes claim them from the store
+EXTERNAL_WORKERS = os.environ.get('EXTERNAL_WORKERS') == '1'
+TASK_WORKERS = int(os.environ.get('TASK_WORKERS', 4))
+task_executor = ThreadPoolExecutor(max_workers=TASK_WORKERS, thread_name_prefix='pdf-task')
+IN_PROCESS_WORKER_ID = f"web:{os.getpid()}"
+
+# Jobs handed to task_executor and not finished yet
+jobs_in_flight = 0
+jobs_in_flight_lock = threading.Lock()
+
+# Seconds between passes of the job dispatcher
+JOB_DISPATCH_INTERVAL = 1.0
+
+# A job still queued this long while the pool has room was never handed to a
+# pool (it was queued before a restart, or by a process that exited)
+ORPHANED_JOB_SECONDS = 5
+
+# Uploads are stored once per distinct content and hardlinked into session folders
+upload_store = UploadStore(DEFAULT_BLOB_DIR)
+
+# SSE streams poll the store for new events at this interval
+SSE_POLL_SECONDS = 0.25
+SSE_KEEPALIVE_SECONDS = 15
+
+# A streamed batch ZIP is aborted once no new result has arrived for this long
+# (a task whose worker died is normally failed sooner, when its lease runs out)
+ZIP_IDLE_SECONDS = int(os.environ.get('ZIP_IDLE_SECONDS', 600))
+
+# SHA-256 of generated files keyed by (path, size, mtime_ns), used as strong ETags
+FILE_HASH_CACHE_SIZE = 4096
+file_hashes: "OrderedDict[tuple, str]" = OrderedDict()
+file_hashes_lock = threading.Lock()
 
 # Ensure required directories exist
 os.makedirs('./flask_session', exist_ok=True)
 os.makedirs('./static/temp', exist_ok=True)
 os.makedirs('./uploads', exist_ok=True)
 
+# Worker processes of pdf_manager's pool are spawned and import this module as
+# __mp_main__ when it runs as a script; they must not start background threads
+IS_WORKER_PROCESS = __name__ == '__mp_main__'
+
+# Evicts old and over-quota files in the background; requests only hand it folders to delete
+janitor = None if IS_WORKER_PROCESS else start_shared_janitor(
+    ['./uploads', './static/temp'], app.config.get('SESSION_FILE_DIR'),
+    upload_store, DEFAULT_PARTIAL_DIR, in_use=task_store.active_job_files
+)
+
+# Files too large for one request arrive in checksummed chunks first (see /api/uploads)
+chunked_uploads = ChunkedUploads(upload_store, DEFAULT_PARTIAL_DIR,
+                                 remove_folder=janitor.discard if janitor is not None else None)
+
+
+@app.context_processor
+def inject_pdf_features():
+    """Let templates offer only the output options this server can produce"""
+    return {'linearize_available': PIKEPDF_AVAILABLE}
+
+
+def compute_file_hash(path) -> str:
+    """Get the SHA-256 hex digest of a file, cached until the file changes"""
+    stat = os.stat(path)
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with file_hashes_lock:
+        if key in file_hashes:
+            file_hashes.move_to_end(key)
+            return file_hashes[key]
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    
+    with file_hashes_lock:
+        file_hashes[key] = digest.hexdigest()
+        while len(file_hashes) > FILE_HASH_CACHE_SIZE:
+            file_hashes.popitem(last=False)
+    return digest.hexdigest()
+
+
+def submit_task(task_id: str, kind: str, payload: Dict[str, Any], **record):
+    """Create a task and queue its job (see jobs.JOB_HANDLERS for kinds)"""
+    task_store.enqueue_task(task_id, kind, payload, **record)
+    if not EXTERNAL_WORKERS:
+        dispatch_job(task_id)
+
+
+def dispatch_job(task_id: Optional[str] = None):
+    """Hand a queued job (the given one, or the oldest) to the in-process pool"""
+    global jobs_in_flight
+    with jobs_in_flight_lock:
+        jobs_in_flight += 1
+    task_executor.submit(run_queued_job, task_id)
+
+
+def run_queued_job(task_id: Optional[str] = None):
+    """Run one queued job on the in-process pool, unless it was cancelled first"""
+    global jobs_in_flight
+    try:
+        job = task_store.claim_job(IN_PROCESS_WORKER_ID, task_id=task_id)
+        if job is not None:
+            run_job(task_store, *job)
+    finally:
+        with jobs_in_flight_lock:
+            jobs_in_flight -= 1
+
+
+def dispatch_loop():
+    """
+    Pick up queued jobs no request handed to the pool (e.g. queued before a
+    restart) and periodically fail expired jobs and delete old tasks.
+    """
+    last_maintenance = None
+    while True:
+        try:
+            if last_maintenance is None or time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+                last_maintenance = time.monotonic()
+                maintain_store(task_store)
+            if not EXTERNAL_WORKERS:
+                with jobs_in_flight_lock:
+                    free_workers = TASK_WORKERS - jobs_in_flight
+                if free_workers > 0 and task_store.has_queued_jobs(time.time() - ORPHANED_JOB_SECONDS):
+                    for _ in range(free_workers):
+                        dispatch_job()
+        except Exception as e:
+            print(f"Job dispatcher: {e}")
+        time.sleep(JOB_DISPATCH_INTERVAL)
+
+
+if not IS_WORKER_PROCESS:
+    threading.Thread(target=dispatch_loop, name='job-dispatcher', daemon=True).start()
+
+
+def write_upload(chunks: Iterator[bytes], path) -> str:
+    """Store uploaded data as it arrives, link it at `path` and return the SHA-256 of its content"""
+    return upload_store.save(chunks, path)
+
+
+def save_chunked_upload(upload_id: str, digest: str, path) -> str:
+    """Link a completed chunked upload at `path` and release it"""
+    upload_store.link(digest, path)
+    chunked_uploads.discard(upload_id)
+    return digest
+
+
+def iter_request_uploads(upload_form, field_name: str) -> Iterator[Tuple[str, Callable[[Path], str]]]:
+    """
+    Yield (filename, save) for each file sent under field_name.
+
+    Files come either in the request body or, for files too large for one
+    request, beforehand through the chunked upload API, in which case the form
+    carries `<field_name>_upload_id` fields instead. save(path) puts the
+    file's content at path and returns its SHA-256.
+    """
+    for filename, chunks in iter_uploads(upload_form, field_name):
+        yield filename, partial(write_upload, chunks)
+    
+    owner = get_session_id()
+    for upload_id in upload_form.form.getlist(f'{field_name}_upload_id'):
+        upload = chunked_uploads.completed(upload_id, owner)
+        if upload is not None:
+            filename, digest = upload
+            yield filename, partial(save_chunked_upload, upload_id, digest)
+
+
+def queue_batch_uploads(task_id: str, kind: str, uploads: Iterator[Tuple[str, Callable[[Path], str]]],
+                        describe_file: Callable[[int, str], Dict[str, Any]],
+                        payload: Dict[str, Any], **record) -> int:
+    """
+    Save a batch upload file by file, queueing each file as soon as it is on disk.
+
+    The job is submitted with the first file and is told about the rest as they
+    arrive (see jobs.iter_job_files), so the first results can be ready while
+    later files are still uploading. If the task is cancelled meanwhile, the
+    rest of the upload is not saved and the files already saved are discarded.
+
+    Args:
+        task_id: Task to create
+        kind: Batch job kind
+        uploads: (filename, save) of each uploaded file, in arrival order (see iter_request_uploads)
+        describe_file: Builds a file's job entry (with its input_path) from its index and filename
+        payload: Job payload apart from the file list
+        **record: Extra fields for the task record
+
+    Returns:
+        Number of files queued
+    """
+    count = 0
+    staged = []
+    cancel_token = StoreCancelToken(task_store, task_id)
+    try:
+        for idx, (filename, save) in enumerate(uploads):
+            if count and cancel_token.cancelled:
+                for input_path in staged:
+                    janitor.discard(input_path)
+                break
+            file_info = describe_file(idx, filename)
+            file_info['sha256'] = save(file_info['input_path'])
+            staged.append(file_info['input_path'])
+            if idx == 0:
+                submit_task(task_id, kind, {**payload, 'files': [file_info], 'uploading': True},
+                            progress="0/1", results=[], **record)
+            else:
+                task_store.add_job_file(task_id, file_info)
+            count += 1
+    finally:
+        # Also on a broken upload: the job finishes the files it already has
+        if count:
+            task_store.close_job_input(task_id)
+    return count
+
 
 def get_session_id():
     """Get or create session ID"""
@@ -122,12 +343,8 @@ def index():
 @app.route('/upload', methods=['POST'])
 def upload_pdfs():
     """Upload PDF files"""
-    if 'pdfs' not in request.files:
-        flash('No files selected', 'error')
-        return redirect(url_for('index'))
-    
-    files = request.files.getlist('pdfs')
-    if not files or files[0].filename == '':
+    uploads = list(iter_request_uploads(BufferedUploadForm(request), 'pdfs'))
+    if not uploads:
         flash('No files selected', 'error')
         return redirect(url_for('index'))
     
@@ -137,20 +354,19 @@ def upload_pdfs():
     success_count = 0
     error_count = 0
     
-    for file in files:
-        if file and file.filename.lower().endswith('.pdf'):
+    for filename, save in uploads:
+        if filename.lower().endswith('.pdf'):
             try:
                 # Save uploaded file
-                filename = secure_filename(file.filename)
-                filepath = session_folder / filename
-                file.save(str(filepath))
+                filepath = session_folder / secure_filename(filename)
+                save(filepath)
                 
                 # Add to manager
                 manager.add_pdf(str(filepath))
                 success_count += 1
             except Exception as e:
                 error_count += 1
-                flash(f'Failed to load {file.filename}: {str(e)}', 'error')
+                flash(f'Failed to load {filename}: {str(e)}', 'error')
     
     save_pdf_manager(manager)
     
@@ -173,19 +389,8 @@ def new_project():
         'selected_pages': []
     }
     
-    # Clean up uploaded files and thumbnails
-    session_id = get_session_id()
-    upload_folder = Path('./uploads') / session_id
-    thumbnail_folder = Path('./static/temp') / session_id
-    
-    # Remove files (simple cleanup)
-    for folder in [upload_folder, thumbnail_folder]:
-        if folder.exists():
-            for file in folder.iterdir():
-                try:
-                    file.unlink()
-                except:
-                    pass
+    # Clean up uploaded files and thumbnails (renamed away now, deleted in the background)
+    janitor.discard_session(get_session_id())
     
     flash('Started new project', 'success')
     return redirect(url_for('index'))
@@ -208,6 +413,9 @@ def view_pdf(pdf_id):
     # Get pages for this PDF
     pages = manager.get_pages_for_pdf(pdf_id)
     
+    # The session is still working on this PDF; keep it from being evicted as idle
+    touch(pdf_info['path'])
+    
     # Generate thumbnails
     thumbnail_folder = get_thumbnail_folder()
     session_id = get_session_id()
@@ -328,176 +536,164 @@ def merge_pdfs():
     output_path = get_session_folder() / output_filename
     
     try:
-        manager.merge_all(str(output_path))
+        linearize = request.form.get('linearize') == '1'
+        if not manager.merge_all(str(output_path), linearize=linearize) and linearize:
+            flash('Fast web view is not available on this server (pikepdf is not installed); '
+                  'the merged PDF was saved without it', 'warning')
         
-        # Send file for download
-        return send_file(
-            str(output_path),
-            as_attachment=True,
-            download_name='merged.pdf',
-            mimetype='application/pdf'
-        )
+        # Redirect to a GET download so browsers can use Range requests on the output
+        return redirect(url_for('download_merged', filename=output_filename), code=303)
     except Exception as e:
         flash(f'Failed to merge PDFs: {str(e)}', 'error')
         return redirect(url_for('index'))
 
 
+@app.route('/download/merged/<filename>')
+def download_merged(filename):
+    """Download a merged PDF from the current session"""
+    output_file = get_session_folder() / secure_filename(filename)
+    if not output_file.name.startswith('merged_') or not output_file.exists():
+        flash('Merged file not found. The file may have been deleted or expired.', 'error')
+        return redirect(url_for('index'))
+    
+    return send_pdf(output_file, 'merged.pdf')
+
+
+def send_pdf(output_file: Path, download_name: str):
+    """
+    Send a generated PDF as an attachment.
+    
+    Responses are conditional, so GET requests honour Range headers: browser
+    PDF viewers can show the first page of large (linearized) files early and
+    interrupted downloads can resume. The ETag is the SHA-256 of the content
+    (a strong validator, so If-Range works) and Last-Modified is the file's
+    mtime; If-None-Match / If-Modified-Since revalidations get a 304.
+    """
+    return send_file(
+        str(output_file.absolute()),
+        as_attachment=True,
+        download_name=download_name,
+        mimetype='application/pdf',
+        conditional=True,
+        etag=compute_file_hash(output_file)
+    )
+
+
 @app.route('/extract', methods=['GET', 'POST'])
 def extract_questions():
     """Extract question pages - single or batch mode"""
     if request.method == 'GET':
-        return render_template('extract.html')
+        return render_template('extract.html',
+                               save_profiles=list(SAVE_PROFILES),
+                               default_save_profile=DEFAULT_SAVE_PROFILE)
+    
+    # The batch form posts to ?mode=batch so its body can be parsed while it
+    # uploads, without waiting for Werkzeug to buffer every file
+    if request.args.get('mode') == 'batch':
+        return extract_batch(StreamedUploadForm.from_request(request))
     
     # Handle file upload
     mode = request.form.get('mode', 'single')
+    if mode != 'single':
+        return extract_batch(BufferedUploadForm(request))
     
-    if mode == 'single':
-        return extract_single()
-    else:
-        return extract_batch()
+    extract_options = parse_extract_options(request.form)
+    if extract_options is None:
+        return redirect(url_for('extract_questions'))
+    return extract_single(extract_options)
+
+
+def parse_extract_options(form) -> Optional[Dict[str, Any]]:
+    """Read extraction options from form fields, flashing an error and returning None if invalid"""
+    save_profile = form.get('save_profile', DEFAULT_SAVE_PROFILE)
+    if save_profile not in SAVE_PROFILES:
+        flash(f'Unknown save profile: {save_profile}', 'error')
+        return None
+    
+    # Blank means "keep images untouched"
+    image_dpi = form.get('image_dpi', type=int)
+    if image_dpi is not None and image_dpi <= 0:
+        flash('Image DPI must be a positive number', 'error')
+        return None
+    
+    return {
+        'save_profile': save_profile,
+        'image_dpi': image_dpi,
+        'linearize': form.get('linearize') == '1'
+    }
 
 
-def extract_single():
+def get_extract_options(extract_options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill in defaults for the extract_question_pages options of a job"""
+    return {'save_profile': DEFAULT_SAVE_PROFILE, 'image_dpi': None, 'linearize': False, **(extract_options or {})}
+
+
+def extract_single(extract_options: Optional[Dict[str, Any]] = None):
     """Extract from single PDF"""
-    if 'pdf' not in request.files:
+    upload = next(iter_request_uploads(BufferedUploadForm(request), 'pdf'), None)
+    if upload is None:
         flash('No file selected', 'error')
         return redirect(url_for('extract_questions'))
     
-    file = request.files['pdf']
-    if file.filename == '':
-        flash('No file selected', 'error')
-        return redirect(url_for('extract_questions'))
+    filename, save = upload
+    extract_options = get_extract_options(extract_options)
     
-    if not file.filename.lower().endswith('.pdf'):
+    if not filename.lower().endswith('.pdf'):
         flash('Please upload a PDF file', 'error')
         return redirect(url_for('extract_questions'))
     
     # Save file BEFORE starting thread (to avoid request context issues)
     task_id = str(uuid.uuid4())
     session_folder = get_session_folder()
-    input_filename = secure_filename(file.filename)
+    input_filename = secure_filename(filename)
     input_path = session_folder / f"extract_input_{task_id}.pdf"
-    file.save(str(input_path))
+    content_hash = save(input_path)
     
     # Generate output filename
-    manager = PDFManager()
-    smart_name = manager.generate_smart_filename(input_filename)
+    smart_name = PDFManager.generate_smart_filename(input_filename)
     output_path = session_folder / f"extract_output_{task_id}.pdf"
     
-    # Now start background task with file paths (not file objects)
-    def extract_worker():
-        try:
-            # Extract
-            background_tasks[task_id]['status'] = 'processing'
-            result = manager.extract_question_pages(str(input_path), str(output_path))
-            orig_pages, new_pages, questions, is_valid, missing, max_q = result
-            
-            background_tasks[task_id].update({
-                'status': 'completed',
-                'input_name': input_filename,
-                'output_name': smart_name,
-                'output_path': str(output_path),
-                'orig_pages': orig_pages,
-                'new_pages': new_pages,
-                'questions': list(questions),  # Convert to list for JSON
-                'is_valid': is_valid,
-                'missing': list(missing),  # Convert to list for JSON
-                'max_question': max_q
-            })
-        except Exception as e:
-            background_tasks[task_id]['status'] = 'error'
-            background_tasks[task_id]['error'] = str(e)
-    
-    background_tasks[task_id] = {'status': 'starting', 'mode': 'extract_single'}
-    thread = threading.Thread(target=extract_worker, daemon=True)
-    thread.start()
+    # Queue the job with file paths (not file objects)
+    submit_task(task_id, 'extract_single', {
+        'input_name': input_filename,
+        'input_path': str(input_path.resolve()),
+        'sha256': content_hash,
+        'output_name': smart_name,
+        'output_path': str(output_path.resolve()),
+        'options': extract_options
+    }, options=extract_options)
     
     return redirect(url_for('task_status', task_id=task_id))
 
 
-def extract_batch():
-    """Extract from multiple PDFs"""
-    if 'pdfs' not in request.files:
+def extract_batch(upload_form):
+    """Extract from multiple PDFs, starting on each one as soon as it has uploaded"""
+    uploads = iter_request_uploads(upload_form, 'pdfs')
+    first_upload = next(uploads, None)
+    if first_upload is None:
         flash('No files selected', 'error')
         return redirect(url_for('extract_questions'))
     
-    files = request.files.getlist('pdfs')
-    if not files or files[0].filename == '':
-        flash('No files selected', 'error')
+    # The option fields come before the files, so they have been parsed by now
+    extract_options = parse_extract_options(upload_form.form)
+    if extract_options is None:
         return redirect(url_for('extract_questions'))
+    extract_options = get_extract_options(extract_options)
     
-    # Save all files BEFORE starting thread
     task_id = str(uuid.uuid4())
     session_folder = get_session_folder()
     
-    # Prepare file info list
-    file_infos = []
-    for idx, file in enumerate(files):
-        input_filename = secure_filename(file.filename)
+    def describe_file(idx: int, filename: str) -> Dict[str, Any]:
         input_path = session_folder / f"batch_input_{task_id}_{idx}.pdf"
-        file.save(str(input_path))
-        
-        file_infos.append({
-            'input_filename': input_filename,
-            'input_path': str(input_path),
-            'idx': idx
-        })
-    
-    # Now start background task with file info (not file objects)
-    def batch_extract_worker():
-        results = []
-        manager = PDFManager()
-        
-        for file_info in file_infos:
-            idx = file_info['idx']
-            input_filename = file_info['input_filename']
-            input_path = file_info['input_path']
-            
-            background_tasks[task_id]['progress'] = f"{idx + 1}/{len(file_infos)}"
-            
-            try:
-                smart_name = manager.generate_smart_filename(input_filename)
-                output_path = session_folder / f"batch_output_{task_id}_{idx}.pdf"
-                
-                result = manager.extract_question_pages(input_path, str(output_path))
-                orig_pages, new_pages, questions, is_valid, missing, max_q = result
-                
-                results.append({
-                    'input_name': input_filename,
-                    'output_name': smart_name,
-                    'output_path': str(output_path),
-                    'orig_pages': orig_pages,
-                    'new_pages': new_pages,
-                    'questions': list(questions),  # Convert to list for JSON
-                    'is_valid': is_valid,
-                    'missing': list(missing),  # Convert to list for JSON
-                    'max_question': max_q,
-                    'error': None
-                })
-            except Exception as e:
-                results.append({
-                    'input_name': input_filename,
-                    'output_name': '',
-                    'output_path': '',
-                    'orig_pages': 0,
-                    'new_pages': 0,
-                    'questions': [],
-                    'is_valid': False,
-                    'missing': [],
-                    'max_question': 0,
-                    'error': str(e)
-                })
-        
-        background_tasks[task_id]['status'] = 'completed'
-        background_tasks[task_id]['results'] = results
+        output_path = session_folder / f"batch_output_{task_id}_{idx}.pdf"
+        return {
+            'input_name': secure_filename(filename),
+            'input_path': str(input_path.resolve()),
+            'output_path': str(output_path.resolve())
+        }
     
-    background_tasks[task_id] = {
-        'status': 'starting',
-        'mode': 'extract_batch',
-        'progress': f"0/{len(file_infos)}"
-    }
-    thread = threading.Thread(target=batch_extract_worker, daemon=True)
-    thread.start()
+    queue_batch_uploads(task_id, 'extract_batch', chain([first_upload], uploads), describe_file,
+                        {'options': extract_options}, options=extract_options)
     
     return redirect(url_for('task_status', task_id=task_id))
 
@@ -508,144 +704,120 @@ def validate_questions():
     if request.method == 'GET':
         return render_template('validate.html')
     
+    # Streamed like the extract batch form (see extract_questions)
+    if request.args.get('mode') == 'batch':
+        return validate_batch(StreamedUploadForm.from_request(request))
+    
     mode = request.form.get('mode', 'single')
     
     if mode == 'single':
         return validate_single()
     else:
-        return validate_batch()
+        return validate_batch(BufferedUploadForm(request))
 
 
 def validate_single():
     """Validate single PDF"""
-    if 'pdf' not in request.files:
-        flash('No file selected', 'error')
-        return redirect(url_for('validate_questions'))
-    
-    file = request.files['pdf']
-    if file.filename == '':
+    upload = next(iter_request_uploads(BufferedUploadForm(request), 'pdf'), None)
+    if upload is None:
         flash('No file selected', 'error')
         return redirect(url_for('validate_questions'))
     
     # Save file BEFORE starting thread
     task_id = str(uuid.uuid4())
     session_folder = get_session_folder()
-    input_filename = file.filename
+    input_filename, save = upload
     input_path = session_folder / f"validate_{task_id}.pdf"
-    file.save(str(input_path))
-    
-    # Now start background task with file path (not file object)
-    def validate_worker():
-        try:
-            manager = PDFManager()
-            background_tasks[task_id]['status'] = 'processing'
-            is_valid, missing, max_q = manager.validate_question_continuity(str(input_path))
-            
-            background_tasks[task_id].update({
-                'status': 'completed',
-                'file_name': input_filename,
-                'is_valid': is_valid,
-                'missing': list(missing),  # Convert to list for JSON
-                'max_question': max_q
-            })
-        except Exception as e:
-            background_tasks[task_id]['status'] = 'error'
-            background_tasks[task_id]['error'] = str(e)
+    content_hash = save(input_path)
     
-    background_tasks[task_id] = {'status': 'starting', 'mode': 'validate_single'}
-    thread = threading.Thread(target=validate_worker, daemon=True)
-    thread.start()
+    # Queue the job with the file path (not file object)
+    submit_task(task_id, 'validate_single', {
+        'input_name': input_filename,
+        'input_path': str(input_path.resolve()),
+        'sha256': content_hash
+    })
     
     return redirect(url_for('task_status', task_id=task_id))
 
 
-def validate_batch():
-    """Validate multiple PDFs"""
-    if 'pdfs' not in request.files:
-        flash('No files selected', 'error')
-        return redirect(url_for('validate_questions'))
-    
-    files = request.files.getlist('pdfs')
-    if not files or files[0].filename == '':
+def validate_batch(upload_form):
+    """Validate multiple PDFs, starting on each one as soon as it has uploaded"""
+    uploads = iter_request_uploads(upload_form, 'pdfs')
+    first_upload = next(uploads, None)
+    if first_upload is None:
         flash('No files selected', 'error')
         return redirect(url_for('validate_questions'))
     
-    # Save all files BEFORE starting thread
     task_id = str(uuid.uuid4())
     session_folder = get_session_folder()
     
-    # Prepare file info list
-    file_infos = []
-    for idx, file in enumerate(files):
-        input_filename = file.filename
+    def describe_file(idx: int, filename: str) -> Dict[str, Any]:
         input_path = session_folder / f"validate_batch_{task_id}_{idx}.pdf"
-        file.save(str(input_path))
-        
-        file_infos.append({
-            'input_filename': input_filename,
-            'input_path': str(input_path),
-            'idx': idx
-        })
+        return {'input_name': filename, 'input_path': str(input_path.resolve())}
     
-    # Now start background task with file info (not file objects)
-    def batch_validate_worker():
-        results = []
-        manager = PDFManager()
-        
-        for file_info in file_infos:
-            idx = file_info['idx']
-            input_filename = file_info['input_filename']
-            input_path = file_info['input_path']
-            
-            background_tasks[task_id]['progress'] = f"{idx + 1}/{len(file_infos)}"
-            
-            try:
-                is_valid, missing, max_q = manager.validate_question_continuity(input_path)
-                
-                results.append({
-                    'file_name': input_filename,
-                    'is_valid': is_valid,
-                    'missing': list(missing),  # Convert to list for JSON
-                    'max_question': max_q,
-                    'error': None
-                })
-            except Exception as e:
-                results.append({
-                    'file_name': input_filename,
-                    'is_valid': False,
-                    'missing': [],
-                    'max_question': 0,
-                    'error': str(e)
-                })
-        
-        background_tasks[task_id]['status'] = 'completed'
-        background_tasks[task_id]['results'] = results
-    
-    background_tasks[task_id] = {
-        'status': 'starting',
-        'mode': 'validate_batch',
-        'progress': f"0/{len(file_infos)}"
-    }
-    thread = threading.Thread(target=batch_validate_worker, daemon=True)
-    thread.start()
-    
-    return redirect(url_for('task_status', task_id=task_id))
-    
-    background_tasks[task_id] = {
-        'status': 'starting',
-        'mode': 'validate_batch',
-        'progress': f"0/{len(files)}"
-    }
-    thread = threading.Thread(target=batch_validate_worker, daemon=True)
-    thread.start()
+    queue_batch_uploads(task_id, 'validate_batch', chain([first_upload], uploads), describe_file, {})
     
     return redirect(url_for('task_status', task_id=task_id))
 
 
+@app.route('/api/uploads', methods=['POST'])
+def api_create_upload():
+    """Start a chunked upload: JSON {filename, size, sha256 (optional)}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = chunked_uploads.create(get_session_id(), data.get('filename'), data.get('size'), data.get('sha256'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(upload), 201
+
+
+@app.route('/api/uploads/<upload_id>')
+def api_upload_status(upload_id):
+    """Chunked upload status, listing the chunks received so a client can resume"""
+    upload = chunked_uploads.status(upload_id, get_session_id())
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(upload)
+
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def api_upload_chunk(upload_id, index):
+    """Receive one chunk as the raw request body, checked against its X-Chunk-SHA256 header"""
+    try:
+        received = chunked_uploads.write_chunk(upload_id, get_session_id(), index, request.stream,
+                                               request.headers.get('X-Chunk-SHA256', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if received is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify({'index': index, 'received': received})
+
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def api_complete_upload(upload_id):
+    """Assemble a fully received upload; the returned upload_id can then be submitted with a form"""
+    try:
+        upload = chunked_uploads.complete(upload_id, get_session_id())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(upload)
+
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def api_discard_upload(upload_id):
+    """Abandon a chunked upload"""
+    if chunked_uploads.status(upload_id, get_session_id()) is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    chunked_uploads.discard(upload_id)
+    return '', 204
+
+
 @app.route('/task/<task_id>')
 def task_status(task_id):
     """Show task status page with polling"""
-    if task_id not in background_tasks:
+    if task_store.get_task(task_id) is None:
         flash('Task not found', 'error')
         return redirect(url_for('index'))
     
@@ -655,21 +827,91 @@ def task_status(task_id):
 @app.route('/api/task/<task_id>')
 def api_task_status(task_id):
     """API endpoint for task status polling"""
-    if task_id not in background_tasks:
+    task = task_store.get_task(task_id)
+    if task is None:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    if task['status'] not in FINISHED_STATUSES:
+        # Page progress is only recorded as events (see jobs.make_progress_callback)
+        task['page_progress'] = task_store.get_latest_event(task_id, 'page_progress')
+    return jsonify(task)
+
+
+@app.route('/api/task/<task_id>/cancel', methods=['POST'])
+def api_cancel_task(task_id):
+    """Request cancellation of a queued or running task"""
+    task = task_store.get_task(task_id)
+    if task is None:
         return jsonify({'error': 'Task not found'}), 404
     
-    return jsonify(background_tasks[task_id])
+    if task['status'] in FINISHED_STATUSES:
+        return jsonify({'status': task['status']}), 409
+    
+    if task_store.request_cancel(task_id):
+        # Never claimed by a worker, so it is dropped from the queue right away
+        mark_task_cancelled(task_store, task_id)
+    
+    return jsonify({'status': task_store.get_task(task_id)['status'], 'cancel_requested': True}), 202
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize a task event in text/event-stream format"""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+@app.route('/api/task/<task_id>/events')
+def api_task_events(task_id):
+    """
+    Server-Sent Events stream of a task's progress.
+    
+    Only events after Last-Event-ID are sent, so a reconnecting EventSource
+    resumes where it left off. The stream ends after the 'complete',
+    'failed' or 'cancelled' event.
+    """
+    if task_store.get_task(task_id) is None:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id', '0'))
+    try:
+        sent = max(int(last_event_id), 0)
+    except ValueError:
+        sent = 0
+    
+    def generate(sent: int):
+        idle_since = time.monotonic()
+        while True:
+            pending = task_store.get_events(task_id, sent)
+            if not pending:
+                if time.monotonic() - idle_since >= SSE_KEEPALIVE_SECONDS:
+                    if task_store.get_task(task_id) is None:
+                        return
+                    idle_since = time.monotonic()
+                    yield ': keepalive\n\n'
+                time.sleep(SSE_POLL_SECONDS)
+                continue
+            
+            idle_since = time.monotonic()
+            for event in pending:
+                sent = event['id']
+                yield format_sse(event)
+                if event['event'] in ('complete', 'failed', 'cancelled'):
+                    return
+    
+    return Response(generate(sent), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 
 @app.route('/download/<task_id>/<int:file_index>')
 def download_extracted(task_id, file_index):
     """Download extracted/validated file"""
-    if task_id not in background_tasks:
+    task = task_store.get_task(task_id)
+    if task is None:
         app.logger.error(f'Task not found: {task_id}')
         flash('Task not found', 'error')
         return redirect(url_for('index'))
     
-    task = background_tasks[task_id]
     output_path = None
     output_name = None
     
@@ -690,13 +932,7 @@ def download_extracted(task_id, file_index):
                 flash(f'Output file not found: {output_name}. The file may have been deleted or expired.', 'error')
                 return redirect(url_for('index'))
             
-            # Use absolute path for send_file
-            return send_file(
-                str(output_file.absolute()),
-                as_attachment=True,
-                download_name=output_name,
-                mimetype='application/pdf'
-            )
+            return send_pdf(output_file, output_name)
             
         elif task['mode'] == 'extract_batch':
             results = task.get('results', [])
@@ -721,13 +957,7 @@ def download_extracted(task_id, file_index):
                 flash(f'Output file not found: {output_name}. The file may have been deleted or expired.', 'error')
                 return redirect(url_for('task_status', task_id=task_id))
             
-            # Use absolute path for send_file
-            return send_file(
-                str(output_file.absolute()),
-                as_attachment=True,
-                download_name=output_name,
-                mimetype='application/pdf'
-            )
+            return send_pdf(output_file, output_name)
         else:
             app.logger.error(f'Invalid task mode: {task.get("mode")}')
             flash('Invalid task mode', 'error')
@@ -739,5 +969,101 @@ def download_extracted(task_id, file_index):
         return redirect(url_for('index'))
 
 
+class ZipStreamBuffer:
+    """Write-only file object that collects ZIP output for a streaming response"""
+    
+    def __init__(self):
+        self.chunks: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def unique_archive_name(name: str, used_names: set) -> str:
+    """Make a file name unique within an archive ("a.pdf", "a (2).pdf", ...)"""
+    stem, suffix = os.path.splitext(name or 'extracted.pdf')
+    candidate = f"{stem}{suffix}"
+    counter = 2
+    while candidate in used_names:
+        candidate = f"{stem} ({counter}){suffix}"
+        counter += 1
+    used_names.add(candidate)
+    return candidate
+
+
+def stream_batch_zip(task_id: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    Build a ZIP of a batch's outputs on the fly, in result order.
+    
+    Each output is added as soon as its result appears in the task record, so
+    the first bytes go out while later files are still being extracted. Nothing
+    is buffered beyond one chunk; entries are stored uncompressed since the
+    PDFs are already compressed.
+    
+    Raises TimeoutError, which aborts the download instead of ending the
+    archive, once the task has produced no result for ZIP_IDLE_SECONDS.
+    """
+    buffer = ZipStreamBuffer()
+    used_names = set()
+    next_index = 0
+    idle_since = time.monotonic()
+    
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        while True:
+            task = task_store.get_task(task_id) or {}
+            results = task.get('results', [])
+            
+            if next_index >= len(results):
+                if task.get('status') in (*FINISHED_STATUSES, None):
+                    break
+                if time.monotonic() - idle_since >= ZIP_IDLE_SECONDS:
+                    raise TimeoutError(f"Task {task_id} produced no result for {ZIP_IDLE_SECONDS} seconds")
+                time.sleep(0.5)
+                continue
+            
+            result = results[next_index]
+            next_index += 1
+            output_path = result.get('output_path')
+            if result.get('error') or not output_path or not os.path.exists(output_path):
+                idle_since = time.monotonic()
+                continue
+            
+            arcname = unique_archive_name(result.get('output_name'), used_names)
+            with open(output_path, 'rb') as source, archive.open(arcname, mode='w', force_zip64=True) as entry:
+                for chunk in iter(lambda: source.read(chunk_size), b''):
+                    entry.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+            # Time spent sending the file to a slow client does not count as idle
+            idle_since = time.monotonic()
+    
+    # Central directory
+    yield buffer.drain()
+
+
+@app.route('/download-all/<task_id>')
+def download_all_extracted(task_id):
+    """Download every output of a batch extraction as one streamed ZIP"""
+    task = task_store.get_task(task_id)
+    if not task or task.get('mode') != 'extract_batch':
+        flash('Task not found', 'error')
+        return redirect(url_for('index'))
+    
+    return Response(
+        stream_batch_zip(task_id),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename="extracted_pdfs.zip"'}
+    )
+
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
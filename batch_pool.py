@@ -0,0 +1,228 @@
+"""
+Batch Pool - Runs batch extraction and validation across processes
+
+Every file is one task on a ProcessPoolExecutor. Worker processes report page
+progress through a multiprocessing queue and watch a shared Event for cancel
+requests. The Tk app polls the pool from root.after callbacks (progress(),
+collect()), so its main thread never waits on a file.
+
+The Streamlit app submits the same tasks to one pool shared by all sessions;
+each of its batches passes its own manager dict and Event instead.
+"""
+import multiprocessing
+import os
+import queue
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pdf_manager import CancelToken, OperationCancelled, PDFManager, describe_progress
+
+
+# Worker processes per desktop batch
+BATCH_WORKERS = int(os.environ.get('DESKTOP_BATCH_WORKERS', max(1, min(4, os.cpu_count() or 1))))
+
+# Error of files that were cancelled before they finished
+CANCELLED = 'Cancelled'
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+_cancel_event = None
+
+
+class EventCancelToken(CancelToken):
+    """CancelToken backed by a multiprocessing Event, so the parent process can cancel it"""
+
+    def __init__(self, event):
+        self._event = event
+
+
+def _init_worker(progress_queue, cancel_event):
+    global _progress_queue, _cancel_event
+    _progress_queue = progress_queue
+    _cancel_event = cancel_event
+
+
+def _report_progress(index: int, progress=None):
+    def report(info):
+        if progress is None:
+            _progress_queue.put((index, describe_progress(info)))
+        else:
+            progress[index] = describe_progress(info)
+    return report
+
+
+def extraction_error(index: int, input_path: str, error: str) -> Dict[str, Any]:
+    """Result of a file whose extraction failed or never ran"""
+    return {
+        'index': index,
+        'input_path': input_path,
+        'input_name': Path(input_path).name,
+        'output_path': '',
+        'output_name': '',
+        'orig_pages': 0,
+        'new_pages': 0,
+        'questions': [],
+        'is_valid': False,
+        'missing': [],
+        'max_question': 0,
+        'error': error
+    }
+
+
+def validation_error(index: int, file_path: str, error: str) -> Dict[str, Any]:
+    """Result of a file whose validation failed or never ran"""
+    return {
+        'index': index,
+        'file_path': file_path,
+        'file_name': Path(file_path).name,
+        'is_valid': False,
+        'missing': [],
+        'max_question': 0,
+        'error': error
+    }
+
+
+def extract_file(index: int, input_path: str, output_path: str, options: Optional[Dict[str, Any]] = None,
+                 progress=None, cancel_event=None) -> Dict[str, Any]:
+    """
+    Extract question pages of one batch file (runs in a worker process)
+
+    Args:
+        options: Extra extract_question_pages keyword arguments (save_profile, image_dpi, ...)
+        progress: Dict (e.g. a manager dict) receiving the progress text under index,
+            instead of the pool's progress queue
+        cancel_event: Event cancelling this file, instead of the pool's
+    """
+    manager = PDFManager()
+    try:
+        orig_pages, new_pages, questions, is_valid, missing, max_q = manager.extract_question_pages(
+            input_path, output_path, **(options or {}),
+            progress_callback=_report_progress(index, progress),
+            cancel_token=EventCancelToken(_cancel_event if cancel_event is None else cancel_event)
+        )
+    except OperationCancelled:
+        return extraction_error(index, input_path, CANCELLED)
+    except Exception as e:
+        return extraction_error(index, input_path, str(e))
+    return {
+        **manager.last_extraction_stats,
+        'index': index,
+        'input_path': input_path,
+        'input_name': Path(input_path).name,
+        'output_path': output_path,
+        'output_name': Path(output_path).name,
+        'orig_pages': orig_pages,
+        'new_pages': new_pages,
+        'questions': questions,
+        'is_valid': is_valid,
+        'missing': missing,
+        'max_question': max_q,
+        'error': None
+    }
+
+
+def validate_file(index: int, file_path: str, progress=None, cancel_event=None) -> Dict[str, Any]:
+    """Validate question continuity of one batch file (runs in a worker process; see extract_file)"""
+    try:
+        is_valid, missing, max_q = PDFManager().validate_question_continuity(
+            file_path, _report_progress(index, progress),
+            EventCancelToken(_cancel_event if cancel_event is None else cancel_event)
+        )
+    except OperationCancelled:
+        return validation_error(index, file_path, CANCELLED)
+    except Exception as e:
+        return validation_error(index, file_path, str(e))
+    return {
+        'index': index,
+        'file_path': file_path,
+        'file_name': Path(file_path).name,
+        'is_valid': is_valid,
+        'missing': missing,
+        'max_question': max_q,
+        'error': None
+    }
+
+
+# Result of a task that never produced one (cancelled before it started, or its process died)
+TASK_ERRORS: Dict[Callable, Callable[[int, str, str], Dict[str, Any]]] = {
+    extract_file: extraction_error,
+    validate_file: validation_error,
+}
+
+
+class BatchPool:
+    """
+    One batch of extract_file/validate_file tasks on its own process pool.
+
+    Meant to be polled from a UI thread: progress() and collect() never block.
+    """
+
+    def __init__(self, workers: int = BATCH_WORKERS):
+        # Spawned, not forked: the Tk and Streamlit parents are multithreaded
+        context = multiprocessing.get_context('spawn')
+        self.progress_queue = context.Queue()
+        self.cancel_event = context.Event()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.progress_queue, self.cancel_event)
+        )
+        self._tasks: List[tuple] = []  # (future, task, index, path)
+        self._collected = 0
+        self.cancelled = False
+
+    def submit(self, task: Callable, index: int, path: str, *args):
+        """Queue one file: task(index, path, *args) in a worker process"""
+        self._tasks.append((self.executor.submit(task, index, path, *args), task, index, path))
+
+    @property
+    def total(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def completed(self) -> int:
+        """Files whose results were collected"""
+        return self._collected
+
+    @property
+    def done(self) -> bool:
+        return self._collected == len(self._tasks)
+
+    def progress(self) -> Dict[int, str]:
+        """Latest progress text per file index reported since the last call"""
+        latest = {}
+        while True:
+            try:
+                index, text = self.progress_queue.get_nowait()
+            except queue.Empty:
+                return latest
+            latest[index] = text
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """Results of the tasks that finished since the last call"""
+        finished = []
+        for position, (future, task, index, path) in enumerate(self._tasks):
+            if future is None or not future.done():
+                continue
+            try:
+                finished.append(future.result())
+            except CancelledError:
+                finished.append(TASK_ERRORS[task](index, path, CANCELLED))
+            except Exception as e:
+                finished.append(TASK_ERRORS[task](index, path, str(e)))
+            self._tasks[position] = (None, task, index, path)
+            self._collected += 1
+        return finished
+
+    def cancel(self):
+        """Stop running files at their next page and drop queued ones"""
+        self.cancelled = True
+        self.cancel_event.set()
+        for future, _, _, _ in self._tasks:
+            if future is not None:
+                future.cancel()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,65 @@
+"""
+Benchmark script comparing the serial and parallel merge paths of PDFManager.merge_all
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from pdf_manager import PDFManager
+
+
+def create_source_pdfs(folder: Path, pdf_count: int, pages_per_pdf: int):
+    """Create source PDFs with a page of text on every page"""
+    paths = []
+    filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    for pdf_num in range(pdf_count):
+        doc = fitz.open()
+        for page_num in range(pages_per_pdf):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Exam {pdf_num + 1} - Question {page_num + 1}", fontsize=14)
+            page.insert_textbox(fitz.Rect(72, 100, 520, 760), filler, fontsize=10)
+        path = folder / f"source_{pdf_num}.pdf"
+        doc.save(str(path))
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def time_merge(paths, output_path: Path, parallel: bool, workers=None):
+    """Load the sources and time a single merge_all call"""
+    manager = PDFManager()
+    for path in paths:
+        manager.add_pdf(str(path))
+
+    start = time.perf_counter()
+    manager.merge_all(str(output_path), parallel=parallel, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    with fitz.open(str(output_path)) as doc:
+        page_count = len(doc)
+    return elapsed, page_count, output_path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pdfs', type=int, default=50, help='Number of source PDFs')
+    parser.add_argument('--pages', type=int, default=100, help='Pages per source PDF')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for the parallel path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        print(f"Creating {args.pdfs} PDFs x {args.pages} pages...")
+        paths = create_source_pdfs(folder, args.pdfs, args.pages)
+
+        print()
+        print(f"{'Mode':<10} {'Seconds':>10} {'Pages':>8} {'Size (MB)':>10}")
+        for label, parallel in (('serial', False), ('parallel', True)):
+            elapsed, pages, size = time_merge(paths, folder / f"merged_{label}.pdf", parallel, args.workers)
+            print(f"{label:<10} {elapsed:>10.2f} {pages:>8} {size / 1024 / 1024:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
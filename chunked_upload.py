@@ -0,0 +1,229 @@
+"""
+Chunked Upload - Resumable uploads assembled into the upload store
+
+Large PDFs are sent as numbered chunks, each with its own SHA-256, so no
+request comes near MAX_CONTENT_LENGTH and a dropped connection only costs the
+chunk in flight. Chunks are kept as files next to a JSON manifest under
+<root>/<upload_id>/; a chunk file only appears once its checksum has been
+verified, so the chunks present on disk are exactly the ones received.
+On completion the chunks are streamed into the UploadStore (hashed on the way)
+and replaced by a link to the blob, which keeps it referenced until the form
+the upload was made for picks it up.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from upload_store import UploadStore
+
+
+DEFAULT_PARTIAL_DIR = os.environ.get('UPLOAD_PARTIAL_DIR', './uploads/.partial')
+
+# Bytes per chunk; well below MAX_CONTENT_LENGTH so every request stays small
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bytes read from a request or chunk file at a time
+READ_SIZE = 1024 * 1024
+
+UPLOAD_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+class ChunkedUploads:
+    """
+    Upload sessions owned by a web session.
+
+    Every method takes the owner (the web session id) and treats uploads
+    belonging to anyone else as missing.
+    """
+
+    def __init__(self, upload_store: UploadStore, root=DEFAULT_PARTIAL_DIR, chunk_size: int = CHUNK_SIZE,
+                 remove_folder: Optional[Callable[[Path], Any]] = None):
+        """
+        Args:
+            remove_folder: Deletes the folder of a discarded upload; a web app
+                passes its janitor's discard to keep the deletion off the request
+                path (default: delete it right away)
+        """
+        self.upload_store = upload_store
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.remove_folder = remove_folder or partial(shutil.rmtree, ignore_errors=True)
+
+    def _folder(self, upload_id: str) -> Optional[Path]:
+        if not UPLOAD_ID_PATTERN.fullmatch(upload_id or ''):
+            return None
+        return self.root / upload_id
+
+    def _load(self, upload_id: str, owner: str) -> Optional[Dict[str, Any]]:
+        folder = self._folder(upload_id)
+        if folder is None:
+            return None
+        try:
+            manifest = json.loads((folder / 'manifest.json').read_text())
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest['owner'] == owner else None
+
+    def _save(self, manifest: Dict[str, Any]):
+        folder = self.root / manifest['upload_id']
+        temp_path = folder / 'manifest.json.part'
+        temp_path.write_text(json.dumps(manifest))
+        os.replace(temp_path, folder / 'manifest.json')
+
+    def _received(self, upload_id: str) -> List[int]:
+        return sorted(int(path.stem) for path in (self.root / upload_id).glob('*.chunk'))
+
+    def _chunk_length(self, manifest: Dict[str, Any], index: int) -> int:
+        if index < manifest['chunk_count'] - 1:
+            return manifest['chunk_size']
+        return manifest['size'] - manifest['chunk_size'] * (manifest['chunk_count'] - 1)
+
+    def _status(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        status = {key: value for key, value in manifest.items() if key != 'owner'}
+        if manifest['state'] == 'uploading':
+            status['received'] = self._received(manifest['upload_id'])
+        return status
+
+    def create(self, owner: str, filename: str, size: int, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start an upload.
+
+        Args:
+            owner: Web session the upload belongs to
+            filename: Original file name
+            size: Total size in bytes
+            sha256: Optional SHA-256 of the whole file, checked on completion
+
+        Returns:
+            Upload status: upload_id, chunk_size, chunk_count, received, ...
+        """
+        if not filename:
+            raise ValueError('A filename is required')
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise ValueError('Size must be a positive number of bytes')
+
+        upload_id = uuid.uuid4().hex
+        (self.root / upload_id).mkdir()
+        manifest = {
+            'upload_id': upload_id,
+            'owner': owner,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+            'chunk_size': self.chunk_size,
+            'chunk_count': -(-size // self.chunk_size),
+            'state': 'uploading',
+            'created_at': time.time()
+        }
+        self._save(manifest)
+        return self._status(manifest)
+
+    def status(self, upload_id: str, owner: str) -> Optional[Dict[str, Any]]:
+        """Upload status (with the chunk indexes received so far), or None"""
+        manifest = self._load(upload_id, owner)
+        return None if manifest is None else self._status(manifest)
+
+    def write_chunk(self, upload_id: str, owner: str, index: int, stream, checksum: str) -> Optional[List[int]]:
+        """
+        Store one chunk from a file-like stream, verifying its length and SHA-256.
+
+        Re-sending a chunk replaces it, so clients can simply retry.
+
+        Returns:
+            Chunk indexes received so far, or None if the upload does not exist
+        """
+        manifest = self._load(upload_id, owner)
+        if manifest is None:
+            return None
+        if manifest['state'] != 'uploading':
+            raise ValueError('Upload is already complete')
+        if not 0 <= index < manifest['chunk_count']:
+            raise ValueError(f"Chunk index must be between 0 and {manifest['chunk_count'] - 1}")
+        if not checksum:
+            raise ValueError('Chunk checksum is missing')
+
+        expected_length = self._chunk_length(manifest, index)
+        folder = self.root / upload_id
+        temp_path = folder / f"{index}.part"
+        digest = hashlib.sha256()
+        length = 0
+        try:
+            with open(temp_path, 'wb') as out:
+                # Read one byte past the expected length to detect oversized chunks
+                while length <= expected_length:
+                    data = stream.read(min(READ_SIZE, expected_length + 1 - length))
+                    if not data:
+                        break
+                    digest.update(data)
+                    out.write(data)
+                    length += len(data)
+            if length != expected_length:
+                raise ValueError(f"Chunk {index} should be {expected_length} bytes, got {length}")
+            if digest.hexdigest() != checksum.lower():
+                raise ValueError(f"Chunk {index} checksum mismatch")
+            os.replace(temp_path, folder / f"{index}.chunk")
+        finally:
+            if temp_path.exists():
+                os.remove(temp_path)
+        return self._received(upload_id)
+
+    def _read_chunks(self, upload_id: str, chunk_count: int) -> Iterator[bytes]:
+        for index in range(chunk_count):
+            with open(self.root / upload_id / f"{index}.chunk", 'rb') as f:
+                yield from iter(lambda: f.read(READ_SIZE), b'')
+
+    def complete(self, upload_id: str, owner: str) -> Optional[Dict[str, Any]]:
+        """
+        Assemble a fully received upload into the upload store.
+
+        Returns:
+            Upload status including the content's sha256, or None if the upload does not exist
+        """
+        manifest = self._load(upload_id, owner)
+        if manifest is None:
+            return None
+        if manifest['state'] == 'complete':
+            return self._status(manifest)
+
+        missing = sorted(set(range(manifest['chunk_count'])) - set(self._received(upload_id)))
+        if missing:
+            raise ValueError(f"Missing chunks: {missing[:20]}")
+
+        digest = self.upload_store.write(self._read_chunks(upload_id, manifest['chunk_count']))
+        if manifest['sha256'] and digest != manifest['sha256']:
+            raise ValueError('File checksum mismatch')
+
+        self.upload_store.link(digest, self.root / upload_id / 'content')
+        manifest.update(state='complete', sha256=digest)
+        self._save(manifest)
+        for chunk in (self.root / upload_id).glob('*.chunk'):
+            os.remove(chunk)
+        return self._status(manifest)
+
+    def completed(self, upload_id: str, owner: str) -> Optional[Tuple[str, str]]:
+        """
+        Look up a completed upload for the form it was sent with.
+
+        Link its content where it is needed, then discard() it.
+
+        Returns:
+            (filename, sha256), or None if there is no such completed upload
+        """
+        manifest = self._load(upload_id, owner)
+        if manifest is None or manifest['state'] != 'complete':
+            return None
+        return manifest['filename'], manifest['sha256']
+
+    def discard(self, upload_id: str):
+        """Drop an upload and whatever chunks it received"""
+        folder = self._folder(upload_id)
+        if folder is not None:
+            self.remove_folder(folder)
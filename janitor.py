@@ -0,0 +1,355 @@
+"""
+Janitor - Background disk cleanup for uploads, thumbnails and sessions
+
+Session folders (uploads/<session_id>, static/temp/<session_id>) and
+Flask-Session files otherwise grow forever. A Janitor thread periodically
+evicts files by age, then least recently used files until every session and
+the whole store fit their quotas, and prunes unreferenced upload blobs and
+abandoned chunked uploads.
+
+Nothing is unlinked on a request's time: discard() renames a file or folder
+into a trash folder on the same filesystem (a single rename, however big the
+folder) and a separate thread deletes the trash.
+
+A file's last use is its mtime (atime is rarely kept up to date); code that
+reads a stored file calls touch() on it. Files an unfinished job still needs
+are never evicted, and only one process at a time sweeps (see SWEEP_LOCK_NAME).
+"""
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from upload_store import UploadStore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+TRASH_DIR_NAME = '.trash'
+
+# Lock file in the first session root; the process holding it is the one that sweeps
+SWEEP_LOCK_NAME = '.janitor.lock'
+
+# Seconds between sweeps
+JANITOR_INTERVAL = int(os.environ.get('JANITOR_INTERVAL', 300))
+
+# Files unused for this long are evicted regardless of quotas
+JANITOR_MAX_AGE = int(os.environ.get('JANITOR_MAX_AGE', 24 * 3600))
+
+# Files used more recently than this are never evicted, even over quota,
+# so inputs and outputs of running jobs are left alone
+JANITOR_MIN_AGE = int(os.environ.get('JANITOR_MIN_AGE', 600))
+
+# Bytes one session may keep across uploads and thumbnails
+SESSION_QUOTA = int(os.environ.get('JANITOR_SESSION_QUOTA', 1024 ** 3))
+
+# Bytes all sessions together may keep (hardlinked uploads count once)
+GLOBAL_QUOTA = int(os.environ.get('JANITOR_GLOBAL_QUOTA', 10 * 1024 ** 3))
+
+
+def touch(path):
+    """Record that a stored file was just used, so it is evicted last"""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+class Janitor:
+    """
+    Age and LRU based eviction with per-session and global quotas.
+
+    Args:
+        session_roots: Folders holding one sub-folder per session (uploads, thumbnails)
+        session_file_dir: Flask-Session's file store, expired by age only
+        upload_store: Blob store to prune once session links are gone
+        partial_dir: Chunked upload folder; abandoned uploads expire by age
+        in_use: Returns paths unfinished jobs still need; they are never evicted
+    """
+
+    def __init__(self, session_roots: Iterable, session_file_dir=None,
+                 upload_store: Optional[UploadStore] = None, partial_dir=None,
+                 max_age: float = JANITOR_MAX_AGE, min_age: float = JANITOR_MIN_AGE,
+                 session_quota: int = SESSION_QUOTA, global_quota: int = GLOBAL_QUOTA,
+                 interval: float = JANITOR_INTERVAL, in_use: Optional[Callable[[], Iterable]] = None):
+        self.session_roots = [Path(root) for root in session_roots]
+        self.session_file_dir = Path(session_file_dir) if session_file_dir else None
+        self.upload_store = upload_store
+        self.partial_dir = Path(partial_dir) if partial_dir else None
+        self.max_age = max_age
+        self.min_age = min_age
+        self.session_quota = session_quota
+        self.global_quota = global_quota
+        self.interval = interval
+        self.in_use = in_use
+        self._sweep_lock_file = None
+        self._wake_deleter = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # Asynchronous deletion
+
+    def discard(self, path) -> bool:
+        """
+        Move a file or folder out of the way for background deletion.
+
+        Returns:
+            True if it existed and was moved
+        """
+        path = Path(path)
+        trash = self._trash_for(path)
+        try:
+            trash.mkdir(exist_ok=True)
+            os.replace(path, trash / f"{uuid.uuid4().hex}-{path.name}")
+        except FileNotFoundError:
+            return False
+        except OSError:
+            # Rename failed (e.g. a file open on Windows); delete in place instead
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    return False
+            return True
+        self._wake_deleter.set()
+        return True
+
+    def discard_session(self, session_id: str):
+        """Discard everything a session stored; returns immediately"""
+        for root in self.session_roots:
+            self.discard(root / session_id)
+
+    def empty_trash(self):
+        """Delete everything discarded so far"""
+        for root in self._trash_roots():
+            trash = root / TRASH_DIR_NAME
+            if not trash.is_dir():
+                continue
+            for entry in trash.iterdir():
+                if entry.is_dir() and not entry.is_symlink():
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(entry)
+                    except OSError:
+                        pass
+
+    def _trash_roots(self) -> List[Path]:
+        return self.session_roots + ([self.partial_dir] if self.partial_dir is not None else [])
+
+    def _trash_for(self, path: Path) -> Path:
+        """Trash folder of the managed root holding path (the same filesystem, so moving is a rename)"""
+        resolved = path.resolve()
+        for root in self._trash_roots():
+            if root.resolve() in resolved.parents:
+                return root / TRASH_DIR_NAME
+        raise ValueError(f"{path} is not under a folder the janitor manages")
+
+    # Eviction
+
+    def _scan_sessions(self) -> Dict[str, List[Dict]]:
+        """Files per session: path, size, inode and last use"""
+        sessions = defaultdict(list)
+        for root in self.session_roots:
+            if not root.is_dir():
+                continue
+            for folder in root.iterdir():
+                if folder.name.startswith('.') or not folder.is_dir():
+                    continue
+                files = sessions[folder.name]
+                for path in folder.rglob('*'):
+                    try:
+                        info = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    if not path.is_file():
+                        continue
+                    files.append({
+                        'path': path,
+                        'size': info.st_size,
+                        'inode': (info.st_dev, info.st_ino),
+                        'last_used': info.st_mtime
+                    })
+        return sessions
+
+    def _protected(self) -> set:
+        """Resolved paths of files unfinished jobs still need"""
+        if self.in_use is None:
+            return set()
+        return {Path(path).resolve() for path in self.in_use()}
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Run one eviction pass.
+
+        Returns:
+            Counts of what was evicted, by reason
+        """
+        now = time.time() if now is None else now
+        stats = {'expired': 0, 'session_quota': 0, 'global_quota': 0, 'session_files': 0,
+                 'partial_uploads': 0, 'blobs': 0}
+        sessions = self._scan_sessions()
+
+        # Inputs and outputs of queued and running jobs count as used right now,
+        # which keeps them out of every pass below
+        protected = self._protected()
+        if protected:
+            for files in sessions.values():
+                for entry in files:
+                    if entry['path'].resolve() in protected:
+                        entry['last_used'] = now
+
+        # Anything unused for max_age goes, and sessions left empty with it
+        for session_id, files in sessions.items():
+            had_files = bool(files)
+            kept = []
+            for entry in files:
+                if now - entry['last_used'] > self.max_age:
+                    self.discard(entry['path'])
+                    stats['expired'] += 1
+                else:
+                    kept.append(entry)
+            files[:] = kept
+            if not kept:
+                for root in self.session_roots:
+                    folder = root / session_id
+                    if folder.is_dir() and (had_files or now - folder.stat().st_mtime > self.max_age):
+                        self.discard(folder)
+
+        # Then each session's least recently used files until it fits its quota
+        for files in sessions.values():
+            usage = sum(entry['size'] for entry in files)
+            files.sort(key=lambda entry: entry['last_used'])
+            while usage > self.session_quota and files and now - files[0]['last_used'] > self.min_age:
+                entry = files.pop(0)
+                self.discard(entry['path'])
+                usage -= entry['size']
+                stats['session_quota'] += 1
+
+        # Then globally; hardlinked copies share their bytes, so only the last
+        # link of an inode frees anything
+        links = defaultdict(int)
+        sizes = {}
+        for files in sessions.values():
+            for entry in files:
+                links[entry['inode']] += 1
+                sizes[entry['inode']] = entry['size']
+        usage = sum(sizes.values())
+        candidates = sorted((entry for files in sessions.values() for entry in files),
+                            key=lambda entry: entry['last_used'])
+        for entry in candidates:
+            if usage <= self.global_quota or now - entry['last_used'] <= self.min_age:
+                break
+            self.discard(entry['path'])
+            links[entry['inode']] -= 1
+            if links[entry['inode']] == 0:
+                usage -= entry['size']
+            stats['global_quota'] += 1
+
+        # Session files are small; this runs off the request path, so delete directly
+        if self.session_file_dir is not None and self.session_file_dir.is_dir():
+            for path in self.session_file_dir.iterdir():
+                try:
+                    if path.is_file() and now - path.stat().st_mtime > self.max_age:
+                        os.remove(path)
+                        stats['session_files'] += 1
+                except FileNotFoundError:
+                    pass
+
+        if self.partial_dir is not None and self.partial_dir.is_dir():
+            for folder in self.partial_dir.iterdir():
+                if folder.name != TRASH_DIR_NAME and now - folder.stat().st_mtime > self.max_age:
+                    self.discard(folder)
+                    stats['partial_uploads'] += 1
+
+        # Already off the request path; trashed links must be gone before blobs can be pruned
+        self.empty_trash()
+        if self.upload_store is not None:
+            stats['blobs'] = self.upload_store.prune()
+        return stats
+
+    # Background threads
+
+    def _acquire_sweep_lock(self) -> bool:
+        """
+        Become this host's sweeper, unless another process already is.
+
+        Every web worker (and Streamlit) starts a janitor; only the holder of an
+        exclusive lock on SWEEP_LOCK_NAME sweeps, so quota passes never race.
+        The lock is released when its process exits, and another takes over.
+        """
+        if self._sweep_lock_file is not None:
+            return True
+        root = self.session_roots[0]
+        root.mkdir(parents=True, exist_ok=True)
+        lock_file = open(root / SWEEP_LOCK_NAME, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._sweep_lock_file = lock_file
+        return True
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.interval):
+            if not self._acquire_sweep_lock():
+                continue
+            try:
+                stats = self.sweep()
+            except Exception as e:
+                print(f"Janitor sweep failed: {e}")
+                continue
+            if any(stats.values()):
+                print(f"Janitor: {stats}")
+
+    def _delete_loop(self):
+        while not self._stop.is_set():
+            self._wake_deleter.wait(self.interval)
+            self._wake_deleter.clear()
+            self.empty_trash()
+
+    def start(self) -> 'Janitor':
+        """Start the sweep and delete threads (daemons, so they never block exit)"""
+        if not self._threads:
+            for target, name in ((self._sweep_loop, 'janitor-sweep'), (self._delete_loop, 'janitor-delete')):
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake_deleter.set()
+
+
+_shared_janitor: Optional[Janitor] = None
+_shared_lock = threading.Lock()
+
+
+def start_shared_janitor(*args, **kwargs) -> Janitor:
+    """
+    Start the process-wide janitor once and return it.
+
+    Script-style apps (Streamlit re-runs its script on every interaction) can
+    call this every time; later calls return the running instance.
+    """
+    global _shared_janitor
+    with _shared_lock:
+        if _shared_janitor is None:
+            _shared_janitor = Janitor(*args, **kwargs).start()
+        return _shared_janitor
@@ -0,0 +1,395 @@
+"""
+Jobs - Extraction and validation job bodies
+
+The same code runs on the web app's in-process pool and in standalone
+worker processes (worker.py); all state goes through the TaskStore.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from janitor import touch
+from pdf_manager import PDFManager, CancelToken, OperationCancelled
+from task_store import JOB_LEASE_SECONDS, TaskStore
+
+
+# Seconds between checks of the task store for a cancel request
+CANCEL_POLL_INTERVAL = 0.5
+
+# Seconds between checks while another job computes the same result
+MEMO_WAIT_INTERVAL = 0.25
+
+# Seconds between heartbeats of a memo entry being computed (well within
+# task_store.MEMO_HEARTBEAT_TIMEOUT)
+MEMO_HEARTBEAT_INTERVAL = 10
+
+# Seconds between checks for the next file of a batch that is still uploading
+UPLOAD_WAIT_INTERVAL = 0.1
+
+# Seconds between lease renewals of a running job; several fit in one lease
+LEASE_RENEW_INTERVAL = JOB_LEASE_SECONDS / 4
+
+# Seconds between maintain_store passes of web and worker processes
+MAINTENANCE_INTERVAL = 60
+
+
+class StoreCancelToken(CancelToken):
+    """CancelToken that also picks up cancel requests recorded in the task store by any process"""
+
+    def __init__(self, store: TaskStore, task_id: str, poll_interval: float = CANCEL_POLL_INTERVAL):
+        super().__init__()
+        self.store = store
+        self.task_id = task_id
+        self.poll_interval = poll_interval
+        self.last_poll = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set():
+            now = time.monotonic()
+            if now - self.last_poll >= self.poll_interval:
+                self.last_poll = now
+                if self.store.is_cancel_requested(self.task_id):
+                    self.cancel()
+        return self._event.is_set()
+
+
+def memo_key(operation: str, content_hash: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Memo key for running `operation` with `options` on a file with the given SHA-256"""
+    key_data = json.dumps([operation, content_hash, options or {}], sort_keys=True)
+    return hashlib.sha256(key_data.encode()).hexdigest()
+
+
+def keep_memo_alive(store: TaskStore, key: str, owner: str, stop: threading.Event):
+    """Heartbeat a pending memo entry until stop is set (runs on its own thread)"""
+    while not stop.wait(MEMO_HEARTBEAT_INTERVAL):
+        try:
+            store.heartbeat_memo(key, owner)
+        except Exception as e:
+            print(f"Could not heartbeat memo entry {key}: {e}")
+
+
+def run_memoized(store: TaskStore, key: str, owner: str, compute: Callable[[], Dict[str, Any]],
+                 cancel_token: CancelToken,
+                 is_usable: Callable[[Dict[str, Any]], bool] = lambda result: True) -> Tuple[Dict[str, Any], bool]:
+    """
+    Get a result from the memo table, or compute it exactly once.
+
+    Jobs asking for a key that another job is computing wait for that result
+    instead of repeating the work, for as long as that job keeps sending
+    heartbeats. Failures are not memoized.
+
+    Returns:
+        (result, cached) where cached is False only for the job that computed it
+    """
+    while True:
+        state, result = store.claim_memo(key, owner)
+        if state == 'hit':
+            if is_usable(result):
+                return result, True
+            store.abandon_memo(key)
+            continue
+        if state == 'owner':
+            stop_heartbeat = threading.Event()
+            threading.Thread(target=keep_memo_alive, args=(store, key, owner, stop_heartbeat),
+                             name=f'memo-{key[:12]}', daemon=True).start()
+            try:
+                result = compute()
+            except BaseException:
+                store.abandon_memo(key, owner)
+                raise
+            finally:
+                stop_heartbeat.set()
+            store.complete_memo(key, result)
+            return result, False
+        cancel_token.raise_if_cancelled()
+        time.sleep(MEMO_WAIT_INTERVAL)
+
+
+def link_or_copy(source: str, destination: str):
+    """Give `destination` the contents of `source`, as a hardlink where possible"""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def make_progress_callback(store: TaskStore, task_id: str):
+    """
+    Progress callback for PDFManager that records page-level progress as task events.
+    
+    The task record is left alone: rewriting it (results and all) on every tick
+    would hold the store's write lock in a second transaction per page update.
+    """
+    def report(info: Dict[str, Any]):
+        store.push_event(task_id, 'page_progress', info)
+    return report
+
+
+def mark_task_cancelled(store: TaskStore, task_id: str):
+    """Record that a task stopped because it was cancelled"""
+    store.update_task(task_id, status='cancelled')
+    store.push_event(task_id, 'cancelled', {'status': 'cancelled'})
+
+
+def mark_task_failed(store: TaskStore, task_id: str, error: Exception):
+    store.update_task(task_id, status='error', error=str(error))
+    store.push_event(task_id, 'failed', {'error': str(error)})
+
+
+def mark_task_completed(store: TaskStore, task_id: str, **fields):
+    store.update_task(task_id, status='completed', **fields)
+    store.push_event(task_id, 'complete', {'status': 'completed'})
+
+
+def iter_job_files(store: TaskStore, task_id: str, payload: Dict[str, Any],
+                   cancel_token: CancelToken) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    Yield (index, files known so far, file_info) for each file of a batch job.
+
+    A payload with 'uploading' set is still receiving files (see
+    TaskStore.add_job_file); wait for each next file until the upload ends,
+    so processing overlaps the rest of the upload.
+    """
+    files = payload['files']
+    uploading = payload.get('uploading', False)
+    idx = 0
+    while True:
+        if idx < len(files):
+            yield idx, len(files), files[idx]
+            idx += 1
+            continue
+        if not uploading or cancel_token.cancelled:
+            return
+        time.sleep(UPLOAD_WAIT_INTERVAL)
+        payload = store.get_job_payload(task_id) or {}
+        files = payload.get('files', files)
+        uploading = payload.get('uploading', False)
+
+
+def extract_file(store: TaskStore, task_id: str, manager: PDFManager, file_info: Dict[str, Any],
+                 options: Dict[str, Any], progress_callback, cancel_token: CancelToken) -> Dict[str, Any]:
+    """Extract one file, reusing a memoized result for identical content and options"""
+    output_path = file_info['output_path']
+    touch(file_info['input_path'])
+
+    def compute():
+        result = manager.extract_question_pages(file_info['input_path'], output_path, **options,
+                                                progress_callback=progress_callback,
+                                                cancel_token=cancel_token)
+        orig_pages, new_pages, questions, is_valid, missing, max_q = result
+        return {
+            'orig_pages': orig_pages,
+            'new_pages': new_pages,
+            'questions': list(questions),  # Convert to list for JSON
+            'is_valid': is_valid,
+            'missing': list(missing),  # Convert to list for JSON
+            'max_question': max_q,
+            **manager.last_extraction_stats,
+            'output_path': output_path
+        }
+
+    if not file_info.get('sha256'):
+        return {**compute(), 'cached': False}
+
+    result, cached = run_memoized(
+        store, memo_key('extract', file_info['sha256'], options), task_id, compute, cancel_token,
+        is_usable=lambda memo: os.path.exists(memo['output_path'])
+    )
+    if result['output_path'] != output_path:
+        link_or_copy(result['output_path'], output_path)
+    return {**result, 'output_path': output_path, 'cached': cached}
+
+
+def validate_file(store: TaskStore, task_id: str, manager: PDFManager, file_info: Dict[str, Any],
+                  progress_callback, cancel_token: CancelToken) -> Dict[str, Any]:
+    """Validate one file, reusing a memoized result for identical content"""
+    touch(file_info['input_path'])
+    def compute():
+        is_valid, missing, max_q = manager.validate_question_continuity(
+            file_info['input_path'], progress_callback, cancel_token
+        )
+        return {'is_valid': is_valid, 'missing': list(missing), 'max_question': max_q}
+
+    if not file_info.get('sha256'):
+        return {**compute(), 'cached': False}
+
+    result, cached = run_memoized(store, memo_key('validate', file_info['sha256']), task_id, compute, cancel_token)
+    return {**result, 'cached': cached}
+
+
+def extract_single(store: TaskStore, task_id: str, payload: Dict[str, Any], cancel_token: CancelToken):
+    """Extract question pages from one PDF"""
+    manager = PDFManager()
+    try:
+        store.update_task(task_id, status='processing')
+        result = extract_file(store, task_id, manager, payload, payload['options'],
+                              make_progress_callback(store, task_id), cancel_token)
+
+        mark_task_completed(
+            store, task_id,
+            input_name=payload['input_name'],
+            output_name=payload['output_name'],
+            **result
+        )
+    except OperationCancelled:
+        mark_task_cancelled(store, task_id)
+    except Exception as e:
+        mark_task_failed(store, task_id, e)
+
+
+def extract_batch(store: TaskStore, task_id: str, payload: Dict[str, Any], cancel_token: CancelToken):
+    """Extract question pages from several PDFs, recording each result as it finishes"""
+    manager = PDFManager()
+    progress_callback = make_progress_callback(store, task_id)
+
+    for idx, total, file_info in iter_job_files(store, task_id, payload, cancel_token):
+        if cancel_token.cancelled:
+            break
+        input_filename = file_info['input_name']
+
+        store.update_task(task_id, progress=f"{idx + 1}/{total}")
+        store.push_event(task_id, 'file_started', {'index': idx, 'total': total, 'name': input_filename})
+
+        try:
+            smart_name = manager.generate_smart_filename(input_filename)
+            result = extract_file(store, task_id, manager, file_info, payload['options'],
+                                  progress_callback, cancel_token)
+
+            file_result = {
+                'input_name': input_filename,
+                'output_name': smart_name,
+                **result,
+                'error': None
+            }
+        except OperationCancelled:
+            break
+        except Exception as e:
+            file_result = {
+                'input_name': input_filename,
+                'output_name': '',
+                'output_path': '',
+                'orig_pages': 0,
+                'new_pages': 0,
+                'questions': [],
+                'is_valid': False,
+                'missing': [],
+                'max_question': 0,
+                'error': str(e)
+            }
+        store.append_result(task_id, file_result)
+        store.push_event(task_id, 'file_finished', {'index': idx, 'total': total, 'result': file_result})
+
+    if cancel_token.cancelled:
+        mark_task_cancelled(store, task_id)
+    else:
+        mark_task_completed(store, task_id)
+
+
+def validate_single(store: TaskStore, task_id: str, payload: Dict[str, Any], cancel_token: CancelToken):
+    """Validate question continuity of one PDF"""
+    manager = PDFManager()
+    try:
+        store.update_task(task_id, status='processing')
+        result = validate_file(store, task_id, manager, payload, make_progress_callback(store, task_id), cancel_token)
+
+        mark_task_completed(store, task_id, file_name=payload['input_name'], **result)
+    except OperationCancelled:
+        mark_task_cancelled(store, task_id)
+    except Exception as e:
+        mark_task_failed(store, task_id, e)
+
+
+def validate_batch(store: TaskStore, task_id: str, payload: Dict[str, Any], cancel_token: CancelToken):
+    """Validate several PDFs, recording each result as it finishes"""
+    manager = PDFManager()
+    progress_callback = make_progress_callback(store, task_id)
+
+    for idx, total, file_info in iter_job_files(store, task_id, payload, cancel_token):
+        if cancel_token.cancelled:
+            break
+        input_filename = file_info['input_name']
+
+        store.update_task(task_id, progress=f"{idx + 1}/{total}")
+        store.push_event(task_id, 'file_started', {'index': idx, 'total': total, 'name': input_filename})
+
+        try:
+            result = validate_file(store, task_id, manager, file_info, progress_callback, cancel_token)
+
+            file_result = {
+                'file_name': input_filename,
+                **result,
+                'error': None
+            }
+        except OperationCancelled:
+            break
+        except Exception as e:
+            file_result = {
+                'file_name': input_filename,
+                'is_valid': False,
+                'missing': [],
+                'max_question': 0,
+                'error': str(e)
+            }
+        store.append_result(task_id, file_result)
+        store.push_event(task_id, 'file_finished', {'index': idx, 'total': total, 'result': file_result})
+
+    if cancel_token.cancelled:
+        mark_task_cancelled(store, task_id)
+    else:
+        mark_task_completed(store, task_id)
+
+
+JOB_HANDLERS = {
+    'extract_single': extract_single,
+    'extract_batch': extract_batch,
+    'validate_single': validate_single,
+    'validate_batch': validate_batch,
+}
+
+
+def keep_lease(store: TaskStore, task_id: str, stop: threading.Event):
+    """Renew a running job's lease until stop is set (runs on its own thread)"""
+    while not stop.wait(LEASE_RENEW_INTERVAL):
+        try:
+            store.renew_job(task_id)
+        except Exception as e:
+            print(f"Could not renew the lease of {task_id}: {e}")
+
+
+def fail_expired_jobs(store: TaskStore) -> int:
+    """Fail the tasks of running jobs whose worker stopped renewing their lease"""
+    task_ids = store.expire_jobs()
+    for task_id in task_ids:
+        mark_task_failed(store, task_id, RuntimeError('The worker running this task stopped; please try again'))
+    return len(task_ids)
+
+
+def maintain_store(store: TaskStore):
+    """Fail jobs whose worker died and delete old finished tasks"""
+    expired = fail_expired_jobs(store)
+    purged = store.purge_tasks()
+    if expired or purged:
+        print(f"Task store: failed {expired} expired job(s), deleted {purged} old task(s)")
+
+
+def run_job(store: TaskStore, task_id: str, kind: str, payload: Dict[str, Any]):
+    """Run a claimed job to completion and mark it done, renewing its lease meanwhile"""
+    stop_lease = threading.Event()
+    threading.Thread(target=keep_lease, args=(store, task_id, stop_lease),
+                     name=f'lease-{task_id}', daemon=True).start()
+    try:
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None:
+            mark_task_failed(store, task_id, ValueError(f"Unknown job kind: {kind}"))
+            return
+        handler(store, task_id, payload, StoreCancelToken(store, task_id))
+    finally:
+        stop_lease.set()
+        store.finish_job(task_id)
@@ -2,14 +2,214 @@
 PDF Editor - Main Application
 A desktop application for loading, viewing, manipulating, and merging PDF files.
 """
+import multiprocessing
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional, Sequence, Tuple
 import threading
 
-from pdf_manager import PDFManager
-from pdf_viewer import PDFViewer
+from batch_pool import CANCELLED, BatchPool, extract_file, validate_file
+from pdf_manager import PDFManager, describe_progress
+from pdf_viewer import PDFViewer, PhotoImageCache, render_thumbnail_ppm
+
+
+# Page grid geometry. Only tiles in the rows in view (plus OVERSCAN_ROWS above
+# and below) exist as widgets; the grid frame is sized for all of them.
+TILE_WIDTH = 190
+TILE_HEIGHT = 300
+TILE_PADDING = 10
+OVERSCAN_ROWS = 1
+DEFAULT_GRID_COLUMNS = 5
+
+# Used before the canvas is mapped and has a real height
+DEFAULT_VIEW_HEIGHT = 800
+
+# Thumbnails are rendered by worker processes and drawn as they arrive
+THUMBNAIL_WIDTH = 150
+THUMBNAIL_WORKERS = 2
+
+# Milliseconds between polls of a running batch for progress and finished files
+BATCH_POLL_MS = 100
+
+# Row status filters of batch result tables
+RESULT_FILTERS = {
+    'All': None,
+    'Valid': ('valid',),
+    'Warnings': ('warning', 'info'),
+    'Errors': ('error',),
+}
+
+
+class ResultsTable:
+    """
+    Batch results as rows of a ttk.Treeview backed by the results list.
+    
+    Each result becomes one Treeview item (no widgets per result), so hundreds
+    of files appear at once and scroll natively. Filtering detaches items and
+    sorting moves them; nothing is rebuilt. The selected row's details are
+    shown below the table.
+    
+    Args:
+        parent: Parent widget; pack or grid the table's .frame
+        columns: (heading, width) per column; the first column is the result number
+        row: Maps (index, result) to the column values, used for display and sorting
+        status: Maps a result to 'valid', 'warning', 'info' or 'error'
+        describe: Maps a result to the detail text shown when it is selected
+        on_change: Called after results are added
+    """
+    
+    STATUS_COLORS = {'valid': 'green', 'warning': 'darkorange', 'info': 'gray', 'error': 'red'}
+    
+    def __init__(self, parent, columns: Sequence[Tuple[str, int]],
+                 row: Callable[[int, dict], tuple], status: Callable[[dict], str],
+                 describe: Callable[[dict], str], on_change: Optional[Callable[[], None]] = None):
+        self.row = row
+        self.status = status
+        self.describe = describe
+        self.on_change = on_change
+        self.results: List[dict] = []
+        self.values: List[tuple] = []
+        self.sort_column = 0
+        self.sort_descending = False
+        
+        self.frame = ttk.Frame(parent)
+        
+        # Filter bar
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(filter_frame, text="Show:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar(value='All')
+        filter_box = ttk.Combobox(
+            filter_frame,
+            textvariable=self.filter_var,
+            values=list(RESULT_FILTERS),
+            state='readonly',
+            width=10
+        )
+        filter_box.pack(side=tk.LEFT, padx=(5, 15))
+        filter_box.bind('<<ComboboxSelected>>', lambda e: self.apply())
+        
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.apply())
+        ttk.Entry(filter_frame, textvariable=self.search_var, width=30).pack(side=tk.LEFT, padx=5)
+        
+        self.count_label = ttk.Label(filter_frame, text="", foreground="gray")
+        self.count_label.pack(side=tk.RIGHT)
+        
+        # Table
+        table_frame = ttk.Frame(self.frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.headings = [heading for heading, _ in columns]
+        self.tree = ttk.Treeview(
+            table_frame,
+            columns=[str(i) for i in range(len(columns))],
+            show='headings',
+            selectmode='browse'
+        )
+        for i, (heading, width) in enumerate(columns):
+            self.tree.heading(str(i), text=heading, command=lambda col=i: self.sort_by(col))
+            self.tree.column(str(i), width=width, anchor=tk.W if i == 1 else tk.CENTER, stretch=i == 1)
+        for tag, color in self.STATUS_COLORS.items():
+            self.tree.tag_configure(tag, foreground=color)
+        
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        
+        # Details of the selected result
+        self.detail_label = ttk.Label(
+            self.frame,
+            text="Select a row to see details",
+            font=("Arial", 9),
+            foreground="gray",
+            wraplength=820,
+            justify=tk.LEFT
+        )
+        self.detail_label.pack(fill=tk.X, pady=(8, 0))
+    
+    def _insert(self, result: dict) -> int:
+        index = len(self.results)
+        self.results.append(result)
+        self.values.append(self.row(index, result))
+        self.tree.insert('', tk.END, iid=str(index), values=self.values[index], tags=(self.status(result),))
+        return index
+    
+    def add(self, result: dict):
+        """Append one result while the table is shown, placing only its own row"""
+        index = self._insert(result)
+        if not self.matches(index):
+            self.tree.detach(str(index))
+        else:
+            key = self._row_key(index)
+            shown = [int(iid) for iid in self.tree.get_children() if iid != str(index)]
+            if self.sort_descending:
+                position = sum(1 for i in shown if self._row_key(i) >= key)
+            else:
+                position = sum(1 for i in shown if self._row_key(i) <= key)
+            self.tree.move(str(index), '', position)
+        self._update_count()
+        if self.on_change is not None:
+            self.on_change()
+    
+    def extend(self, results: Sequence[dict]):
+        for result in results:
+            self._insert(result)
+        self.apply()
+        if self.on_change is not None:
+            self.on_change()
+    
+    def matches(self, index: int) -> bool:
+        statuses = RESULT_FILTERS[self.filter_var.get()]
+        if statuses is not None and self.status(self.results[index]) not in statuses:
+            return False
+        search = self.search_var.get().strip().lower()
+        return not search or search in str(self.values[index][1]).lower()
+    
+    def apply(self):
+        """Re-filter and re-sort the existing rows"""
+        shown = [i for i in range(len(self.results)) if self.matches(i)]
+        shown.sort(key=self._row_key, reverse=self.sort_descending)
+        
+        shown_ids = {str(i) for i in shown}
+        hidden = [iid for iid in self.tree.get_children() if iid not in shown_ids]
+        if hidden:
+            self.tree.detach(*hidden)
+        for position, i in enumerate(shown):
+            self.tree.move(str(i), '', position)
+        self._update_count()
+    
+    def _update_count(self):
+        self.count_label.config(text=f"Showing {len(self.tree.get_children())} of {len(self.results)}")
+    
+    def sort_by(self, column: int):
+        """Sort by a column; sorting by it again reverses the order"""
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+        for i, heading in enumerate(self.headings):
+            arrow = (" ▼" if self.sort_descending else " ▲") if i == column else ""
+            self.tree.heading(str(i), text=heading + arrow)
+        self.apply()
+    
+    def _row_key(self, index: int):
+        # Numbers before text, so numeric columns sort numerically
+        value = self.values[index][self.sort_column]
+        if isinstance(value, (int, float)):
+            return (0, value, '')
+        return (1, 0, str(value).lower())
+    
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.detail_label.config(text=self.describe(self.results[int(selection[0])]))
 
 
 class PDFEditorApp:
@@ -22,6 +222,18 @@ class PDFEditorApp:
         self.selected_pdf_id: Optional[str] = None
         self.selected_pages = set()  # Track selected page widgets
         
+        # Virtualized page grid state
+        self.grid_pages: List[dict] = []  # Pages of the selected PDF in grid order
+        self.grid_columns = DEFAULT_GRID_COLUMNS
+        self.visible_tiles = {}  # page_id -> tile widget currently created
+        self.pending_thumbnails = {}  # page_id -> Future of its thumbnail render
+        self.thumbnail_executor: Optional[ProcessPoolExecutor] = None
+        # Decoded thumbnails by (pdf path, page index, width), so revisiting a PDF is instant
+        self.thumbnail_cache = PhotoImageCache()
+        
+        # Batch extraction/validation running on worker processes, if any
+        self.batch_pool: Optional[BatchPool] = None
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -116,6 +328,7 @@ class PDFEditorApp:
         
         v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL)
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.page_scrollbar = v_scrollbar
         
         h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -123,7 +336,7 @@ class PDFEditorApp:
         self.page_canvas = tk.Canvas(
             canvas_frame,
             bg="white",
-            yscrollcommand=v_scrollbar.set,
+            yscrollcommand=self.on_canvas_yview,
             xscrollcommand=h_scrollbar.set
         )
         self.page_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -179,6 +392,18 @@ class PDFEditorApp:
         )
         self.extract_btn.pack(side=tk.LEFT, padx=10)
         
+        # Page-level progress of the running extraction/validation
+        self.progress_label = ttk.Label(bottom_bar, text="", font=("Arial", 9))
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        
+        self.cancel_batch_btn = ttk.Button(
+            bottom_bar,
+            text="Cancel Batch",
+            command=self.cancel_batch,
+            state=tk.DISABLED
+        )
+        self.cancel_batch_btn.pack(side=tk.LEFT, padx=10)
+        
         # Validation section
         validation_frame = ttk.Frame(bottom_bar)
         validation_frame.pack(side=tk.RIGHT, padx=10)
@@ -207,6 +432,18 @@ class PDFEditorApp:
         canvas_width = event.width
         self.page_canvas.itemconfig(self.canvas_window, width=canvas_width)
         
+        columns = max(1, (canvas_width - TILE_PADDING) // (TILE_WIDTH + TILE_PADDING))
+        if columns != self.grid_columns:
+            self.grid_columns = columns
+            self.layout_page_grid()
+        else:
+            self.update_visible_tiles()
+        
+    def on_canvas_yview(self, first, last):
+        """Keep the scrollbar in sync and create tiles for rows scrolled into view"""
+        self.page_scrollbar.set(first, last)
+        self.update_visible_tiles()
+        
     def on_mousewheel(self, event):
         """Handle mousewheel scrolling"""
         if event.num == 5 or event.delta < 0:
@@ -228,8 +465,8 @@ class PDFEditorApp:
         
         # Clear UI
         self.pdf_listbox.delete(0, tk.END)
-        for widget in self.page_frame.winfo_children():
-            widget.destroy()
+        self.clear_page_grid()
+        self.thumbnail_cache.discard(lambda key: True)
         self.main_title.config(text="Select a PDF to view pages")
         self.update_page_count()
         
@@ -283,6 +520,7 @@ class PDFEditorApp:
         
         if index < len(pdf_ids):
             self.selected_pdf_id = pdf_ids[index]
+            self.page_canvas.yview_moveto(0)
             self.display_pages()
             
     def display_pages(self):
@@ -291,8 +529,7 @@ class PDFEditorApp:
             return
             
         # Clear existing pages
-        for widget in self.page_frame.winfo_children():
-            widget.destroy()
+        self.clear_page_grid()
             
         pdf_info = self.pdf_manager.get_pdf_info(self.selected_pdf_id)
         if not pdf_info:
@@ -300,30 +537,138 @@ class PDFEditorApp:
             
         self.main_title.config(text=f"{pdf_info['name']}")
         
-        # Create page thumbnails in grid
-        pages = self.pdf_manager.get_pages_for_pdf(self.selected_pdf_id)
+        # Tiles are created as their rows scroll into view
+        self.grid_pages = self.pdf_manager.get_pages_for_pdf(self.selected_pdf_id)
         
         # Clear selection
         self.selected_pages.clear()
         
-        cols = 5  # Number of columns in grid
-        for idx, page in enumerate(pages):
-            row = idx // cols
-            col = idx % cols
-            
-            # Pass PDF path to enable thumbnail generation
-            page_widget = PDFViewer.create_page_widget(
-                self.page_frame,
-                page,
-                pdf_info['path'],  # Pass the PDF file path
-                lambda p=page: self.remove_page(p),
-                lambda w=None, p=page: self.toggle_page_selection(w, p)
+        self.layout_page_grid()
+        
+    def clear_page_grid(self):
+        """Destroy all page tiles and drop thumbnail renders nobody will see"""
+        for tile in self.visible_tiles.values():
+            tile.destroy()
+        self.visible_tiles.clear()
+        for future in self.pending_thumbnails.values():
+            future.cancel()
+        self.pending_thumbnails.clear()
+        self.grid_pages = []
+        self.page_canvas.itemconfig(self.canvas_window, height=1)
+        
+    def layout_page_grid(self):
+        """Size the grid frame for every page of the selected PDF and recreate the visible tiles"""
+        for tile in self.visible_tiles.values():
+            tile.destroy()
+        self.visible_tiles.clear()
+        
+        rows = -(-len(self.grid_pages) // self.grid_columns)
+        height = TILE_PADDING + rows * (TILE_HEIGHT + TILE_PADDING)
+        self.page_canvas.itemconfig(self.canvas_window, height=height)
+        self.update_visible_tiles()
+        
+    def update_visible_tiles(self):
+        """Create tiles for the rows in view and destroy those scrolled away"""
+        if not self.grid_pages:
+            return
+        
+        row_height = TILE_HEIGHT + TILE_PADDING
+        view_height = self.page_canvas.winfo_height()
+        if view_height <= 1:
+            view_height = DEFAULT_VIEW_HEIGHT
+        top = self.page_canvas.canvasy(0)
+        first_row = max(0, int(top // row_height) - OVERSCAN_ROWS)
+        last_row = int((top + view_height) // row_height) + OVERSCAN_ROWS
+        first = first_row * self.grid_columns
+        last = min(len(self.grid_pages), (last_row + 1) * self.grid_columns)
+        wanted = {page['id']: (index, page) for index, page in enumerate(self.grid_pages[first:last], start=first)}
+        
+        for page_id in [page_id for page_id in self.visible_tiles if page_id not in wanted]:
+            self.visible_tiles.pop(page_id).destroy()
+            future = self.pending_thumbnails.pop(page_id, None)
+            if future is not None:
+                future.cancel()
+        
+        for page_id, (index, page) in wanted.items():
+            if page_id not in self.visible_tiles:
+                self.visible_tiles[page_id] = self.create_page_tile(index, page)
+        
+    def create_page_tile(self, index, page):
+        """Create and place the tile for one page; its thumbnail is rendered in the background"""
+        pdf_path = self.pdf_manager.get_pdf_info(page['pdf_id'])['path']
+        tile = PDFViewer.create_page_widget(
+            self.page_frame,
+            page,
+            pdf_path,
+            lambda p=page: self.remove_page(p),
+            lambda w=None, p=page: self.toggle_page_selection(w, p),
+            render_thumbnail=False
+        )
+        if page['id'] in self.selected_pages:
+            tile.configure(relief=tk.SUNKEN, borderwidth=4)
+        
+        row, col = divmod(index, self.grid_columns)
+        tile.place(
+            x=TILE_PADDING + col * (TILE_WIDTH + TILE_PADDING),
+            y=TILE_PADDING + row * (TILE_HEIGHT + TILE_PADDING),
+            width=TILE_WIDTH,
+            height=TILE_HEIGHT
+        )
+        cache_key = (pdf_path, page['page_index'], THUMBNAIL_WIDTH)
+        thumbnail = self.thumbnail_cache.get(cache_key)
+        if thumbnail is not None:
+            PDFViewer.set_page_thumbnail(tile, thumbnail)
+        else:
+            self.request_thumbnail(page['id'], cache_key)
+        return tile
+        
+    def request_thumbnail(self, page_id, cache_key):
+        """Render a page thumbnail in a worker process; on_thumbnail_rendered() draws it"""
+        if self.thumbnail_executor is None:
+            # Forking a multithreaded Tk process can deadlock the child, so workers are spawned
+            self.thumbnail_executor = ProcessPoolExecutor(
+                max_workers=THUMBNAIL_WORKERS, mp_context=multiprocessing.get_context('spawn')
             )
-            page_widget.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-            
-        # Make grid responsive
-        for i in range(cols):
-            self.page_frame.grid_columnconfigure(i, weight=1)
+        
+        future = self.thumbnail_executor.submit(render_thumbnail_ppm, *cache_key)
+        self.pending_thumbnails[page_id] = future
+        future.add_done_callback(lambda f: self.deliver_thumbnail(page_id, cache_key, f))
+        
+    def deliver_thumbnail(self, page_id, cache_key, future):
+        """Hand a finished render to the Tk thread (called on the executor's thread)"""
+        if future.cancelled():
+            return
+        try:
+            self.root.after(0, lambda: self.on_thumbnail_rendered(page_id, cache_key, future))
+        except (RuntimeError, tk.TclError):
+            pass  # The window has been closed
+        
+    def on_thumbnail_rendered(self, page_id, cache_key, future):
+        """Cache a rendered thumbnail and draw it if its tile still exists"""
+        if self.pending_thumbnails.get(page_id) is future:
+            del self.pending_thumbnails[page_id]
+        
+        try:
+            ppm_bytes = future.result()
+            thumbnail = PDFViewer.photo_image_from_ppm(ppm_bytes, master=self.root) if ppm_bytes else None
+        except Exception as e:
+            print(f"Error generating thumbnail: {e}")
+            thumbnail = None
+        if thumbnail is not None:
+            self.thumbnail_cache.put(cache_key, thumbnail)
+        
+        tile = self.visible_tiles.get(page_id)
+        if tile is not None and tile.winfo_exists():
+            PDFViewer.set_page_thumbnail(tile, thumbnail)
+        
+    def shutdown(self):
+        """Stop thumbnail and batch workers and close the window"""
+        if self.thumbnail_executor is not None:
+            self.thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+        if self.batch_pool is not None:
+            self.batch_pool.cancel()
+            self.batch_pool.shutdown()
+        self.root.destroy()
             
     def remove_page(self, page):
         """Remove a single page"""
@@ -368,8 +713,8 @@ class PDFEditorApp:
             self.selected_pdf_id = None
             
             # Clear page display
-            for widget in self.page_frame.winfo_children():
-                widget.destroy()
+            self.clear_page_grid()
+            self.thumbnail_cache.discard(lambda key: key[0] == pdf_info['path'])
             self.main_title.config(text="Select a PDF to view pages")
             
             self.refresh_pdf_list()
@@ -432,6 +777,69 @@ class PDFEditorApp:
             text="Merge & Download PDF"
         ))
     
+    def make_progress_callback(self, prefix=""):
+        """Progress callback for PDFManager that shows page progress in the bottom bar"""
+        def report(info):
+            text = f"{prefix}{describe_progress(info)}"
+            self.root.after(0, lambda: self.progress_label.config(text=text))
+        return report
+    
+    def clear_progress(self):
+        """Clear the page progress text (safe to call from worker threads)"""
+        self.root.after(0, lambda: self.progress_label.config(text=""))
+    
+    def start_batch(self, pool, table, file_names, title):
+        """
+        Follow a running BatchPool from the Tk main loop until every file is done
+        
+        Args:
+            pool: BatchPool with all files submitted
+            table: ResultsTable that finished files are added to
+            file_names: File name per submitted index, for progress text
+            title: Results window title, e.g. "Batch Extraction"
+        """
+        self.batch_pool = pool
+        self.extract_btn.config(state=tk.DISABLED)
+        self.validate_btn.config(state=tk.DISABLED)
+        self.cancel_batch_btn.config(state=tk.NORMAL, text="Cancel Batch")
+        results = []  # Kept here too, the results window may be closed before the batch ends
+        latest = {'text': ''}
+        
+        def poll():
+            for result in pool.collect():
+                results.append(result)
+                if table.frame.winfo_exists():
+                    table.add(result)
+            for index, text in pool.progress().items():
+                latest['text'] = f"{file_names[index]}: {text}"
+            
+            if not pool.done:
+                self.progress_label.config(text=f"{pool.completed}/{pool.total} done  {latest['text']}")
+                self.root.after(BATCH_POLL_MS, poll)
+                return
+            
+            pool.shutdown()
+            self.batch_pool = None
+            self.extract_btn.config(state=tk.NORMAL, text="✂️ Extract Questions Only")
+            self.validate_btn.config(state=tk.NORMAL, text="📋 Validate Questions")
+            self.cancel_batch_btn.config(state=tk.DISABLED, text="Cancel Batch")
+            if pool.cancelled:
+                completed = sum(1 for result in results if result['error'] != CANCELLED)
+                self.progress_label.config(text=f"Batch cancelled: {completed} of {pool.total} files completed")
+            else:
+                self.progress_label.config(text=f"Batch complete: {pool.total} files")
+            if table.frame.winfo_exists():
+                suffix = " (cancelled)" if pool.cancelled else ""
+                table.frame.winfo_toplevel().title(f"{title} Results - {pool.total} PDFs{suffix}")
+        
+        poll()
+    
+    def cancel_batch(self):
+        """Cancel the running batch: running files stop at their next page, queued ones never start"""
+        if self.batch_pool is not None:
+            self.batch_pool.cancel()
+            self.cancel_batch_btn.config(state=tk.DISABLED, text="Cancelling...")
+    
     def extract_question_pages(self):
         """Extract only pages with question numbers - offers single or batch mode"""
         # Ask user: single or multiple PDFs?
@@ -478,14 +886,18 @@ class PDFEditorApp:
         # Run extraction in background thread
         def extract_worker():
             try:
-                result = self.pdf_manager.extract_question_pages(input_path, output_path)
+                result = self.pdf_manager.extract_question_pages(
+                    input_path, output_path, progress_callback=self.make_progress_callback()
+                )
                 orig_pages, new_pages, questions, is_valid, missing, max_q = result
                 
+                self.clear_progress()
                 self.root.after(0, lambda: self.show_extraction_results(
                     input_path, output_path, orig_pages, new_pages, 
                     questions, is_valid, missing, max_q
                 ))
             except Exception as e:
+                self.clear_progress()
                 self.root.after(0, lambda: messagebox.showerror(
                     "Extraction Error",
                     f"Failed to extract question pages:\n{str(e)}"
@@ -521,59 +933,26 @@ class PDFEditorApp:
         if not output_folder:
             return
         
-        # Run batch extraction in background thread
-        def batch_extract_worker():
-            results = []
-            
-            for input_path in input_paths:
-                # Generate smart output filename
-                smart_name = self.pdf_manager.generate_smart_filename(Path(input_path).name)
-                output_path = Path(output_folder) / smart_name
-                
-                try:
-                    result = self.pdf_manager.extract_question_pages(input_path, str(output_path))
-                    orig_pages, new_pages, questions, is_valid, missing, max_q = result
-                    
-                    results.append({
-                        'input_path': input_path,
-                        'input_name': Path(input_path).name,
-                        'output_path': str(output_path),
-                        'output_name': smart_name,
-                        'orig_pages': orig_pages,
-                        'new_pages': new_pages,
-                        'questions': questions,
-                        'is_valid': is_valid,
-                        'missing': missing,
-                        'max_question': max_q,
-                        'error': None
-                    })
-                except Exception as e:
-                    results.append({
-                        'input_path': input_path,
-                        'input_name': Path(input_path).name,
-                        'output_path': '',
-                        'output_name': '',
-                        'orig_pages': 0,
-                        'new_pages': 0,
-                        'questions': [],
-                        'is_valid': False,
-                        'missing': [],
-                        'max_question': 0,
-                        'error': str(e)
-                    })
-            
-            self.root.after(0, lambda: self.show_batch_extraction_results(results, output_folder))
-        
-        # Show loading state
-        self.extract_btn.config(state=tk.DISABLED, text=f"Extracting {len(input_paths)} PDFs...")
-        thread = threading.Thread(target=batch_extract_worker, daemon=True)
-        thread.start()
-        
-        # Re-enable button after a delay
-        self.root.after(5000, lambda: self.extract_btn.config(
-            state=tk.NORMAL,
-            text="✂️ Extract Questions Only"
-        ))
+        # Smart output names, made unique so no two files write to the same output
+        output_paths = []
+        used_names = set()
+        for input_path in input_paths:
+            smart_name = self.pdf_manager.generate_smart_filename(Path(input_path).name)
+            name, number = smart_name, 2
+            while name.lower() in used_names:
+                name = f"{Path(smart_name).stem} ({number}){Path(smart_name).suffix}"
+                number += 1
+            used_names.add(name.lower())
+            output_paths.append(str(Path(output_folder) / name))
+        
+        # Files run concurrently on worker processes; results appear as they finish
+        pool = BatchPool()
+        for idx, (input_path, output_path) in enumerate(zip(input_paths, output_paths)):
+            pool.submit(extract_file, idx, input_path, output_path)
+        
+        table = self.show_batch_extraction_results([], output_folder, total=len(input_paths))
+        self.extract_btn.config(text=f"Extracting {len(input_paths)} PDFs...")
+        self.start_batch(pool, table, [Path(path).name for path in input_paths], "Batch Extraction")
     
     def show_extraction_results(self, input_path, output_path, orig_pages, 
                                 new_pages, questions, is_valid, missing, max_q):
@@ -761,11 +1140,23 @@ class PDFEditorApp:
         except Exception as e:
             messagebox.showerror("Error", f"Could not open folder:\n{str(e)}")
     
-    def show_batch_extraction_results(self, results, output_folder):
-        """Display batch extraction results in a comprehensive window"""
+    def show_batch_extraction_results(self, results, output_folder, total=None):
+        """
+        Display batch extraction results in a comprehensive window
+        
+        Args:
+            results: Results available so far
+            output_folder: Folder the extracted PDFs are written to
+            total: Number of PDFs in the batch, if more results are still to come
+        
+        Returns:
+            The ResultsTable, for adding results as they arrive
+        """
+        total = len(results) if total is None else total
+        
         # Create results window
         results_window = tk.Toplevel(self.root)
-        results_window.title(f"Batch Extraction Results - {len(results)} PDFs")
+        results_window.title(f"Batch Extraction Results - {total} PDFs")
         results_window.geometry("900x700")
         results_window.transient(self.root)
         
@@ -779,24 +1170,26 @@ class PDFEditorApp:
         
         title_label = ttk.Label(
             header_frame,
-            text=f"✂️ Batch Extraction Results - {len(results)} PDF(s)",
+            text=f"✂️ Batch Extraction Results - {total} PDF(s)",
             font=("Arial", 14, "bold")
         )
         title_label.pack(side=tk.LEFT)
         
-        # Summary statistics
-        success_count = sum(1 for r in results if not r['error'])
-        error_count = sum(1 for r in results if r['error'])
-        valid_count = sum(1 for r in results if r['is_valid'] and not r['error'])
-        warning_count = sum(1 for r in results if not r['is_valid'] and not r['error'])
-        
-        summary_label = ttk.Label(
-            header_frame,
-            text=f"✅ {success_count} Success  |  ✅ {valid_count} Valid  |  ⚠️ {warning_count} Warnings  |  ❌ {error_count} Errors",
-            font=("Arial", 9)
-        )
+        # Summary statistics, updated as results arrive
+        summary_label = ttk.Label(header_frame, text="", font=("Arial", 9))
         summary_label.pack(side=tk.RIGHT)
         
+        def update_summary():
+            results = table.results
+            success_count = sum(1 for r in results if not r['error'])
+            error_count = sum(1 for r in results if r['error'])
+            valid_count = sum(1 for r in results if r['is_valid'] and not r['error'])
+            warning_count = sum(1 for r in results if not r['is_valid'] and not r['error'])
+            text = f"✅ {success_count} Success  |  ✅ {valid_count} Valid  |  ⚠️ {warning_count} Warnings  |  ❌ {error_count} Errors"
+            if len(results) < total:
+                text = f"⏳ {total - len(results)} Running  |  " + text
+            summary_label.config(text=text)
+        
         # Output folder info
         folder_frame = ttk.Frame(main_frame)
         folder_frame.pack(fill=tk.X, pady=(0, 10))
@@ -817,28 +1210,11 @@ class PDFEditorApp:
         )
         open_folder_btn.pack(side=tk.RIGHT)
         
-        # Scrollable results area
-        canvas_frame = ttk.Frame(main_frame)
-        canvas_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        canvas = tk.Canvas(canvas_frame, bg="white")
-        scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor=tk.NW)
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Display each result
-        for idx, result in enumerate(results):
-            self.create_extraction_card(scrollable_frame, result, idx)
+        # Results table, one row per PDF
+        table = self.create_extraction_table(main_frame)
+        table.on_change = update_summary
+        table.frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        table.extend(results)
         
         # Button frame
         button_frame = ttk.Frame(main_frame)
@@ -858,104 +1234,43 @@ class PDFEditorApp:
         x = (results_window.winfo_screenwidth() // 2) - (results_window.winfo_width() // 2)
         y = (results_window.winfo_screenheight() // 2) - (results_window.winfo_height() // 2)
         results_window.geometry(f"+{x}+{y}")
-        
-        # Enable mousewheel scrolling
-        def on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
+        return table
     
-    def create_extraction_card(self, parent, result, index):
-        """Create a card displaying extraction result for one PDF"""
-        # Card frame with border
-        card = ttk.LabelFrame(
-            parent,
-            text=f"#{index + 1}: {result['input_name']}",
-            padding=15
-        )
-        card.pack(fill=tk.X, pady=5, padx=5)
-        
-        # Content frame
-        content = ttk.Frame(card)
-        content.pack(fill=tk.BOTH, expand=True)
-        
-        if result['error']:
-            # Error case
-            icon_label = ttk.Label(content, text="❌", font=("Arial", 24))
-            icon_label.pack(side=tk.LEFT, padx=(0, 15))
-            
-            info_frame = ttk.Frame(content)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            status_label = ttk.Label(
-                info_frame,
-                text="Extraction failed",
-                font=("Arial", 11, "bold"),
-                foreground="red"
-            )
-            status_label.pack(anchor=tk.W)
-            
-            error_label = ttk.Label(
-                info_frame,
-                text=f"Error: {result['error']}",
-                font=("Arial", 9),
-                foreground="gray",
-                wraplength=700
-            )
-            error_label.pack(anchor=tk.W, pady=(2, 0))
-            
-        else:
-            # Success case
-            if result['is_valid']:
-                icon_label = ttk.Label(content, text="✅", font=("Arial", 24))
-            else:
-                icon_label = ttk.Label(content, text="⚠️", font=("Arial", 24))
-            icon_label.pack(side=tk.LEFT, padx=(0, 15))
-            
-            info_frame = ttk.Frame(content)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            # Output filename
-            output_label = ttk.Label(
-                info_frame,
-                text=f"→ {result['output_name']}",
-                font=("Arial", 11, "bold"),
-                foreground="blue"
-            )
-            output_label.pack(anchor=tk.W)
-            
-            # Statistics
+    def create_extraction_table(self, parent):
+        """Results table for batch extraction"""
+        def row(index, result):
+            number = result.get('index', index) + 1
+            if result['error']:
+                return (number, result['input_name'], '', '', '', '', "❌ Error")
             reduction = result['orig_pages'] - result['new_pages']
-            reduction_pct = (reduction / result['orig_pages'] * 100) if result['orig_pages'] > 0 else 0
-            
-            stats_text = f"Pages: {result['orig_pages']} → {result['new_pages']} (removed {reduction}, {reduction_pct:.1f}% reduction)"
+            reduction_pct = round(reduction / result['orig_pages'] * 100, 1) if result['orig_pages'] > 0 else 0
+            status = "✅ Valid" if result['is_valid'] else f"⚠️ Missing {len(result['missing'])}"
+            return (number, result['input_name'], result['output_name'],
+                    f"{result['orig_pages']} → {result['new_pages']}", reduction_pct,
+                    len(result['questions']), status)
+        
+        def status(result):
+            if result['error']:
+                return 'error'
+            return 'valid' if result['is_valid'] else 'warning'
+        
+        def describe(result):
+            if result['error']:
+                return f"{result['input_name']}: extraction failed\nError: {result['error']}"
+            reduction = result['orig_pages'] - result['new_pages']
+            text = f"{result['input_name']} → {result['output_name']}\n"
+            text += f"Pages: {result['orig_pages']} → {result['new_pages']} (removed {reduction})"
             if result['questions']:
-                stats_text += f"  |  Questions: {min(result['questions'])}-{max(result['questions'])}"
-            
-            stats_label = ttk.Label(
-                info_frame,
-                text=stats_text,
-                font=("Arial", 9),
-                foreground="gray"
-            )
-            stats_label.pack(anchor=tk.W, pady=(2, 0))
-            
-            # Validation status
+                text += f"  |  Questions: {min(result['questions'])}-{max(result['questions'])}"
             if result['is_valid']:
-                validation_label = ttk.Label(
-                    info_frame,
-                    text="✓ All questions present",
-                    font=("Arial", 9),
-                    foreground="green"
-                )
-                validation_label.pack(anchor=tk.W, pady=(2, 0))
+                text += "\n✓ All questions present"
             else:
-                validation_label = ttk.Label(
-                    info_frame,
-                    text=f"⚠ Missing {len(result['missing'])} question(s): {', '.join(str(m) for m in result['missing'][:10])}{'...' if len(result['missing']) > 10 else ''}",
-                    font=("Arial", 9),
-                    foreground="orange"
-                )
-                validation_label.pack(anchor=tk.W, pady=(2, 0))
+                text += f"\n⚠ Missing {len(result['missing'])} question(s): {self.format_missing_list_compact(result['missing'])}"
+            return text
+        
+        columns = [("#", 50), ("File", 260), ("Output", 200), ("Pages", 90),
+                   ("Reduction %", 90), ("Questions", 80), ("Status", 110)]
+        return ResultsTable(parent, columns, row, status, describe)
     
     def validate_questions(self):
         """Validate question continuity - offers single or batch mode"""
@@ -988,11 +1303,15 @@ class PDFEditorApp:
         # Run validation in background thread
         def validate_worker():
             try:
-                is_valid, missing, max_q = self.pdf_manager.validate_question_continuity(file_path)
+                is_valid, missing, max_q = self.pdf_manager.validate_question_continuity(
+                    file_path, self.make_progress_callback()
+                )
+                self.clear_progress()
                 self.root.after(0, lambda: self.show_validation_results(
                     file_path, is_valid, missing, max_q
                 ))
             except Exception as e:
+                self.clear_progress()
                 self.root.after(0, lambda: messagebox.showerror(
                     "Validation Error",
                     f"Failed to validate PDF:\n{str(e)}"
@@ -1019,43 +1338,14 @@ class PDFEditorApp:
         if not file_paths:
             return
         
-        # Run batch validation in background thread
-        def batch_validate_worker():
-            results = []
-            
-            for file_path in file_paths:
-                try:
-                    is_valid, missing, max_q = self.pdf_manager.validate_question_continuity(file_path)
-                    results.append({
-                        'file_path': file_path,
-                        'file_name': Path(file_path).name,
-                        'is_valid': is_valid,
-                        'missing': missing,
-                        'max_question': max_q,
-                        'error': None
-                    })
-                except Exception as e:
-                    results.append({
-                        'file_path': file_path,
-                        'file_name': Path(file_path).name,
-                        'is_valid': False,
-                        'missing': [],
-                        'max_question': 0,
-                        'error': str(e)
-                    })
-            
-            self.root.after(0, lambda: self.show_batch_validation_results(results))
-        
-        # Show loading state
-        self.validate_btn.config(state=tk.DISABLED, text=f"Validating {len(file_paths)} PDFs...")
-        thread = threading.Thread(target=batch_validate_worker, daemon=True)
-        thread.start()
+        # Files run concurrently on worker processes; results appear as they finish
+        pool = BatchPool()
+        for idx, file_path in enumerate(file_paths):
+            pool.submit(validate_file, idx, file_path)
         
-        # Re-enable button after a delay
-        self.root.after(3000, lambda: self.validate_btn.config(
-            state=tk.NORMAL,
-            text="📋 Validate Questions"
-        ))
+        table = self.show_batch_validation_results([], total=len(file_paths))
+        self.validate_btn.config(text=f"Validating {len(file_paths)} PDFs...")
+        self.start_batch(pool, table, [Path(path).name for path in file_paths], "Batch Validation")
     
     def show_validation_results(self, file_path, is_valid, missing, max_question):
         """Display validation results in a popup window"""
@@ -1249,11 +1539,22 @@ class PDFEditorApp:
         
         return "\n".join(result)
     
-    def show_batch_validation_results(self, results):
-        """Display batch validation results in a comprehensive window"""
+    def show_batch_validation_results(self, results, total=None):
+        """
+        Display batch validation results in a comprehensive window
+        
+        Args:
+            results: Results available so far
+            total: Number of PDFs in the batch, if more results are still to come
+        
+        Returns:
+            The ResultsTable, for adding results as they arrive
+        """
+        total = len(results) if total is None else total
+        
         # Create results window
         results_window = tk.Toplevel(self.root)
-        results_window.title(f"Batch Validation Results - {len(results)} PDFs")
+        results_window.title(f"Batch Validation Results - {total} PDFs")
         results_window.geometry("900x700")
         results_window.transient(self.root)
         
@@ -1267,45 +1568,30 @@ class PDFEditorApp:
         
         title_label = ttk.Label(
             header_frame,
-            text=f"Validation Results for {len(results)} PDF(s)",
+            text=f"Validation Results for {total} PDF(s)",
             font=("Arial", 14, "bold")
         )
         title_label.pack(side=tk.LEFT)
         
-        # Summary statistics
-        valid_count = sum(1 for r in results if r['is_valid'] and not r['error'])
-        invalid_count = sum(1 for r in results if not r['is_valid'] and not r['error'])
-        error_count = sum(1 for r in results if r['error'])
-        
-        summary_label = ttk.Label(
-            header_frame,
-            text=f"✅ {valid_count} Valid  |  ⚠️ {invalid_count} Issues  |  ❌ {error_count} Errors",
-            font=("Arial", 10)
-        )
+        # Summary statistics, updated as results arrive
+        summary_label = ttk.Label(header_frame, text="", font=("Arial", 10))
         summary_label.pack(side=tk.RIGHT)
         
-        # Scrollable results area
-        canvas_frame = ttk.Frame(main_frame)
-        canvas_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        canvas = tk.Canvas(canvas_frame, bg="white")
-        scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor=tk.NW)
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Display each result
-        for idx, result in enumerate(results):
-            self.create_result_card(scrollable_frame, result, idx)
+        def update_summary():
+            results = table.results
+            valid_count = sum(1 for r in results if r['is_valid'] and not r['error'])
+            invalid_count = sum(1 for r in results if not r['is_valid'] and not r['error'])
+            error_count = sum(1 for r in results if r['error'])
+            text = f"✅ {valid_count} Valid  |  ⚠️ {invalid_count} Issues  |  ❌ {error_count} Errors"
+            if len(results) < total:
+                text = f"⏳ {total - len(results)} Running  |  " + text
+            summary_label.config(text=text)
+        
+        # Results table, one row per PDF
+        table = self.create_validation_table(main_frame)
+        table.on_change = update_summary
+        table.frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        table.extend(results)
         
         # Button frame
         button_frame = ttk.Frame(main_frame)
@@ -1315,7 +1601,7 @@ class PDFEditorApp:
         export_btn = ttk.Button(
             button_frame,
             text="💾 Export to Text File",
-            command=lambda: self.export_batch_results(results),
+            command=lambda: self.export_batch_results(self.ordered_results(table.results)),
             width=20
         )
         export_btn.pack(side=tk.LEFT, padx=(0, 10))
@@ -1324,7 +1610,7 @@ class PDFEditorApp:
         copy_btn = ttk.Button(
             button_frame,
             text="📋 Copy to Clipboard",
-            command=lambda: self.copy_batch_results(results),
+            command=lambda: self.copy_batch_results(self.ordered_results(table.results)),
             width=20
         )
         copy_btn.pack(side=tk.LEFT)
@@ -1343,126 +1629,49 @@ class PDFEditorApp:
         x = (results_window.winfo_screenwidth() // 2) - (results_window.winfo_width() // 2)
         y = (results_window.winfo_screenheight() // 2) - (results_window.winfo_height() // 2)
         results_window.geometry(f"+{x}+{y}")
-        
-        # Enable mousewheel scrolling
-        def on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
+        return table
     
-    def create_result_card(self, parent, result, index):
-        """Create a card displaying validation result for one PDF"""
-        # Card frame with border
-        card = ttk.LabelFrame(
-            parent,
-            text=f"#{index + 1}: {result['file_name']}",
-            padding=15
-        )
-        card.pack(fill=tk.X, pady=5, padx=5)
-        
-        # Content frame
-        content = ttk.Frame(card)
-        content.pack(fill=tk.BOTH, expand=True)
-        
-        if result['error']:
-            # Error case
-            icon_label = ttk.Label(content, text="❌", font=("Arial", 24))
-            icon_label.pack(side=tk.LEFT, padx=(0, 15))
-            
-            info_frame = ttk.Frame(content)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            status_label = ttk.Label(
-                info_frame,
-                text="Error during validation",
-                font=("Arial", 11, "bold"),
-                foreground="red"
-            )
-            status_label.pack(anchor=tk.W)
-            
-            error_label = ttk.Label(
-                info_frame,
-                text=f"Error: {result['error']}",
-                font=("Arial", 9),
-                foreground="gray"
-            )
-            error_label.pack(anchor=tk.W, pady=(2, 0))
-            
-        elif result['max_question'] == 0:
-            # No questions found
-            icon_label = ttk.Label(content, text="ℹ️", font=("Arial", 24))
-            icon_label.pack(side=tk.LEFT, padx=(0, 15))
-            
-            info_frame = ttk.Frame(content)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            status_label = ttk.Label(
-                info_frame,
-                text="No questions found",
-                font=("Arial", 11),
-                foreground="gray"
-            )
-            status_label.pack(anchor=tk.W)
-            
-        elif result['is_valid']:
-            # Valid - all questions present
-            icon_label = ttk.Label(content, text="✅", font=("Arial", 24))
-            icon_label.pack(side=tk.LEFT, padx=(0, 15))
-            
-            info_frame = ttk.Frame(content)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            status_label = ttk.Label(
-                info_frame,
-                text=f"All questions present (1-{result['max_question']})",
-                font=("Arial", 11, "bold"),
-                foreground="green"
-            )
-            status_label.pack(anchor=tk.W)
-            
-            count_label = ttk.Label(
-                info_frame,
-                text=f"Total: {result['max_question']} questions",
-                font=("Arial", 9),
-                foreground="gray"
-            )
-            count_label.pack(anchor=tk.W, pady=(2, 0))
-            
-        else:
-            # Invalid - missing questions
-            icon_label = ttk.Label(content, text="⚠️", font=("Arial", 24))
-            icon_label.pack(side=tk.LEFT, padx=(0, 15))
-            
-            info_frame = ttk.Frame(content)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            status_label = ttk.Label(
-                info_frame,
-                text=f"Missing {len(result['missing'])} question(s)",
-                font=("Arial", 11, "bold"),
-                foreground="red"
-            )
-            status_label.pack(anchor=tk.W)
-            
-            range_label = ttk.Label(
-                info_frame,
-                text=f"Expected: 1-{result['max_question']}  |  Missing: {self.format_missing_list_compact(result['missing'])}",
-                font=("Arial", 9),
-                foreground="gray"
-            )
-            range_label.pack(anchor=tk.W, pady=(2, 0))
-            
-            # Special warning for missing Q1
+    def create_validation_table(self, parent):
+        """Results table for batch validation"""
+        def row(index, result):
+            number = result.get('index', index) + 1
+            if result['error']:
+                return (number, result['file_name'], '', '', "❌ Error")
+            if result['max_question'] == 0:
+                return (number, result['file_name'], 0, 0, "ℹ️ No questions")
+            status = "✅ Valid" if result['is_valid'] else f"⚠️ Missing {len(result['missing'])}"
+            return (number, result['file_name'], result['max_question'], len(result['missing']), status)
+        
+        def status(result):
+            if result['error']:
+                return 'error'
+            if result['max_question'] == 0:
+                return 'info'
+            return 'valid' if result['is_valid'] else 'warning'
+        
+        def describe(result):
+            if result['error']:
+                return f"{result['file_name']}: error during validation\nError: {result['error']}"
+            if result['max_question'] == 0:
+                return f"{result['file_name']}: no questions found"
+            if result['is_valid']:
+                return f"{result['file_name']}: all questions present (1-{result['max_question']})"
+            text = (f"{result['file_name']}: missing {len(result['missing'])} question(s)\n"
+                    f"Expected: 1-{result['max_question']}  |  Missing: {self.format_missing_list_compact(result['missing'])}")
             if 1 in result['missing']:
-                warning_label = ttk.Label(
-                    info_frame,
-                    text="⚠️ Critical: Question 1 missing!",
-                    font=("Arial", 9, "bold"),
-                    foreground="orange"
-                )
-                warning_label.pack(anchor=tk.W, pady=(2, 0))
+                text += "\n⚠️ Critical: Question 1 missing!"
+            return text
+        
+        columns = [("#", 50), ("File", 380), ("Max Question", 100), ("Missing", 80), ("Status", 130)]
+        return ResultsTable(parent, columns, row, status, describe)
+    
+    @staticmethod
+    def ordered_results(results):
+        """Batch results in the order the files were selected (they arrive as they finish)"""
+        return sorted(results, key=lambda result: result.get('index', 0))
     
     def format_missing_list_compact(self, missing):
-        """Format missing numbers compactly for card display"""
+        """Format missing numbers compactly for result details"""
         if not missing:
             return "None"
         if len(missing) <= 10:
@@ -1576,6 +1785,7 @@ class PDFEditorApp:
 def main():
     root = tk.Tk()
     app = PDFEditorApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.shutdown)
     root.mainloop()
 
 
@@ -1,18 +1,348 @@
 """
 PDF Manager - Handles PDF document operations
 """
+import multiprocessing
+import os
 import re
+import shutil
+import tempfile
+import threading
+import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 from PyPDF2 import PdfReader, PdfWriter
 import fitz  # PyMuPDF
 
+# Optional: pikepdf (qpdf) writes linearized "fast web view" PDFs.
+# MuPDF no longer supports linearization, so without it outputs are left as-is.
+try:
+    import pikepdf
+    PIKEPDF_AVAILABLE = True
+except ImportError:
+    PIKEPDF_AVAILABLE = False
+
+
+# Worker processes of the pool shared by parallel merges and image recompression
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', max(1, min(4, os.cpu_count() or 1))))
+
+# merge_all merges in parallel from this many pages on, unless told otherwise
+PARALLEL_MERGE_MIN_PAGES = int(os.environ.get('PARALLEL_MERGE_MIN_PAGES', 2000))
+
+# Pages per partial output in the parallel merge
+MERGE_CHUNK_PAGES = 250
+
+# Number of partial outputs combined by each node of the merge tree
+MERGE_FAN_IN = 16
+
+# Named save profiles for extraction output, from fastest save to smallest file.
+# garbage=4 (duplicate stream sweep) and clean are the slow parts on big documents;
+# use_objstms packs small objects into compressed object streams.
+SAVE_PROFILES = {
+    'fast': {'garbage': 1},
+    'balanced': {'garbage': 2, 'deflate': True, 'use_objstms': 1},
+    'smallest': {'garbage': 4, 'deflate': True, 'clean': True, 'use_objstms': 1},
+}
+DEFAULT_SAVE_PROFILE = 'smallest'
+
+# JPEG quality used when images are downsampled during extraction
+DEFAULT_IMAGE_QUALITY = 75
+
+# Question headings searched for by validation and extraction
+QUESTION_PATTERN = re.compile(r'\bquestion\s+(\d+)\b', re.IGNORECASE)
+
+# Minimum seconds between progress callbacks within a phase
+PROGRESS_INTERVAL = 0.1
+
+# Receives a dict: phase, done, total, pages_per_sec, eta_seconds
+ProgressCallback = Callable[[Dict[str, object]], None]
+
+# A PDF on disk, or one already in memory: bytes, a memoryview (such as an
+# upload's buffer) or a binary file object like io.BytesIO
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+PROGRESS_PHASE_LABELS = {
+    'scan': 'Scanning pages',
+    'copy': 'Copying pages',
+    'save': 'Saving',
+    'validate': 'Checking output',
+}
+
+
+def describe_progress(info: Dict[str, object]) -> str:
+    """Format a progress dict as e.g. "Scanning pages: 340/1000 pages · 85.0 pages/s · ETA 8s" """
+    label = PROGRESS_PHASE_LABELS.get(info['phase'], info['phase'])
+    text = f"{label}: {info['done']}/{info['total']} pages"
+    if info['pages_per_sec']:
+        text += f" · {info['pages_per_sec']} pages/s"
+    if info['eta_seconds']:
+        text += f" · ETA {int(info['eta_seconds'] + 0.999)}s"
+    return text
+
+
+class OperationCancelled(Exception):
+    """Raised when a long-running operation stops because its CancelToken was cancelled"""
+
+
+class CancelToken:
+    """
+    Cooperative cancellation flag shared between a caller and a running operation.
+    
+    cancel() may be called from any thread; operations check the token between
+    pages and stop by raising OperationCancelled.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise OperationCancelled("Operation cancelled")
+
+
+def check_question_continuity(found_questions) -> Tuple[bool, List[int], int]:
+    """
+    Check that question numbers run from 1 to their maximum without gaps.
+    
+    Returns:
+        (is_valid, missing question numbers, maximum question number or 0)
+    """
+    found_questions = set(found_questions)
+    if not found_questions:
+        return True, [], 0
+    max_question = max(found_questions)
+    missing_questions = sorted(set(range(1, max_question + 1)) - found_questions)
+    return len(missing_questions) == 0, missing_questions, max_question
+
+
+def _check_cancelled(cancel_token: Optional[CancelToken]):
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+
+class ProgressReporter:
+    """
+    Throttled page-level progress for long-running PDF operations.
+    
+    The first and last update of every phase are always delivered; updates in
+    between are dropped if they arrive within PROGRESS_INTERVAL of the previous one.
+    """
+    
+    def __init__(self, callback: Optional[ProgressCallback], interval: Optional[float] = None):
+        self.callback = callback
+        self.interval = PROGRESS_INTERVAL if interval is None else interval
+        self.phase = ''
+        self.total = 0
+        self.started = 0.0
+        self.last_report = 0.0
+    
+    def start(self, phase: str, total: int):
+        """Begin a new phase covering `total` pages"""
+        self.phase = phase
+        self.total = total
+        self.started = time.perf_counter()
+        self.last_report = 0.0
+        self.update(0)
+    
+    def update(self, done: int):
+        """Report that `done` of the phase's pages are finished"""
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        is_boundary = done == 0 or done >= self.total
+        if not is_boundary and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed > 0 and done else 0.0
+        eta = (self.total - done) / rate if rate else None
+        self.callback({
+            'phase': self.phase,
+            'done': done,
+            'total': self.total,
+            'pages_per_sec': round(rate, 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None
+        })
+
+
+_worker_pool: Optional[ProcessPoolExecutor] = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every PDFManager in this process, started on first use.
+    
+    Workers are spawned, not forked: callers run on Flask, Tk and Streamlit
+    threads, and forking a multithreaded process that holds MuPDF state can
+    deadlock the child.
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                               mp_context=multiprocessing.get_context('spawn'))
+        return _worker_pool
+
+
+def _map_in_workers(function: Callable, args: List[tuple], workers: Optional[int] = None) -> list:
+    """
+    Call function(*call_args) for every entry of args on the shared pool and
+    return the results in order, with at most `workers` calls running at once.
+    
+    Inside a worker process (a batch pool file) the calls run inline instead:
+    there the files themselves are already processed in parallel.
+    """
+    global _worker_pool
+    if multiprocessing.parent_process() is not None:
+        return [function(*call_args) for call_args in args]
+
+    pool = get_worker_pool()
+    limit = workers or len(args)
+    results = [None] * len(args)
+    pending = {}
+    try:
+        for position, call_args in enumerate(args):
+            if len(pending) >= limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+            pending[pool.submit(function, *call_args)] = position
+        for future, position in pending.items():
+            results[position] = future.result()
+    except BrokenProcessPool:
+        # A worker died; the next call starts a fresh pool
+        with _worker_pool_lock:
+            if _worker_pool is pool:
+                _worker_pool = None
+        raise
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+    return results
+
+
+def _write_merge_chunk(plan: List[Tuple[str, int]], output_path: str) -> str:
+    """
+    Write the pages of one chunk of a merge plan to a partial PDF.
+    
+    Runs in a worker process, so it only receives plain (path, page_index)
+    pairs. Consecutive pages from the same source are copied as one range.
+    """
+    sources = {}
+    output_doc = fitz.open()
+    try:
+        run_start = 0
+        while run_start < len(plan):
+            path, first_index = plan[run_start]
+            run_end = run_start
+            while (run_end + 1 < len(plan)
+                   and plan[run_end + 1][0] == path
+                   and plan[run_end + 1][1] == plan[run_end][1] + 1):
+                run_end += 1
+            
+            if path not in sources:
+                sources[path] = fitz.open(path)
+            output_doc.insert_pdf(sources[path], from_page=first_index, to_page=plan[run_end][1])
+            run_start = run_end + 1
+        
+        output_doc.save(output_path, garbage=1)
+    finally:
+        output_doc.close()
+        for doc in sources.values():
+            doc.close()
+    return output_path
+
+
+def _combine_merge_parts(part_paths: List[str], output_path: str) -> str:
+    """Concatenate partial merge outputs, in order, into a single PDF"""
+    output_doc = fitz.open()
+    try:
+        for part_path in part_paths:
+            with fitz.open(part_path) as part:
+                output_doc.insert_pdf(part)
+        output_doc.save(output_path, garbage=1)
+    finally:
+        output_doc.close()
+    return output_path
+
+
+def _downsample_image(image_bytes: bytes, width: int, height: int, quality: int) -> Optional[Tuple[bytes, int, int, str]]:
+    """
+    Downsample one extracted image and recompress it as JPEG.
+    
+    Runs in a worker process. Returns (jpeg_bytes, width, height, colorspace)
+    or None if the image cannot be decoded.
+    """
+    try:
+        pix = fitz.Pixmap(image_bytes)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        
+        scaled = fitz.Pixmap(pix, width, height, None)
+        colorspace = '/DeviceGray' if scaled.n == 1 else '/DeviceRGB'
+        return scaled.tobytes('jpg', jpg_quality=quality), scaled.width, scaled.height, colorspace
+    except Exception:
+        return None
+
+
+def open_pdf(source: PdfSource) -> fitz.Document:
+    """
+    Open a PDF from a path or from memory.
+    
+    bytes, memoryviews and BytesIO buffers are handed to MuPDF without being
+    copied or written to disk; other file objects are read into memory.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    if hasattr(source, 'getbuffer'):
+        source = source.getbuffer()
+    elif hasattr(source, 'read'):
+        source.seek(0)
+        source = source.read()
+    return fitz.open(stream=source, filetype='pdf')
+
+
+def linearize_pdf(path: str) -> bool:
+    """
+    Rewrite a PDF in place as linearized ("fast web view"), so the first page
+    can be displayed before the rest of the file has downloaded.
+    
+    Returns:
+        True if the file was linearized, False if pikepdf is not installed
+    """
+    if not PIKEPDF_AVAILABLE:
+        return False
+    
+    temp_path = f"{path}.linearize.tmp"
+    try:
+        with pikepdf.open(path) as pdf:
+            pdf.save(temp_path, linearize=True)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return True
+
 
 class PDFManager:
     def __init__(self):
         self.pdfs: Dict[str, dict] = {}
         self.all_pages: List[dict] = []
+        self.last_extraction_stats: Dict[str, object] = {}
         
     def add_pdf(self, file_path: str) -> str:
         """Add a PDF file to the manager"""
@@ -88,8 +418,40 @@ class PDFManager:
         """Get total number of pages across all PDFs"""
         return len(self.all_pages)
         
-    def merge_all(self, output_path: str):
-        """Merge all pages into a single PDF"""
+    def get_merge_plan(self) -> List[Tuple[str, int]]:
+        """Get (pdf_path, page_index) for every page that will be merged, in order"""
+        return [
+            (self.pdfs[page_info['pdf_id']]['path'], page_info['page_index'])
+            for page_info in self.all_pages
+            if page_info['pdf_id'] in self.pdfs
+        ]
+
+    def merge_all(self, output_path: str, parallel: Optional[bool] = None, workers: Optional[int] = None,
+                  chunk_pages: int = MERGE_CHUNK_PAGES, linearize: bool = False) -> bool:
+        """
+        Merge all pages into a single PDF
+
+        Args:
+            output_path: Path where the merged PDF will be saved
+            parallel: Build partial outputs for chunks of the page plan in worker
+                processes, then combine them in order. None (the default) does so
+                for merges of PARALLEL_MERGE_MIN_PAGES pages or more.
+            workers: Maximum number of chunks processed at once (default: every
+                worker of the shared pool, PDF_WORKERS)
+            chunk_pages: Number of pages in each partial output
+            linearize: Write linearized ("fast web view") output if pikepdf is installed
+            
+        Returns:
+            True if the output was linearized
+        """
+        if parallel is not False:
+            plan = self.get_merge_plan()
+            if parallel is None:
+                parallel = len(plan) >= PARALLEL_MERGE_MIN_PAGES
+            if parallel and len(plan) > chunk_pages:
+                self._merge_parallel(plan, output_path, workers, chunk_pages)
+                return linearize and linearize_pdf(output_path)
+
         writer = PdfWriter()
         
         # Add pages in current order
@@ -110,8 +472,111 @@ class PDFManager:
             raise OSError(f"Failed to write PDF to {output_path}: {str(e)}") from e
         except Exception as e:
             raise Exception(f"Unexpected error writing PDF to {output_path}: {str(e)}") from e
-    
-    def validate_question_continuity(self, pdf_path: str) -> Tuple[bool, List[int], int]:
+        
+        return linearize and linearize_pdf(output_path)
+
+    def _merge_parallel(self, plan: List[Tuple[str, int]], output_path: str,
+                        workers: Optional[int], chunk_pages: int):
+        """
+        Tree-structured merge: chunks of the plan are written to partial PDFs
+        in the shared worker pool, then partials are combined MERGE_FAN_IN at a
+        time (also in parallel) until a final ordered pass writes the output.
+        """
+        temp_dir = tempfile.mkdtemp(prefix='merge_', dir=str(Path(output_path).parent))
+        try:
+            chunks = [plan[i:i + chunk_pages] for i in range(0, len(plan), chunk_pages)]
+            part_paths = _map_in_workers(
+                _write_merge_chunk,
+                [(chunk, os.path.join(temp_dir, f"part_0_{i}.pdf")) for i, chunk in enumerate(chunks)],
+                workers
+            )
+
+            level = 1
+            while len(part_paths) > MERGE_FAN_IN:
+                groups = [part_paths[i:i + MERGE_FAN_IN] for i in range(0, len(part_paths), MERGE_FAN_IN)]
+                part_paths = _map_in_workers(
+                    _combine_merge_parts,
+                    [(group, os.path.join(temp_dir, f"part_{level}_{i}.pdf")) for i, group in enumerate(groups)],
+                    workers
+                )
+                level += 1
+
+            _combine_merge_parts(part_paths, output_path)
+        except OSError as e:
+            raise OSError(f"Failed to write PDF to {output_path}: {str(e)}") from e
+        except Exception as e:
+            raise Exception(f"Unexpected error writing PDF to {output_path}: {str(e)}") from e
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _downsample_images(self, doc, target_dpi: int, quality: int, workers: Optional[int]) -> Dict[str, int]:
+        """
+        Downsample images displayed above target_dpi and recompress them as JPEG.
+
+        Each image is decoded, scaled and encoded on the shared worker pool; the
+        image streams in doc are replaced in place, but only where the result is smaller.
+
+        Returns:
+            Dict with images_recompressed, image_bytes_before, image_bytes_after
+            and image_bytes_saved
+        """
+        # Scale each image for its largest placement (its lowest dpi), so no
+        # placement of a reused image ends up below target_dpi
+        scales = {}
+        for page in doc:
+            for xref, smask, width, height, bpc, colorspace, *_ in page.get_images(full=True):
+                # Skip soft-masked images and 1-bit scans/stencil masks
+                if smask or bpc == 1 or not colorspace:
+                    continue
+                for rect in page.get_image_rects(xref):
+                    if rect.is_empty:
+                        continue
+                    dpi = min(width * 72 / rect.width, height * 72 / rect.height)
+                    scales[xref] = max(scales.get(xref, 0.0), target_dpi / dpi)
+
+        jobs = []
+        for xref, scale in scales.items():
+            if scale >= 1.0:
+                continue
+            info = doc.extract_image(xref)
+            width = max(1, int(info['width'] * scale))
+            height = max(1, int(info['height'] * scale))
+            jobs.append((xref, len(doc.xref_stream_raw(xref)), info['image'], width, height))
+
+        stats = {'images_recompressed': 0, 'image_bytes_before': 0, 'image_bytes_after': 0, 'image_bytes_saved': 0}
+        if not jobs:
+            return stats
+
+        if len(jobs) == 1:
+            _, _, image_bytes, width, height = jobs[0]
+            results = [_downsample_image(image_bytes, width, height, quality)]
+        else:
+            results = _map_in_workers(
+                _downsample_image,
+                [(image_bytes, width, height, quality) for _, _, image_bytes, width, height in jobs],
+                workers
+            )
+
+        for (xref, bytes_before, _, _, _), result in zip(jobs, results):
+            if result is None or len(result[0]) >= bytes_before:
+                continue
+            data, width, height, colorspace = result
+            doc.update_stream(xref, data, compress=False)
+            for key, value in (('Filter', '/DCTDecode'), ('Width', str(width)), ('Height', str(height)),
+                               ('BitsPerComponent', '8'), ('ColorSpace', colorspace),
+                               ('DecodeParms', 'null'), ('Decode', 'null')):
+                doc.xref_set_key(xref, key, value)
+
+            stats['images_recompressed'] += 1
+            stats['image_bytes_before'] += bytes_before
+            stats['image_bytes_after'] += len(data)
+
+        stats['image_bytes_saved'] = stats['image_bytes_before'] - stats['image_bytes_after']
+        return stats
+
+    def validate_question_continuity(self, pdf_path: PdfSource,
+                                     progress_callback: Optional[ProgressCallback] = None,
+                                     cancel_token: Optional[CancelToken] = None) -> Tuple[bool, List[int], int]:
         """
         Validate that question numbers in a PDF are sequential and complete.
         
@@ -119,7 +584,11 @@ class PDFManager:
         verifies that all integers from 1 to the maximum question number exist.
         
         Args:
-            pdf_path: Path to the PDF file to validate
+            pdf_path: Path to the PDF file to validate, or the PDF in memory (see PdfSource)
+            progress_callback: Optional callable receiving throttled progress dicts
+                (phase "scan", done, total, pages_per_sec, eta_seconds)
+            cancel_token: Optional CancelToken checked before every page; raises
+                OperationCancelled once it is cancelled
             
         Returns:
             Tuple containing:
@@ -139,46 +608,47 @@ class PDFManager:
         """
         try:
             # Open PDF with PyMuPDF for fast text extraction
-            doc = fitz.open(pdf_path)
-            
-            # Pattern to match "Question {number}" (case-insensitive)
-            pattern = re.compile(r'\bquestion\s+(\d+)\b', re.IGNORECASE)
+            doc = open_pdf(pdf_path)
             
             # Set to store all found question numbers
             found_questions = set()
             
+            progress = ProgressReporter(progress_callback)
+            progress.start('scan', len(doc))
+            
             # Extract text from all pages and find question numbers
             for page_num in range(len(doc)):
+                _check_cancelled(cancel_token)
                 page = doc[page_num]
                 text = page.get_text()
                 
                 # Find all question numbers on this page
-                matches = pattern.findall(text)
+                matches = QUESTION_PATTERN.findall(text)
                 for match in matches:
                     found_questions.add(int(match))
+                progress.update(page_num + 1)
             
             doc.close()
             
-            # Handle case where no questions were found
-            if not found_questions:
-                return True, [], 0
-            
-            # Find the maximum question number
-            max_question = max(found_questions)
-            
             # Check for missing questions from 1 to max
-            expected_questions = set(range(1, max_question + 1))
-            missing_questions = sorted(expected_questions - found_questions)
-            
-            # Return results
-            is_valid = len(missing_questions) == 0
-            return is_valid, missing_questions, max_question
+            return check_question_continuity(found_questions)
             
+        except OperationCancelled:
+            doc.close()
+            raise
         except Exception as e:
             # If there's an error reading the PDF, raise it
             raise RuntimeError(f"Error validating PDF: {str(e)}")
     
-    def extract_question_pages(self, input_path: str, output_path: str) -> Tuple[int, int, List[int], bool, List[int], int]:
+    def extract_question_pages(self, input_path: PdfSource, output_path: Union[str, BinaryIO],
+                               save_profile: Optional[str] = None,
+                               image_dpi: Optional[int] = None,
+                               image_quality: int = DEFAULT_IMAGE_QUALITY,
+                               image_workers: Optional[int] = None,
+                               linearize: bool = False,
+                               progress_callback: Optional[ProgressCallback] = None,
+                               cancel_token: Optional[CancelToken] = None
+                               ) -> Tuple[int, int, List[int], bool, List[int], int]:
         """
         Extract only pages that contain question numbers, removing all other pages.
         
@@ -187,8 +657,29 @@ class PDFManager:
         result to ensure no questions were dropped.
         
         Args:
-            input_path: Path to the source PDF file
-            output_path: Path where the extracted PDF will be saved
+            input_path: Path to the source PDF file, or the PDF in memory (see PdfSource)
+            output_path: Path where the extracted PDF will be saved, or a writable
+                binary buffer (e.g. io.BytesIO); a buffer output is also re-checked
+                from memory and is never linearized
+            save_profile: Name of a SAVE_PROFILES entry ("fast", "balanced" or
+                "smallest"); defaults to DEFAULT_SAVE_PROFILE. The profile used,
+                its save time and the output size are recorded in
+                last_extraction_stats.
+            image_dpi: If set, images displayed above this resolution are
+                downsampled to it and recompressed as JPEG (in worker processes).
+                The bytes saved are recorded in last_extraction_stats.
+            image_quality: JPEG quality for recompressed images
+            image_workers: Maximum images recompressed at once on the shared worker pool
+            linearize: Write linearized ("fast web view") output if pikepdf is
+                installed; last_extraction_stats['linearized'] records whether it
+                happened (None if it was not asked for)
+            progress_callback: Optional callable receiving throttled progress dicts
+                (phase, done, total, pages_per_sec, eta_seconds) as pages are
+                scanned ("scan"), copied ("copy"), saved ("save") and the output
+                re-checked ("validate")
+            cancel_token: Optional CancelToken checked between pages and phases.
+                Once it is cancelled, open documents are closed, any partial
+                output is deleted and OperationCancelled is raised.
             
         Returns:
             Tuple containing:
@@ -207,31 +698,41 @@ class PDFManager:
             >>> if not valid:
             ...     print(f"WARNING: Missing questions {missing}")
         """
+        profile_name = save_profile or DEFAULT_SAVE_PROFILE
+        if profile_name not in SAVE_PROFILES:
+            raise ValueError(f"Unknown save profile: {profile_name}")
+        self.last_extraction_stats = {}
+        doc = output_doc = None
+        output_written = False
+        output_in_memory = not isinstance(output_path, (str, os.PathLike))
+
         try:
             # Open the source PDF
-            doc = fitz.open(input_path)
+            doc = open_pdf(input_path)
             original_page_count = len(doc)
             
-            # Pattern to match "Question {number}"
-            pattern = re.compile(r'\bquestion\s+(\d+)\b', re.IGNORECASE)
-            
             # Dictionary to map page numbers to question numbers
             page_to_questions = {}
             
             # Always keep the first page (title page)
             page_to_questions[0] = []  # Empty list means it's a title page, not a question page
             
+            progress = ProgressReporter(progress_callback)
+            progress.start('scan', original_page_count)
+            
             # Scan each page for question numbers
             for page_num in range(len(doc)):
+                _check_cancelled(cancel_token)
                 page = doc[page_num]
                 text = page.get_text()
                 
                 # Find all question numbers on this page
-                matches = pattern.findall(text)
+                matches = QUESTION_PATTERN.findall(text)
                 if matches:
                     # Store all unique question numbers found on this page
                     question_nums = sorted(set(int(m) for m in matches))
                     page_to_questions[page_num] = question_nums
+                progress.update(page_num + 1)
             
             # Close the source document
             doc.close()
@@ -241,28 +742,37 @@ class PDFManager:
                 raise ValueError("No pages with question numbers found in the PDF")
             
             # Create new PDF with only question pages
-            doc = fitz.open(input_path)  # Reopen for extraction
+            doc = open_pdf(input_path)  # Reopen for extraction
             output_doc = fitz.open()  # New empty document
             
             # Track which questions we're extracting
             extracted_questions = []
             
+            progress.start('copy', len(page_to_questions))
+            
             # Extract pages in order
-            for page_num in sorted(page_to_questions.keys()):
+            for copied, page_num in enumerate(sorted(page_to_questions.keys()), start=1):
+                _check_cancelled(cancel_token)
+                
                 # Insert the page into the output document
                 output_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
                 
                 # Record which questions are on this page
                 extracted_questions.extend(page_to_questions[page_num])
+                progress.update(copied)
+            
+            # Optionally shrink oversized images before saving
+            image_stats = {}
+            if image_dpi:
+                image_stats = self._downsample_images(output_doc, image_dpi, image_quality, image_workers)
             
-            # Save the output with compression and optimization
+            # Save the output with the selected compression/optimization profile
+            _check_cancelled(cancel_token)
+            progress.start('save', len(page_to_questions))
             try:
-                output_doc.save(
-                    output_path,
-                    garbage=4,  # Maximum garbage collection (removes unused objects)
-                    deflate=True,  # Compress content streams
-                    clean=True  # Clean and optimize the PDF structure
-                )
+                save_start = time.perf_counter()
+                output_doc.save(output_path, **SAVE_PROFILES[profile_name])
+                save_seconds = time.perf_counter() - save_start
             except OSError as e:
                 # Handle disk full, permission errors, quota exceeded, etc.
                 output_doc.close()
@@ -273,15 +783,32 @@ class PDFManager:
                 doc.close()
                 raise Exception(f"Unexpected error saving PDF to {output_path}: {str(e)}") from e
             
+            output_written = True
             output_doc.close()
             doc.close()
             
+            linearized = (not output_in_memory and linearize_pdf(output_path)) if linearize else None
+            progress.update(len(page_to_questions))
+            
+            self.last_extraction_stats = {
+                'save_profile': profile_name,
+                'save_seconds': round(save_seconds, 3),
+                'output_bytes': output_path.tell() if output_in_memory else os.path.getsize(output_path),
+                'linearized': linearized,
+                **image_stats
+            }
+            
             # Get statistics
             extracted_page_count = len(page_to_questions)
             unique_questions = sorted(set(extracted_questions))
             
             # Validate the extracted PDF
-            is_valid, missing, max_question = self.validate_question_continuity(output_path)
+            validate_callback = None
+            if progress_callback is not None:
+                validate_callback = lambda info: progress_callback({**info, 'phase': 'validate'})
+            is_valid, missing, max_question = self.validate_question_continuity(
+                output_path, validate_callback, cancel_token
+            )
             
             return (
                 original_page_count,
@@ -292,6 +819,14 @@ class PDFManager:
                 max_question
             )
             
+        except OperationCancelled:
+            for open_doc in (doc, output_doc):
+                if open_doc is not None and not open_doc.is_closed:
+                    open_doc.close()
+            # A buffer belongs to the caller, who drops it along with the exception
+            if output_written and not output_in_memory and os.path.exists(output_path):
+                os.remove(output_path)
+            raise
         except Exception as e:
             raise RuntimeError(f"Error extracting question pages: {str(e)}")
     
@@ -2,24 +2,99 @@
 PDF Viewer - Handles PDF page rendering and display
 """
 import fitz  # PyMuPDF
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Hashable, Optional
 
 # Keep tkinter imports for backwards compatibility with desktop app
 try:
     import tkinter as tk
     from tkinter import ttk
-    import base64
     TKINTER_AVAILABLE = True
 except ImportError:
     TKINTER_AVAILABLE = False
 
 
+# Documents kept open by each thumbnail worker process, so consecutive pages
+# of one PDF do not reopen it
+WORKER_DOCUMENT_CACHE_SIZE = 4
+_worker_documents: "OrderedDict[str, fitz.Document]" = OrderedDict()
+
+
+# Decoded thumbnails kept by PhotoImageCache, in pixels (Tk holds 4 bytes per pixel)
+PHOTO_CACHE_PIXELS = 12_000_000
+
+
+def render_thumbnail_ppm(pdf_path: str, page_index: int, width: int = 150) -> Optional[bytes]:
+    """
+    Render a page thumbnail as binary PPM (runs in thumbnail worker processes,
+    so it only takes and returns picklable values)
+    
+    PPM is raw RGB behind a short header: MuPDF writes it without compressing
+    and Tk reads it without decompressing, unlike PNG.
+    
+    Returns:
+        PPM bytes, or None if the page does not exist
+    """
+    doc = _worker_documents.pop(pdf_path, None)
+    if doc is None:
+        doc = fitz.open(pdf_path)
+    _worker_documents[pdf_path] = doc
+    while len(_worker_documents) > WORKER_DOCUMENT_CACHE_SIZE:
+        _worker_documents.popitem(last=False)[1].close()
+    
+    if page_index >= len(doc):
+        return None
+    page = doc[page_index]
+    zoom = width / page.rect.width
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).tobytes("ppm")
+
+
+class PhotoImageCache:
+    """
+    Least recently used Tk PhotoImages, bounded by their total pixel count.
+    
+    Images stay valid after eviction for as long as a widget still holds them.
+    """
+    
+    def __init__(self, max_pixels: int = PHOTO_CACHE_PIXELS):
+        self.max_pixels = max_pixels
+        self.pixels = 0
+        self._images: "OrderedDict[Hashable, object]" = OrderedDict()
+    
+    def get(self, key: Hashable):
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+        return image
+    
+    def put(self, key: Hashable, image):
+        if key in self._images:
+            self.pixels -= self._size(self._images.pop(key))
+        self._images[key] = image
+        self.pixels += self._size(image)
+        while self.pixels > self.max_pixels and len(self._images) > 1:
+            self.pixels -= self._size(self._images.popitem(last=False)[1])
+    
+    def discard(self, match):
+        """Drop every image whose key satisfies match(key)"""
+        for key in [key for key in self._images if match(key)]:
+            self.pixels -= self._size(self._images.pop(key))
+    
+    def __len__(self):
+        return len(self._images)
+    
+    @staticmethod
+    def _size(image) -> int:
+        return image.width() * image.height()
+
+
 class PDFViewer:
     """Utilities for rendering PDF pages as thumbnails"""
     
     @staticmethod
-    def create_page_widget(parent, page: dict, pdf_path: str, on_remove, on_select):
+    def create_page_widget(parent, page: dict, pdf_path: str, on_remove, on_select,
+                           render_thumbnail: bool = True):
         """
         Create a widget displaying a page thumbnail with remove button (Tkinter version)
         
@@ -29,31 +104,35 @@ class PDFViewer:
             pdf_path: Path to the PDF file
             on_remove: Callback function when remove button is clicked
             on_select: Callback function when widget is clicked (for multi-select)
+            render_thumbnail: Render the thumbnail now; if False a placeholder is
+                shown until set_page_thumbnail() is called with the image
         """
         if not TKINTER_AVAILABLE:
             raise ImportError("Tkinter not available")
             
         frame = ttk.Frame(parent, relief=tk.RAISED, borderwidth=2)
         
-        # Generate thumbnail (pass parent as master for the PhotoImage to ensure same Tcl interpreter)
-        master = parent.winfo_toplevel() if hasattr(parent, 'winfo_toplevel') else None
-        thumbnail = PDFViewer.generate_thumbnail_from_path(pdf_path, page['page_index'], width=150, master=master)
+        thumbnail = None
+        if render_thumbnail:
+            # Generate thumbnail (pass parent as master for the PhotoImage to ensure same Tcl interpreter)
+            master = parent.winfo_toplevel() if hasattr(parent, 'winfo_toplevel') else None
+            thumbnail = PDFViewer.generate_thumbnail_from_path(pdf_path, page['page_index'], width=150, master=master)
         
         if thumbnail:
             # Display thumbnail
             img_label = tk.Label(frame, image=thumbnail, bg="white")
             img_label.image = thumbnail  # Keep reference
-            img_label.pack(padx=5, pady=5)
         else:
-            # Placeholder if thumbnail generation fails
-            placeholder = tk.Label(
+            # Placeholder while the thumbnail renders, or if generation fails
+            img_label = tk.Label(
                 frame, 
-                text="PDF Page", 
+                text="Loading..." if not render_thumbnail else "PDF Page", 
                 width=20, 
                 height=15,
                 bg="lightgray"
             )
-            placeholder.pack(padx=5, pady=5)
+        img_label.pack(padx=5, pady=5)
+        frame.thumbnail_label = img_label
         
         # Bind click for selection (with Ctrl key for multi-select feel)
         frame.bind('<Button-1>', lambda e: on_select(frame, page))
@@ -77,6 +156,31 @@ class PDFViewer:
         
         return frame
     
+    @staticmethod
+    def set_page_thumbnail(widget, thumbnail):
+        """
+        Show a thumbnail in a widget made by create_page_widget()
+        
+        Args:
+            widget: Page widget
+            thumbnail: PhotoImage, or None if rendering failed
+        """
+        label = widget.thumbnail_label
+        if thumbnail is None:
+            label.configure(text="PDF Page")
+            return
+        label.configure(image=thumbnail, text="", width=0, height=0, bg="white")
+        label.image = thumbnail  # Keep reference
+    
+    @staticmethod
+    def photo_image_from_ppm(ppm_bytes: bytes, master=None):
+        """Load binary PPM into a Tk PhotoImage as is (no PNG decode, no base64)"""
+        # Attach to the provided master or the default root
+        final_master = master if master is not None else (tk._default_root if getattr(tk, "_default_root", None) is not None else None)
+        if final_master:
+            return tk.PhotoImage(master=final_master, data=ppm_bytes, format='ppm')
+        return tk.PhotoImage(data=ppm_bytes, format='ppm')
+    
     @staticmethod
     def generate_thumbnail(pdf_path: str, page_index: int, output_path: str, width: int = 180) -> bool:
         """
@@ -122,11 +226,30 @@ class PDFViewer:
             print(f"Error generating thumbnail: {e}")
             return False
         
-    @staticmethod        
+    @staticmethod
+    def render_page_png(doc, page_index: int, width: int = 180) -> Optional[bytes]:
+        """
+        Render a page of an already open document as PNG bytes (for callers that cache documents)
+
+        Args:
+            doc: Open PyMuPDF document
+            page_index: 0-based page index
+            width: Desired thumbnail width in pixels
+
+        Returns:
+            PNG bytes, or None if the page does not exist
+        """
+        if page_index >= len(doc):
+            return None
+        page = doc[page_index]
+        zoom = width / page.rect.width
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+
+    @staticmethod
     def generate_thumbnail_from_path(pdf_path: str, page_index: int, width: int = 150, master=None):
         """
         Generate a thumbnail image from a PDF page using PyMuPDF (Tkinter version)
-        Uses PNG bytes from PyMuPDF and Tk's PhotoImage to avoid Pillow dependency.
+        Hands raw PPM bytes from PyMuPDF to Tk's PhotoImage to avoid Pillow dependency.
         
         Args:
             pdf_path: Path to the PDF file
@@ -154,24 +277,13 @@ class PDFViewer:
             
             # Render page to pixmap
             mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Try to get PNG bytes from pixmap (API varies across versions)
-            try:
-                png_bytes = pix.tobytes("png")
-            except TypeError:
-                # Fallback for other PyMuPDF versions
-                png_bytes = pix.getPNGData()
+            pix = page.get_pixmap(matrix=mat, alpha=False)
+            ppm_bytes = pix.tobytes("ppm")
             
             # Close document
             doc.close()
             
-            # Encode PNG as base64 and return a Tk PhotoImage (attach to the provided master or the default root)
-            b64 = base64.b64encode(png_bytes).decode('ascii')
-            final_master = master if master is not None else (tk._default_root if getattr(tk, "_default_root", None) is not None else None)
-            if final_master:
-                return tk.PhotoImage(master=final_master, data=b64)
-            return tk.PhotoImage(data=b64)
+            return PDFViewer.photo_image_from_ppm(ppm_bytes, master)
             
         except Exception as e:
             print(f"Error generating thumbnail: {e}")
@@ -1,21 +1,75 @@
 from __future__ import annotations
 
+import hashlib
+import io
 import os
-import shutil
+import multiprocessing
+import threading
 import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.managers import SyncManager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+import fitz
 import streamlit as st
 
-from pdf_manager import PDFManager
+from pdf_manager import (
+    DEFAULT_SAVE_PROFILE,
+    QUESTION_PATTERN,
+    SAVE_PROFILES,
+    PDFManager,
+    PdfSource,
+    ProgressCallback,
+    ProgressReporter,
+    check_question_continuity,
+    describe_progress,
+    open_pdf,
+)
 from pdf_viewer import PDFViewer
+from batch_pool import CANCELLED, TASK_ERRORS, extract_file, validate_file
+from janitor import start_shared_janitor
+from upload_store import DEFAULT_BLOB_DIR, UploadStore
+from upload_stream import UPLOAD_CHUNK_SIZE
 
 APP_TITLE = "PDF Editor"
 BASE_UPLOAD_DIR = Path("./uploads")
 BASE_THUMBNAIL_DIR = Path("./static/temp")
 MAIN_VIEWS = ["Editor", "Extract Questions", "Validate Questions"]
 
+# Cross-session caches, keyed by content hash so identical uploads share entries
+CACHE_TTL_SECONDS = 3600
+DOCUMENT_CACHE_ENTRIES = 16
+QUESTION_INDEX_CACHE_ENTRIES = 256
+THUMBNAIL_CACHE_ENTRIES = 3000
+VALIDATION_CACHE_ENTRIES = 1000
+THUMBNAIL_WIDTH = 180
+
+# Selecting a page reruns only these fragments (by key); removing one reruns the app
+EDITOR_SUMMARY_FRAGMENTS = ["editor_metrics", "selection_actions"]
+
+# Batch files run on a process pool shared by all sessions; running batches are polled at this interval
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 4))
+BATCH_POLL_SECONDS = 0.5
+
+# The editor grid shows one window of pages at a time; the next window's
+# thumbnails are rendered into the cache in the background
+GRID_PAGE_SIZES = [12, 24, 48, 96]
+DEFAULT_GRID_PAGE_SIZE = 24
+THUMBNAIL_SIZES = {"Small": (120, 6), "Medium": (THUMBNAIL_WIDTH, 4), "Large": (260, 3)}  # width px, columns
+DEFAULT_THUMBNAIL_SIZE = "Medium"
+PREFETCH_WORKERS = 1  # Renders take the MuPDF lock, so more threads would only wait
+PREFETCHED_WINDOWS_PER_SESSION = 64
+
+# Extract and validate read uploads straight from memory; extraction outputs
+# of inputs up to this size are also saved and re-checked in memory
+IN_MEMORY_OUTPUT_BYTES = 64 * 1024 * 1024
+
+upload_store = UploadStore(DEFAULT_BLOB_DIR)
+janitor = start_shared_janitor([BASE_UPLOAD_DIR, BASE_THUMBNAIL_DIR], upload_store=upload_store)
+
 
 def inject_styles() -> None:
     st.markdown(
@@ -65,10 +119,20 @@ def ensure_base_dirs() -> None:
     BASE_THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
 
 
+class SessionFiles:
+    # Kept in session_state: once Streamlit drops a session and its state is
+    # collected, the session's uploads and outputs are discarded with it
+    def __init__(self, session_id: str) -> None:
+        self.finalizer = weakref.finalize(self, janitor.discard_session, session_id)
+
+
 def init_state() -> None:
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
 
+    if "session_files" not in st.session_state:
+        st.session_state.session_files = SessionFiles(st.session_state.session_id)
+
     if "manager" not in st.session_state:
         st.session_state.manager = PDFManager()
 
@@ -96,6 +160,14 @@ def init_state() -> None:
     if "validate_results_batch" not in st.session_state:
         st.session_state.validate_results_batch = None
 
+    # Uploader file_id -> SHA-256 of its content in upload_store
+    if "upload_digests" not in st.session_state:
+        st.session_state.upload_digests = {}
+
+    # (content hash, page indexes, width) of the grid windows last prefetched, oldest first
+    if "prefetched_windows" not in st.session_state:
+        st.session_state.prefetched_windows = OrderedDict()
+
     if "main_view" not in st.session_state:
         st.session_state.main_view = "Editor"
 
@@ -106,12 +178,6 @@ def get_session_folder() -> Path:
     return folder
 
 
-def get_thumbnail_folder() -> Path:
-    folder = BASE_THUMBNAIL_DIR / st.session_state.session_id
-    folder.mkdir(parents=True, exist_ok=True)
-    return folder
-
-
 def queue_message(level: str, text: str) -> None:
     st.session_state.messages.append((level, text))
 
@@ -137,19 +203,55 @@ def save_uploaded_file(uploaded_file: Any, prefix: str | None = None) -> Path:
         filename = safe_name
 
     output_path = get_session_folder() / filename
-    with output_path.open("wb") as f:
-        f.write(uploaded_file.getbuffer())
+    # A file this session already stored is just linked again, without rehashing or rewriting it
+    file_id = getattr(uploaded_file, "file_id", None)
+    digest = st.session_state.upload_digests.get(file_id)
+    if digest:
+        try:
+            upload_store.link(digest, output_path)
+            return output_path
+        except FileNotFoundError:
+            pass  # Pruned since this session stored it; store it again
+
+    data = uploaded_file.getbuffer()
+    chunks = (data[start:start + UPLOAD_CHUNK_SIZE] for start in range(0, len(data), UPLOAD_CHUNK_SIZE))
+    digest = upload_store.save(chunks, output_path)
+    if file_id is not None:
+        st.session_state.upload_digests[file_id] = digest
     return output_path
 
 
+def get_upload_hash(uploaded_file: Any) -> str:
+    file_id = getattr(uploaded_file, "file_id", None)
+    digest = st.session_state.upload_digests.get(file_id)
+    if digest is None:
+        digest = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+        if file_id is not None:
+            st.session_state.upload_digests[file_id] = digest
+    return digest
+
+
 def cleanup_session_files() -> None:
-    for base in (BASE_UPLOAD_DIR, BASE_THUMBNAIL_DIR):
-        folder = base / st.session_state.session_id
-        if folder.exists():
-            shutil.rmtree(folder, ignore_errors=True)
+    janitor.discard_session(st.session_state.session_id)
+
+
+def discard_outputs(*results: dict[str, Any] | None) -> None:
+    # Outputs stay on disk (session state only keeps their paths) until replaced
+    for result in results:
+        if result and result.get("path"):
+            janitor.discard(result["path"])
+
+
+def output_download_data(result: dict[str, Any]):
+    # Read on click, on Streamlit's download thread, so the bytes never sit in session state
+    path = Path(result["path"])
+    return path.read_bytes if path.exists() else None
 
 
 def new_project() -> None:
+    for run in (st.session_state.extract_results_batch, st.session_state.validate_results_batch):
+        if run is not None:
+            run.cancel()
     cleanup_session_files()
     st.session_state.manager = PDFManager()
     st.session_state.selected_pdf_id = None
@@ -176,6 +278,9 @@ def add_uploaded_pdfs(uploaded_files: list[Any]) -> None:
         try:
             file_path = save_uploaded_file(uploaded_file)
             pdf_id = manager.add_pdf(str(file_path))
+            # Thumbnails and the question index are cached by content hash
+            digest = st.session_state.upload_digests.get(getattr(uploaded_file, "file_id", None))
+            manager.pdfs[pdf_id]["sha256"] = digest or get_content_hash(file_path)
             success_count += 1
             if st.session_state.selected_pdf_id is None:
                 st.session_state.selected_pdf_id = pdf_id
@@ -201,6 +306,15 @@ def remove_pdf(pdf_id: str) -> None:
     queue_message("success", "PDF removed")
 
 
+def toggle_page_selection(page_id: str) -> None:
+    if st.session_state[f"select_{page_id}"]:
+        st.session_state.selected_pages.add(page_id)
+    else:
+        st.session_state.selected_pages.discard(page_id)
+    # The checkbox already shows the change; only the counters need to catch up
+    st.rerun(EDITOR_SUMMARY_FRAGMENTS)
+
+
 def remove_single_page(page_id: str) -> None:
     manager: PDFManager = st.session_state.manager
     manager.remove_page(page_id)
@@ -229,22 +343,119 @@ def prepare_merge_download() -> None:
     output_path = get_session_folder() / f"merged_{uuid.uuid4().hex[:8]}.pdf"
 
     manager.merge_all(str(output_path))
+    discard_outputs(st.session_state.merged_output)
     st.session_state.merged_output = {
         "filename": output_name,
-        "bytes": output_path.read_bytes(),
+        "path": str(output_path),
     }
     queue_message("success", "Merged PDF is ready to download")
 
 
-def get_thumbnail_for_page(pdf_path: str, page_id: str, page_index: int) -> Path | None:
-    thumbnail_path = get_thumbnail_folder() / f"page_{page_id}.png"
+@st.cache_data(max_entries=4096, show_spinner=False)
+def hash_file(path: str, size: int, mtime_ns: int) -> str:
+    # size and mtime_ns only key the cache, so a rewritten file is hashed again
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
-    if not thumbnail_path.exists():
-        ok = PDFViewer.generate_thumbnail(pdf_path, page_index, str(thumbnail_path))
-        if not ok:
-            return None
+def get_content_hash(path: str | Path) -> str:
+    stat = os.stat(path)
+    return hash_file(str(path), stat.st_size, stat.st_mtime_ns)
 
-    return thumbnail_path
+
+# Arguments starting with an underscore are not part of Streamlit's cache keys:
+# the content hash identifies the document, the path is only where to read it
+
+
+@st.cache_resource(show_spinner=False)
+def get_mupdf_lock() -> threading.Lock:
+    # One for the whole server: MuPDF is not thread-safe, not even across different documents
+    return threading.Lock()
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=DOCUMENT_CACHE_ENTRIES, show_spinner=False)
+def open_document(content_hash: str, _source: PdfSource) -> tuple[fitz.Document, threading.Lock]:
+    # Shared by every session's script thread and the prefetch thread; only use it under the lock
+    lock = get_mupdf_lock()
+    with lock:
+        return open_pdf(_source), lock
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=QUESTION_INDEX_CACHE_ENTRIES, show_spinner=False)
+def get_question_index(content_hash: str, _source: PdfSource,
+                       _progress_callback: ProgressCallback | None = None) -> dict[int, list[int]]:
+    # Only files go through open_document: a cached document over an upload's
+    # buffer would keep the upload in memory long after its session let go of it
+    if isinstance(_source, (str, os.PathLike)):
+        doc, lock = open_document(content_hash, _source)
+        with lock:
+            return scan_question_index(doc, _progress_callback)
+
+    lock = get_mupdf_lock()
+    with lock:
+        doc = open_pdf(_source)
+        try:
+            return scan_question_index(doc, _progress_callback)
+        finally:
+            doc.close()
+
+
+def scan_question_index(doc: fitz.Document, progress_callback: ProgressCallback | None) -> dict[int, list[int]]:
+    index = {}
+    progress = ProgressReporter(progress_callback)
+    progress.start("scan", len(doc))
+    for page_index in range(len(doc)):
+        numbers = sorted({int(match) for match in QUESTION_PATTERN.findall(doc[page_index].get_text())})
+        if numbers:
+            index[page_index] = numbers
+        progress.update(page_index + 1)
+    return index
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=VALIDATION_CACHE_ENTRIES, show_spinner=False)
+def validate_pdf(content_hash: str, _source: PdfSource,
+                 _progress_callback: ProgressCallback | None = None) -> tuple[bool, list[int], int]:
+    index = get_question_index(content_hash, _source, _progress_callback)
+    return check_question_continuity(number for numbers in index.values() for number in numbers)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=THUMBNAIL_CACHE_ENTRIES, show_spinner=False)
+def render_thumbnail(content_hash: str, page_index: int, _path: str, width: int = THUMBNAIL_WIDTH) -> bytes | None:
+    doc, lock = open_document(content_hash, _path)
+    with lock:
+        return PDFViewer.render_page_png(doc, page_index, width)
+
+
+def get_thumbnail_for_page(pdf_info: dict[str, Any], page_index: int, width: int = THUMBNAIL_WIDTH) -> bytes | None:
+    try:
+        return render_thumbnail(pdf_info["sha256"], page_index, pdf_info["path"], width)
+    except Exception:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    # Separate from the batch pool so prefetching never queues behind a batch
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="thumbnail-prefetch")
+
+
+def prefetch_thumbnails(pdf_info: dict[str, Any], pages: list[dict[str, Any]], width: int) -> None:
+    # Once per window and size per session; render_thumbnail's cache does the rest
+    key = (pdf_info["sha256"], tuple(page["page_index"] for page in pages), width)
+    windows = st.session_state.prefetched_windows
+    if not pages:
+        return
+    if key in windows:
+        windows.move_to_end(key)
+        return
+    windows[key] = None
+    if len(windows) > PREFETCHED_WINDOWS_PER_SESSION:
+        windows.popitem(last=False)
+    for page in pages:
+        get_prefetch_executor().submit(get_thumbnail_for_page, pdf_info, page["page_index"], width)
 
 
 def render_sidebar() -> None:
@@ -292,20 +503,58 @@ def render_sidebar() -> None:
                         st.rerun()
 
 
-def render_editor_page() -> None:
-    st.subheader("Editor")
+@st.fragment(key="editor_metrics")
+def render_editor_metrics() -> None:
     manager: PDFManager = st.session_state.manager
-
-    total_pages = manager.get_total_page_count()
-    total_pdfs = len(manager.get_all_pdfs())
     metric_col1, metric_col2, metric_col3 = st.columns(3)
     with metric_col1:
-        st.metric("Loaded PDFs", total_pdfs)
+        st.metric("Loaded PDFs", len(manager.get_all_pdfs()))
     with metric_col2:
-        st.metric("Total Pages", total_pages)
+        st.metric("Total Pages", manager.get_total_page_count())
     with metric_col3:
         st.metric("Selected Pages", len(st.session_state.selected_pages))
 
+
+@st.fragment(key="selection_actions")
+def render_selection_actions() -> None:
+    selected_count = len(st.session_state.selected_pages)
+    header_col1, header_col2 = st.columns([2, 1])
+    with header_col1:
+        if selected_count:
+            st.info(f"{selected_count} page(s) selected")
+    with header_col2:
+        disabled = selected_count == 0
+        if st.button("Remove Selected", disabled=disabled, use_container_width=True):
+            remove_selected_pages()
+            st.rerun()
+
+
+def render_page_tile(pdf_info: dict[str, Any], page: dict[str, Any], width: int) -> None:
+    thumbnail = get_thumbnail_for_page(pdf_info, page["page_index"], width)
+    if thumbnail:
+        st.image(thumbnail, use_container_width=True)
+    else:
+        st.caption("Thumbnail unavailable")
+
+    st.caption(f"Page {page['page_num']}")
+
+    # Kept in step with selected_pages, which "Remove Selected" and removals also change
+    st.session_state[f"select_{page['id']}"] = page["id"] in st.session_state.selected_pages
+    st.checkbox("Select", key=f"select_{page['id']}",
+                on_change=toggle_page_selection, args=(page["id"],))
+    # Page numbers and counts change everywhere, so removing reruns the whole app
+    if st.button("Remove Page", key=f"remove_page_{page['id']}", use_container_width=True):
+        remove_single_page(page["id"])
+        st.rerun()
+
+
+def render_editor_page() -> None:
+    st.subheader("Editor")
+    manager: PDFManager = st.session_state.manager
+
+    render_editor_metrics()
+
+    total_pages = manager.get_total_page_count()
     if total_pages > 0:
         action_col1, action_col2 = st.columns([1, 1])
         with action_col1:
@@ -317,10 +566,11 @@ def render_editor_page() -> None:
                 st.rerun()
         with action_col2:
             merged = st.session_state.merged_output
-            if merged:
+            merged_data = output_download_data(merged) if merged else None
+            if merged_data:
                 st.download_button(
                     "Download Merged PDF",
-                    data=merged["bytes"],
+                    data=merged_data,
                     file_name=merged["filename"],
                     mime="application/pdf",
                     use_container_width=True,
@@ -344,47 +594,183 @@ def render_editor_page() -> None:
 
     st.markdown(f"### {pdf_info['name']}")
 
-    selected_count = len(st.session_state.selected_pages)
-    header_col1, header_col2 = st.columns([2, 1])
-    with header_col1:
-        if selected_count:
-            st.info(f"{selected_count} page(s) selected")
-    with header_col2:
-        disabled = selected_count == 0
-        if st.button("Remove Selected", disabled=disabled, use_container_width=True):
-            remove_selected_pages()
-            st.rerun()
+    render_selection_actions()
 
     if not pages:
         st.info("No pages available in this PDF")
         return
 
-    grid_columns = st.columns(4)
-    for idx, page in enumerate(pages):
-        with grid_columns[idx % 4]:
-            thumb_path = get_thumbnail_for_page(pdf_info["path"], page["id"], page["page_index"])
-            if thumb_path and thumb_path.exists():
-                st.image(str(thumb_path), use_container_width=True)
-            else:
-                st.caption("Thumbnail unavailable")
+    if "sha256" not in pdf_info:
+        pdf_info["sha256"] = get_content_hash(pdf_info["path"])
+
+    control_col1, control_col2, control_col3 = st.columns(3)
+    with control_col1:
+        page_size = st.selectbox(
+            "Pages per view",
+            GRID_PAGE_SIZES,
+            index=GRID_PAGE_SIZES.index(DEFAULT_GRID_PAGE_SIZE),
+            key="editor_grid_page_size",
+        )
+    with control_col2:
+        thumbnail_size = st.select_slider(
+            "Thumbnail size",
+            options=list(THUMBNAIL_SIZES),
+            value=DEFAULT_THUMBNAIL_SIZE,
+            key="editor_thumbnail_size",
+        )
+    view_count = -(-len(pages) // page_size)
+    # The number of views shrinks when pages are removed or the page size grows
+    if st.session_state.get("editor_grid_view", 1) > view_count:
+        st.session_state.editor_grid_view = view_count
+    with control_col3:
+        view = st.number_input("View", min_value=1, max_value=view_count, step=1, key="editor_grid_view")
+
+    start = (view - 1) * page_size
+    window = pages[start:start + page_size]
+    st.caption(f"Showing pages {start + 1}-{start + len(window)} of {len(pages)}")
+
+    width, column_count = THUMBNAIL_SIZES[thumbnail_size]
+    grid_columns = st.columns(column_count)
+    for idx, page in enumerate(window):
+        with grid_columns[idx % column_count]:
+            render_page_tile(pdf_info, page, width)
+
+    prefetch_thumbnails(pdf_info, pages[start + page_size:start + 2 * page_size], width)
+
+
+def format_save_stats(result: dict[str, Any]) -> str:
+    size_mb = result["output_bytes"] / 1024 / 1024
+    text = f"Save profile: {result['save_profile']} | {size_mb:.2f} MB | saved in {result['save_seconds']}s"
+    if result.get("images_recompressed"):
+        saved_mb = result["image_bytes_saved"] / 1024 / 1024
+        text += f" | {result['images_recompressed']} image(s) recompressed, {saved_mb:.2f} MB saved"
+    return text
+
+
+def page_progress_callback(progress: Any, prefix: str = "", fraction: float | None = None):
+    def report(info: dict[str, Any]) -> None:
+        text = f"{prefix}{describe_progress(info)}"
+        # In batch mode the bar tracks files and only the text follows the pages
+        value = fraction if fraction is not None else info["done"] / max(info["total"], 1)
+        progress.progress(value, text=text)
+    return report
+
+
+@st.cache_resource(show_spinner=False)
+def get_batch_executor() -> ProcessPoolExecutor:
+    # MuPDF is not thread-safe and gets nothing from threads under the GIL, so files run in processes
+    return ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_batch_channels() -> SyncManager:
+    # Serves each batch's progress dict and cancel event to the worker processes
+    return multiprocessing.get_context("spawn").Manager()
+
+
+class BatchRun:
+    # One batch of a batch_pool task on the shared process pool. It lives in
+    # session_state, so the work carries on while the user is elsewhere in the
+    # app. Workers write progress text into status and stop at the next page
+    # once cancel_event is set; results are picked up from the futures.
+    def __init__(self, file_names: list[str], done_message: str, task: Callable[..., dict[str, Any]]) -> None:
+        channels = get_batch_channels()
+        self.file_names = file_names
+        self.done_message = done_message
+        self.task = task
+        self.results: list[dict[str, Any] | None] = [None] * len(file_names)
+        self.status = channels.dict()
+        self.cancel_event = channels.Event()
+        self.futures: list[Future] = []
+        self.paths: list[str] = []
+        self.labels: list[dict[str, Any]] = []
+        self.inputs_discarded = False
+
+    def submit(self, index: int, input_path: str, *args: Any, **labels: Any) -> None:
+        # labels (display names, the output path) override the fields of the task's result
+        self.futures.append(get_batch_executor().submit(
+            self.task, index, input_path, *args, progress=self.status, cancel_event=self.cancel_event
+        ))
+        self.paths.append(input_path)
+        self.labels.append(labels)
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+        for future in self.futures:
+            future.cancel()
+
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
+    def finished(self) -> list[tuple[int, dict[str, Any]]]:
+        for index, future in enumerate(self.futures):
+            if self.results[index] is not None or not future.done():
+                continue
+            try:
+                result = future.result()
+            except CancelledError:
+                result = TASK_ERRORS[self.task](index, self.paths[index], CANCELLED)
+            except Exception as e:
+                result = TASK_ERRORS[self.task](index, self.paths[index], str(e))
+            self.results[index] = {**result, **self.labels[index]}
+        return [(index, result) for index, result in enumerate(self.results) if result is not None]
+
+    def discard_inputs(self) -> None:
+        # The session's links to the uploads; the uploads themselves stay in upload_store
+        if not self.inputs_discarded:
+            for path in self.paths:
+                janitor.discard(path)
+            self.inputs_discarded = True
+
+
+@st.fragment(run_every=BATCH_POLL_SECONDS)
+def render_running_batch(run: BatchRun, render_results: Callable[[BatchRun], None]) -> None:
+    if run.done:
+        queue_message("success", run.done_message)
+        st.rerun()
 
-            st.caption(f"Page {page['page_num']}")
+    finished = len(run.finished())
+    total = len(run.results)
+    st.progress(finished / max(total, 1), text=f"{finished}/{total} file(s) finished")
+    status = run.status.copy()
+    for index, (name, result) in enumerate(zip(run.file_names, run.results)):
+        if result is None:
+            st.caption(f"{name}: {status.get(index, 'Queued')}")
+    render_results(run)
 
-            is_selected = page["id"] in st.session_state.selected_pages
-            toggle_label = "Deselect" if is_selected else "Select"
-            if st.button(toggle_label, key=f"toggle_{page['id']}", use_container_width=True):
-                if is_selected:
-                    st.session_state.selected_pages.discard(page["id"])
-                else:
-                    st.session_state.selected_pages.add(page["id"])
-                st.rerun()
 
-            if st.button("Remove Page", key=f"remove_page_{page['id']}", use_container_width=True):
-                remove_single_page(page["id"])
-                st.rerun()
+def render_batch(run: BatchRun | None, render_results: Callable[[BatchRun], None]) -> None:
+    if run is None:
+        return
+    if run.done:
+        run.discard_inputs()
+        render_results(run)
+    else:
+        render_running_batch(run, render_results)
+
+
+def batch_is_running(run: BatchRun | None) -> bool:
+    return run is not None and not run.done
+
 
+def extract_to_file(manager: PDFManager, source: memoryview, output_path: Path, extract_options: dict[str, Any],
+                    progress_callback: ProgressCallback) -> tuple:
+    # Shares MuPDF with other sessions and the prefetch thread, so it runs under the lock.
+    # Small outputs are saved and re-checked in memory, then written out once for the download
+    if source.nbytes > IN_MEMORY_OUTPUT_BYTES:
+        with get_mupdf_lock():
+            return manager.extract_question_pages(
+                source, str(output_path), **extract_options, progress_callback=progress_callback
+            )
+    buffer = io.BytesIO()
+    with get_mupdf_lock():
+        result = manager.extract_question_pages(source, buffer, **extract_options, progress_callback=progress_callback)
+    output_path.write_bytes(buffer.getbuffer())
+    return result
 
-def render_extract_single() -> None:
+
+def render_extract_single(extract_options: dict[str, Any]) -> None:
     st.markdown("#### Single PDF")
     uploaded = st.file_uploader("Select PDF File", type=["pdf"], key="extract_single_pdf")
 
@@ -394,20 +780,20 @@ def render_extract_single() -> None:
             return
 
         task_id = str(uuid.uuid4())
-        input_path = save_uploaded_file(uploaded, prefix=f"extract_input_{task_id}")
-
         manager = PDFManager()
         smart_name = manager.generate_smart_filename(uploaded.name)
         output_path = get_session_folder() / f"extract_output_{task_id}.pdf"
+        discard_outputs(st.session_state.extract_result_single)
 
+        progress = st.progress(0, text="Extracting question pages...")
         with st.spinner("Extracting question pages..."):
             try:
-                orig_pages, new_pages, questions, is_valid, missing, max_question = manager.extract_question_pages(
-                    str(input_path),
-                    str(output_path),
+                orig_pages, new_pages, questions, is_valid, missing, max_question = extract_to_file(
+                    manager, uploaded.getbuffer(), output_path, extract_options, page_progress_callback(progress)
                 )
 
                 st.session_state.extract_result_single = {
+                    **manager.last_extraction_stats,
                     "input_name": uploaded.name,
                     "output_name": smart_name,
                     "orig_pages": orig_pages,
@@ -416,7 +802,7 @@ def render_extract_single() -> None:
                     "is_valid": is_valid,
                     "missing": list(missing),
                     "max_question": max_question,
-                    "bytes": output_path.read_bytes(),
+                    "path": str(output_path),
                 }
                 queue_message("success", "Question extraction completed")
             except Exception as e:
@@ -445,6 +831,7 @@ def render_extract_single() -> None:
         st.write(f"Questions found: {len(result['questions'])} unique ({min(result['questions'])} to {max(result['questions'])})")
     else:
         st.write("Questions found: 0")
+    st.caption(format_save_stats(result))
 
     if result["is_valid"]:
         st.success(f"Validation passed: Questions 1-{result['max_question']} are present")
@@ -456,9 +843,13 @@ def render_extract_single() -> None:
             f"Expected 1-{result['max_question']}; missing {missing_preview}{suffix}"
         )
 
+    data = output_download_data(result)
+    if data is None:
+        st.warning("The extracted PDF is no longer available. Run the extraction again.")
+        return
     st.download_button(
         "Download Extracted PDF",
-        data=result["bytes"],
+        data=data,
         file_name=result["output_name"],
         mime="application/pdf",
         use_container_width=True,
@@ -466,74 +857,18 @@ def render_extract_single() -> None:
     )
 
 
-def render_extract_batch() -> None:
-    st.markdown("#### Batch Mode")
-    uploaded_files = st.file_uploader("Select Multiple PDF Files", type=["pdf"], accept_multiple_files=True, key="extract_batch_pdfs")
-
-    if st.button("Extract All", key="extract_batch_button", use_container_width=True):
-        if not uploaded_files:
-            st.error("No files selected")
-            return
-
-        manager = PDFManager()
-        results = []
-        progress = st.progress(0, text="Starting batch extraction")
-
-        for idx, uploaded in enumerate(uploaded_files):
-            progress_text = f"Processing {idx + 1}/{len(uploaded_files)}: {uploaded.name}"
-            progress.progress((idx + 1) / len(uploaded_files), text=progress_text)
-
-            task_id = str(uuid.uuid4())
-            input_path = save_uploaded_file(uploaded, prefix=f"batch_input_{task_id}_{idx}")
-            output_path = get_session_folder() / f"batch_output_{task_id}_{idx}.pdf"
-
-            try:
-                smart_name = manager.generate_smart_filename(uploaded.name)
-                orig_pages, new_pages, questions, is_valid, missing, max_question = manager.extract_question_pages(
-                    str(input_path),
-                    str(output_path),
-                )
-                results.append({
-                    "input_name": uploaded.name,
-                    "output_name": smart_name,
-                    "orig_pages": orig_pages,
-                    "new_pages": new_pages,
-                    "questions": list(questions),
-                    "is_valid": is_valid,
-                    "missing": list(missing),
-                    "max_question": max_question,
-                    "bytes": output_path.read_bytes(),
-                    "error": None,
-                })
-            except Exception as e:
-                results.append({
-                    "input_name": uploaded.name,
-                    "output_name": "",
-                    "orig_pages": 0,
-                    "new_pages": 0,
-                    "questions": [],
-                    "is_valid": False,
-                    "missing": [],
-                    "max_question": 0,
-                    "bytes": None,
-                    "error": str(e),
-                })
-
-        st.session_state.extract_results_batch = results
-        queue_message("success", f"Batch extraction finished for {len(uploaded_files)} file(s)")
-        st.rerun()
-
-    results = st.session_state.extract_results_batch
+def render_extract_batch_results(run: BatchRun) -> None:
+    results = run.finished()
     if not results:
         return
 
-    success_count = len([r for r in results if not r["error"]])
-    error_count = len([r for r in results if r["error"]])
-    valid_count = len([r for r in results if (not r["error"]) and r["is_valid"]])
+    success_count = len([r for _, r in results if not r["error"]])
+    error_count = len([r for _, r in results if r["error"]])
+    valid_count = len([r for _, r in results if (not r["error"]) and r["is_valid"]])
 
     st.info(f"✅ {success_count} Success | ✅ {valid_count} Valid | ⚠️ {success_count - valid_count} Warnings | ❌ {error_count} Errors")
 
-    for index, result in enumerate(results):
+    for index, result in results:
         title = f"#{index + 1}: {result['input_name']}"
         with st.expander(title, expanded=index == 0):
             if result["error"]:
@@ -545,30 +880,84 @@ def render_extract_batch() -> None:
 
             st.write(f"Output: {result['output_name']}")
             st.write(f"Pages: {result['orig_pages']} → {result['new_pages']} ({reduction_pct:.1f}% reduction)")
+            st.caption(format_save_stats(result))
             if result["is_valid"]:
                 st.success(f"All questions present (1-{result['max_question']})")
             else:
                 st.warning(f"Missing {len(result['missing'])} question(s)")
 
-            if result["bytes"]:
+            data = output_download_data(result)
+            if data is None:
+                st.caption("Output no longer available")
+            else:
                 st.download_button(
                     f"Download {result['output_name']}",
-                    data=result["bytes"],
+                    data=data,
                     file_name=result["output_name"],
                     mime="application/pdf",
                     key=f"download_extract_batch_{index}",
                 )
 
 
+def render_extract_batch(extract_options: dict[str, Any]) -> None:
+    st.markdown("#### Batch Mode")
+    uploaded_files = st.file_uploader("Select Multiple PDF Files", type=["pdf"], accept_multiple_files=True, key="extract_batch_pdfs")
+
+    previous = st.session_state.extract_results_batch
+    if st.button("Extract All", key="extract_batch_button", use_container_width=True,
+                 disabled=batch_is_running(previous)):
+        if not uploaded_files:
+            st.error("No files selected")
+            return
+
+        if previous is not None:
+            discard_outputs(*previous.results)
+        run = BatchRun([uploaded.name for uploaded in uploaded_files],
+                       f"Batch extraction finished for {len(uploaded_files)} file(s)", extract_file)
+        manager = PDFManager()
+        for idx, uploaded in enumerate(uploaded_files):
+            task_id = str(uuid.uuid4())
+            # Workers get paths: the upload is linked into the session folder rather than pickled
+            input_path = save_uploaded_file(uploaded, prefix=f"batch_input_{task_id}")
+            output_path = get_session_folder() / f"batch_output_{task_id}_{idx}.pdf"
+            run.submit(idx, str(input_path), str(output_path), extract_options, input_name=uploaded.name,
+                       output_name=manager.generate_smart_filename(uploaded.name), path=str(output_path))
+
+        st.session_state.extract_results_batch = run
+        st.rerun()
+
+    render_batch(st.session_state.extract_results_batch, render_extract_batch_results)
+
+
 def render_extract_page() -> None:
     st.subheader("Extract Question Pages")
     st.caption('Extract only pages containing "Question {number}" pattern.')
 
     mode = st.radio("Mode", ["Single PDF", "Batch Mode"], horizontal=True, key="extract_mode")
+    profiles = list(SAVE_PROFILES)
+    save_profile = st.selectbox(
+        "Save Profile",
+        profiles,
+        index=profiles.index(DEFAULT_SAVE_PROFILE),
+        format_func=str.capitalize,
+        help="Fast saves quickest, Balanced is close in size at a fraction of the time, Smallest produces the smallest file.",
+        key="extract_save_profile",
+    )
+    image_dpi = st.number_input(
+        "Downsample images above (DPI)",
+        min_value=0,
+        max_value=1200,
+        value=0,
+        step=25,
+        help="0 keeps images untouched. Scanned pages are mostly image data; 150 DPI keeps them readable at a fraction of the size.",
+        key="extract_image_dpi",
+    )
+    extract_options = {"save_profile": save_profile, "image_dpi": int(image_dpi) or None}
+
     if mode == "Single PDF":
-        render_extract_single()
+        render_extract_single(extract_options)
     else:
-        render_extract_batch()
+        render_extract_batch(extract_options)
 
 
 def render_validate_single() -> None:
@@ -580,13 +969,12 @@ def render_validate_single() -> None:
             st.error("No file selected")
             return
 
-        task_id = str(uuid.uuid4())
-        input_path = save_uploaded_file(uploaded, prefix=f"validate_{task_id}")
-
+        progress = st.progress(0, text="Validating questions...")
         with st.spinner("Validating questions..."):
             try:
-                manager = PDFManager()
-                is_valid, missing, max_question = manager.validate_question_continuity(str(input_path))
+                is_valid, missing, max_question = validate_pdf(
+                    get_upload_hash(uploaded), uploaded.getbuffer(), page_progress_callback(progress)
+                )
                 st.session_state.validate_result_single = {
                     "file_name": uploaded.name,
                     "is_valid": is_valid,
@@ -629,59 +1017,18 @@ def render_validate_single() -> None:
             st.warning("Critical: Question 1 is missing")
 
 
-def render_validate_batch() -> None:
-    st.markdown("#### Batch Mode")
-    uploaded_files = st.file_uploader("Select Multiple PDF Files", type=["pdf"], accept_multiple_files=True, key="validate_batch_pdfs")
-
-    if st.button("Validate All", key="validate_batch_button", use_container_width=True):
-        if not uploaded_files:
-            st.error("No files selected")
-            return
-
-        manager = PDFManager()
-        results = []
-        progress = st.progress(0, text="Starting batch validation")
-
-        for idx, uploaded in enumerate(uploaded_files):
-            progress_text = f"Validating {idx + 1}/{len(uploaded_files)}: {uploaded.name}"
-            progress.progress((idx + 1) / len(uploaded_files), text=progress_text)
-
-            task_id = str(uuid.uuid4())
-            input_path = save_uploaded_file(uploaded, prefix=f"validate_batch_{task_id}_{idx}")
-
-            try:
-                is_valid, missing, max_question = manager.validate_question_continuity(str(input_path))
-                results.append({
-                    "file_name": uploaded.name,
-                    "is_valid": is_valid,
-                    "missing": list(missing),
-                    "max_question": max_question,
-                    "error": None,
-                })
-            except Exception as e:
-                results.append({
-                    "file_name": uploaded.name,
-                    "is_valid": False,
-                    "missing": [],
-                    "max_question": 0,
-                    "error": str(e),
-                })
-
-        st.session_state.validate_results_batch = results
-        queue_message("success", f"Batch validation finished for {len(uploaded_files)} file(s)")
-        st.rerun()
-
-    results = st.session_state.validate_results_batch
+def render_validate_batch_results(run: BatchRun) -> None:
+    results = run.finished()
     if not results:
         return
 
-    valid_count = len([r for r in results if (not r["error"]) and r["is_valid"]])
-    invalid_count = len([r for r in results if (not r["error"]) and (not r["is_valid"])])
-    error_count = len([r for r in results if r["error"]])
+    valid_count = len([r for _, r in results if (not r["error"]) and r["is_valid"]])
+    invalid_count = len([r for _, r in results if (not r["error"]) and (not r["is_valid"])])
+    error_count = len([r for _, r in results if r["error"]])
 
     st.info(f"✅ {valid_count} Valid | ⚠️ {invalid_count} Issues | ❌ {error_count} Errors")
 
-    for idx, result in enumerate(results):
+    for idx, result in results:
         with st.expander(f"#{idx + 1}: {result['file_name']}", expanded=idx == 0):
             if result["error"]:
                 st.error(result["error"])
@@ -698,6 +1045,28 @@ def render_validate_batch() -> None:
                     st.warning("Critical: Question 1 missing")
 
 
+def render_validate_batch() -> None:
+    st.markdown("#### Batch Mode")
+    uploaded_files = st.file_uploader("Select Multiple PDF Files", type=["pdf"], accept_multiple_files=True, key="validate_batch_pdfs")
+
+    if st.button("Validate All", key="validate_batch_button", use_container_width=True,
+                 disabled=batch_is_running(st.session_state.validate_results_batch)):
+        if not uploaded_files:
+            st.error("No files selected")
+            return
+
+        run = BatchRun([uploaded.name for uploaded in uploaded_files],
+                       f"Batch validation finished for {len(uploaded_files)} file(s)", validate_file)
+        for idx, uploaded in enumerate(uploaded_files):
+            input_path = save_uploaded_file(uploaded, prefix=f"batch_input_{uuid.uuid4()}")
+            run.submit(idx, str(input_path), file_name=uploaded.name)
+
+        st.session_state.validate_results_batch = run
+        st.rerun()
+
+    render_batch(st.session_state.validate_results_batch, render_validate_batch_results)
+
+
 def render_validate_page() -> None:
     st.subheader("Validate Question Continuity")
     st.caption('Check if all question numbers from 1 to N are present in your PDF.')
@@ -0,0 +1,429 @@
+"""
+Task Store - SQLite-backed persistence for background tasks, their progress
+events and the job queue that worker processes claim work from
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_DB_PATH = os.environ.get('TASK_DB_PATH', './task_store.db')
+
+# Task statuses after which nothing else happens to the task
+FINISHED_STATUSES = ('completed', 'error', 'cancelled')
+
+# Memoized job results kept (least recently used are evicted first)
+MEMO_MAX_ENTRIES = 2000
+
+# A pending memo entry whose owner has not sent a heartbeat for this long is
+# assumed abandoned (e.g. its worker died); owners heartbeat while computing
+MEMO_HEARTBEAT_TIMEOUT = 60
+
+# A running job whose lease has not been renewed for this long belongs to a
+# worker that died; its task is failed so it does not look busy forever
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 120))
+
+# Finished tasks (with their jobs and events) are deleted after this long
+TASK_RETENTION_SECONDS = int(os.environ.get('TASK_RETENTION_SECONDS', 24 * 3600))
+
+# Page progress events of finished tasks are only useful to streams that are
+# still catching up; they are deleted after this long
+PROGRESS_EVENT_RETENTION_SECONDS = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    task_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, enqueued_at);
+CREATE INDEX IF NOT EXISTS tasks_by_update ON tasks (status, updated_at);
+CREATE TABLE IF NOT EXISTS memo (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    owner TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS memo_by_use ON memo (state, last_used);
+CREATE TABLE IF NOT EXISTS task_events (
+    task_id TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (task_id, id)
+);
+"""
+
+
+class TaskStore:
+    """
+    Durable task records and job queue shared by every web and worker process.
+
+    The database runs in WAL mode so status reads never block on writers.
+    Writes use BEGIN IMMEDIATE transactions, which makes claiming a job and
+    read-modify-write updates of a task record atomic across processes.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Add columns that databases created by earlier versions lack"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(memo)')}
+        if 'heartbeat_at' not in columns:
+            try:
+                conn.execute('ALTER TABLE memo ADD COLUMN heartbeat_at REAL')
+            except sqlite3.OperationalError:
+                pass  # Another process added it first
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    # Tasks
+
+    def create_task(self, task_id: str, status: str = 'starting', **data):
+        """Insert a task record; `data` holds everything shown by the status API"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO tasks (id, status, data, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (task_id, status, json.dumps(data), now, now)
+            )
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a task record as a dict with its status, or None"""
+        row = self._connect().execute('SELECT status, data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        if row is None:
+            return None
+        return {'status': row['status'], **json.loads(row['data'])}
+
+    def update_task(self, task_id: str, **fields):
+        """Merge fields into a task record (a 'status' field updates the status)"""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT status, data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            if row is None:
+                return
+            status = fields.pop('status', row['status'])
+            data = {**json.loads(row['data']), **fields}
+            conn.execute(
+                'UPDATE tasks SET status = ?, data = ?, updated_at = ? WHERE id = ?',
+                (status, json.dumps(data), time.time(), task_id)
+            )
+
+    def append_result(self, task_id: str, result: Dict[str, Any]):
+        """Append one file's result to a batch task's results list"""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            if row is None:
+                return
+            data = json.loads(row['data'])
+            data.setdefault('results', []).append(result)
+            conn.execute(
+                'UPDATE tasks SET data = ?, updated_at = ? WHERE id = ?',
+                (json.dumps(data), time.time(), task_id)
+            )
+
+    def purge_tasks(self, max_age: float = TASK_RETENTION_SECONDS,
+                    progress_max_age: float = PROGRESS_EVENT_RETENTION_SECONDS,
+                    now: Optional[float] = None) -> int:
+        """
+        Delete finished tasks not updated for max_age seconds, with their jobs
+        and events, and the page progress events of tasks finished more than
+        progress_max_age seconds ago.
+
+        Returns:
+            Number of tasks deleted
+        """
+        now = time.time() if now is None else now
+        finished = ', '.join('?' * len(FINISHED_STATUSES))
+        with self._transaction() as conn:
+            task_ids = [row['id'] for row in conn.execute(
+                f'SELECT id FROM tasks WHERE status IN ({finished}) AND updated_at < ?',
+                (*FINISHED_STATUSES, now - max_age)
+            )]
+            for task_id in task_ids:
+                conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+                conn.execute('DELETE FROM jobs WHERE task_id = ?', (task_id,))
+                conn.execute('DELETE FROM task_events WHERE task_id = ?', (task_id,))
+            conn.execute(
+                f"DELETE FROM task_events WHERE event = 'page_progress' AND task_id IN "
+                f"(SELECT id FROM tasks WHERE status IN ({finished}) AND updated_at < ?)",
+                (*FINISHED_STATUSES, now - progress_max_age)
+            )
+        return len(task_ids)
+
+    def delete_task(self, task_id: str):
+        """Remove a task with its job and events"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+            conn.execute('DELETE FROM jobs WHERE task_id = ?', (task_id,))
+            conn.execute('DELETE FROM task_events WHERE task_id = ?', (task_id,))
+
+    # Progress events
+
+    def push_event(self, task_id: str, event: str, data: Dict[str, Any]) -> int:
+        """Append a progress event for a task and return its id (1, 2, ...)"""
+        with self._transaction() as conn:
+            event_id = conn.execute(
+                'SELECT COALESCE(MAX(id), 0) + 1 FROM task_events WHERE task_id = ?', (task_id,)
+            ).fetchone()[0]
+            conn.execute(
+                'INSERT INTO task_events (task_id, id, event, data) VALUES (?, ?, ?, ?)',
+                (task_id, event_id, event, json.dumps(data))
+            )
+        return event_id
+
+    def get_events(self, task_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """Get a task's events with an id greater than after_id, oldest first"""
+        rows = self._connect().execute(
+            'SELECT id, event, data FROM task_events WHERE task_id = ? AND id > ? ORDER BY id',
+            (task_id, after_id)
+        ).fetchall()
+        return [{'id': row['id'], 'event': row['event'], 'data': json.loads(row['data'])} for row in rows]
+
+    def get_latest_event(self, task_id: str, event: str) -> Optional[Dict[str, Any]]:
+        """Get the data of a task's most recent event of one type, or None"""
+        row = self._connect().execute(
+            'SELECT data FROM task_events WHERE task_id = ? AND event = ? ORDER BY id DESC LIMIT 1',
+            (task_id, event)
+        ).fetchone()
+        return json.loads(row['data']) if row else None
+
+    # Job queue
+
+    def enqueue_task(self, task_id: str, kind: str, payload: Dict[str, Any], **data):
+        """Create a task record and queue its job in one transaction"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO tasks (id, status, data, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (task_id, 'starting', json.dumps({'mode': kind, **data}), now, now)
+            )
+            conn.execute(
+                'INSERT INTO jobs (task_id, kind, payload, enqueued_at) VALUES (?, ?, ?, ?)',
+                (task_id, kind, json.dumps(payload), now)
+            )
+
+    def claim_job(self, worker: str, task_id: Optional[str] = None) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Atomically take the oldest queued job (or a specific one).
+
+        Returns:
+            (task_id, kind, payload), or None if nothing is queued
+        """
+        with self._transaction() as conn:
+            if task_id is None:
+                row = conn.execute(
+                    "SELECT task_id, kind, payload FROM jobs WHERE state = 'queued' ORDER BY enqueued_at LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT task_id, kind, payload FROM jobs WHERE state = 'queued' AND task_id = ?", (task_id,)
+                ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, claimed_at = ? WHERE task_id = ?",
+                (worker, time.time(), row['task_id'])
+            )
+        return row['task_id'], row['kind'], json.loads(row['payload'])
+
+    def has_queued_jobs(self, enqueued_before: Optional[float] = None) -> bool:
+        """Whether any job is queued (that was enqueued before the given time)"""
+        row = self._connect().execute(
+            "SELECT 1 FROM jobs WHERE state = 'queued' AND enqueued_at < ? LIMIT 1",
+            (time.time() if enqueued_before is None else enqueued_before,)
+        ).fetchone()
+        return row is not None
+
+    def renew_job(self, task_id: str):
+        """Extend the lease of a running job (called periodically while it runs)"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET claimed_at = ? WHERE task_id = ? AND state = 'running'",
+                (time.time(), task_id)
+            )
+
+    def expire_jobs(self, lease_seconds: float = JOB_LEASE_SECONDS, now: Optional[float] = None) -> List[str]:
+        """
+        Take running jobs whose lease ran out off the queue.
+
+        Each expired job is returned to exactly one caller, which should record
+        its task as failed.
+
+        Returns:
+            Task ids of the expired jobs
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            task_ids = [row['task_id'] for row in conn.execute(
+                "SELECT task_id FROM jobs WHERE state = 'running' AND claimed_at < ?", (now - lease_seconds,)
+            )]
+            for task_id in task_ids:
+                conn.execute("UPDATE jobs SET state = 'done' WHERE task_id = ?", (task_id,))
+                # Results the dead job was computing will never arrive
+                conn.execute("DELETE FROM memo WHERE owner = ? AND state = 'pending'", (task_id,))
+        return task_ids
+
+    def active_job_files(self) -> List[str]:
+        """Input and output paths of queued and running jobs (files that must not be evicted)"""
+        paths = []
+        rows = self._connect().execute("SELECT payload FROM jobs WHERE state IN ('queued', 'running')")
+        for row in rows:
+            payload = json.loads(row['payload'])
+            for file_info in [payload, *payload.get('files', [])]:
+                paths.extend(file_info[key] for key in ('input_path', 'output_path') if file_info.get(key))
+        return paths
+
+    def get_job_payload(self, task_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute('SELECT payload FROM jobs WHERE task_id = ?', (task_id,)).fetchone()
+        return json.loads(row['payload']) if row else None
+
+    def add_job_file(self, task_id: str, file_info: Dict[str, Any]):
+        """Append a file to a batch job whose upload is still arriving"""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT payload FROM jobs WHERE task_id = ?', (task_id,)).fetchone()
+            if row is None:
+                return
+            payload = json.loads(row['payload'])
+            payload['files'].append(file_info)
+            conn.execute('UPDATE jobs SET payload = ? WHERE task_id = ?', (json.dumps(payload), task_id))
+
+    def close_job_input(self, task_id: str):
+        """Record that a batch job's upload has ended and no more files will be added"""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT payload FROM jobs WHERE task_id = ?', (task_id,)).fetchone()
+            if row is None:
+                return
+            payload = json.loads(row['payload'])
+            payload['uploading'] = False
+            conn.execute('UPDATE jobs SET payload = ? WHERE task_id = ?', (json.dumps(payload), task_id))
+
+    def finish_job(self, task_id: str):
+        """Mark a claimed job as done"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET state = 'done' WHERE task_id = ?", (task_id,))
+
+    # Cancellation
+
+    def request_cancel(self, task_id: str) -> bool:
+        """
+        Flag a task for cancellation.
+
+        Returns:
+            True if its job was still queued and has been dropped (the caller
+            should record the task as cancelled); False if a worker already has
+            it and will stop at its next check
+        """
+        with self._transaction() as conn:
+            conn.execute('UPDATE tasks SET cancel_requested = 1 WHERE id = ?', (task_id,))
+            dropped = conn.execute(
+                "UPDATE jobs SET state = 'done' WHERE task_id = ? AND state = 'queued'", (task_id,)
+            ).rowcount
+        return dropped > 0
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        row = self._connect().execute('SELECT cancel_requested FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    # Result memoization with single-flight
+
+    def claim_memo(self, key: str, owner: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Look up a memoized result, or become the one computing it.
+
+        Returns:
+            ('hit', result) if it is cached; ('owner', None) if the caller must
+            compute it and then call complete_memo or abandon_memo; ('wait', None)
+            if someone else is computing it right now
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT state, result, COALESCE(heartbeat_at, created_at) AS heartbeat_at FROM memo WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is not None and row['state'] == 'done':
+                conn.execute('UPDATE memo SET last_used = ? WHERE key = ?', (now, key))
+                return 'hit', json.loads(row['result'])
+            if row is not None and now - row['heartbeat_at'] < MEMO_HEARTBEAT_TIMEOUT:
+                return 'wait', None
+            conn.execute(
+                "INSERT OR REPLACE INTO memo (key, state, owner, result, created_at, last_used, heartbeat_at) "
+                "VALUES (?, 'pending', ?, NULL, ?, ?, ?)",
+                (key, owner, now, now, now)
+            )
+        return 'owner', None
+
+    def heartbeat_memo(self, key: str, owner: str):
+        """Tell waiting jobs that the owner of a pending memo entry is still computing it"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE memo SET heartbeat_at = ? WHERE key = ? AND owner = ? AND state = 'pending'",
+                (time.time(), key, owner)
+            )
+
+    def complete_memo(self, key: str, result: Dict[str, Any]):
+        """Store a computed result and evict the least recently used beyond MEMO_MAX_ENTRIES"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE memo SET state = 'done', result = ?, last_used = ? WHERE key = ?",
+                (json.dumps(result), now, key)
+            )
+            conn.execute(
+                "DELETE FROM memo WHERE key IN (SELECT key FROM memo WHERE state = 'done' "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (MEMO_MAX_ENTRIES,)
+            )
+
+    def abandon_memo(self, key: str, owner: Optional[str] = None):
+        """Drop a memo entry (a failed computation, or a result that is no longer usable)"""
+        with self._transaction() as conn:
+            if owner is None:
+                conn.execute('DELETE FROM memo WHERE key = ?', (key,))
+            else:
+                conn.execute('DELETE FROM memo WHERE key = ? AND owner = ?', (key, owner))
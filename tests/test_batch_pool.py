@@ -0,0 +1,88 @@
+import time
+
+import fitz
+from batch_pool import CANCELLED, BatchPool, extract_file, validate_file
+
+
+def create_exam_pdf(path, questions=3):
+    doc = fitz.open()
+    for q in range(1, questions + 1):
+        doc.new_page().insert_text((72, 72), f"Question {q}")
+    doc.new_page().insert_text((72, 72), "Answer key")
+    doc.save(str(path))
+    doc.close()
+
+
+def wait_for_results(pool, timeout=60):
+    results = []
+    deadline = time.time() + timeout
+    while not pool.done:
+        assert time.time() < deadline, "batch did not finish"
+        results.extend(pool.collect())
+        time.sleep(0.05)
+    return results
+
+
+def test_batch_pool_extracts_and_validates_across_processes(tmp_path):
+    inputs = []
+    for i in range(3):
+        create_exam_pdf(tmp_path / f"exam{i}.pdf", questions=i + 2)
+        inputs.append(str(tmp_path / f"exam{i}.pdf"))
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    pool = BatchPool(workers=2)
+    try:
+        for index, path in enumerate(inputs):
+            pool.submit(extract_file, index, path, str(tmp_path / f"out{index}.pdf"))
+        pool.submit(validate_file, 3, str(broken))
+        results = sorted(wait_for_results(pool), key=lambda result: result['index'])
+        progress = pool.progress()
+    finally:
+        pool.shutdown()
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    for i, result in enumerate(results[:3]):
+        assert result['error'] is None
+        assert result['new_pages'] == i + 2
+        assert result['is_valid']
+        assert fitz.open(result['output_path']).page_count == i + 2
+    assert results[3]['error'] and results[3]['file_name'] == 'broken.pdf'
+    assert set(progress) <= {0, 1, 2, 3}
+
+
+def test_cancelled_batch_reports_every_file(tmp_path):
+    create_exam_pdf(tmp_path / "exam.pdf")
+
+    pool = BatchPool(workers=1)
+    try:
+        for index in range(5):
+            pool.submit(validate_file, index, str(tmp_path / "exam.pdf"))
+        pool.cancel()
+        results = wait_for_results(pool)
+    finally:
+        pool.shutdown()
+
+    assert pool.cancelled
+    assert sorted(result['index'] for result in results) == list(range(5))
+    assert all(result['error'] in (None, CANCELLED) for result in results)
+    assert any(result['error'] == CANCELLED for result in results)
+
+
+def test_shared_pool_tasks_report_through_their_own_channels(tmp_path):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    create_exam_pdf(tmp_path / "exam.pdf")
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as channels, ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        progress, cancel_event = channels.dict(), channels.Event()
+        result = executor.submit(extract_file, 0, str(tmp_path / "exam.pdf"), str(tmp_path / "out.pdf"),
+                                 {'save_profile': 'fast'}, progress=progress, cancel_event=cancel_event).result()
+        assert result['error'] is None and result['save_profile'] == 'fast'
+        assert set(progress.keys()) == {0}
+
+        cancel_event.set()
+        result = executor.submit(validate_file, 1, str(tmp_path / "exam.pdf"),
+                                 progress=progress, cancel_event=cancel_event).result()
+        assert result['error'] == CANCELLED
@@ -0,0 +1,200 @@
+import io
+
+import fitz
+import pytest
+from pdf_manager import PDFManager, SAVE_PROFILES
+
+
+def create_exam_pdf(path, questions=3, filler_pages=2):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Exam Title")
+    for q in range(1, questions + 1):
+        doc.new_page().insert_text((72, 72), f"Question {q}")
+    for _ in range(filler_pages):
+        doc.new_page().insert_text((72, 72), "Answer key")
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.mark.parametrize("profile", list(SAVE_PROFILES))
+def test_save_profiles_record_stats(tmp_path, profile):
+    src = tmp_path / "exam.pdf"
+    out = tmp_path / f"out_{profile}.pdf"
+    create_exam_pdf(src)
+
+    pm = PDFManager()
+    orig, new, questions, is_valid, missing, max_q = pm.extract_question_pages(
+        str(src), str(out), save_profile=profile
+    )
+
+    assert (orig, new, questions, is_valid) == (6, 4, [1, 2, 3], True)
+    stats = pm.last_extraction_stats
+    assert stats['save_profile'] == profile
+    assert stats['output_bytes'] == out.stat().st_size
+    assert stats['save_seconds'] >= 0
+
+
+def test_unknown_save_profile_raises(tmp_path):
+    src = tmp_path / "exam.pdf"
+    create_exam_pdf(src)
+
+    with pytest.raises(ValueError):
+        PDFManager().extract_question_pages(str(src), str(tmp_path / "out.pdf"), save_profile="tiny")
+
+
+def create_scanned_exam_pdf(path, questions=2):
+    """Each question page carries a full-page 200 DPI grayscale noise 'scan'"""
+    import random
+    rng = random.Random(0)
+    width, height = 1650, 2340
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Exam Title")
+    for q in range(1, questions + 1):
+        page = doc.new_page()
+        samples = rng.randbytes(width * height)
+        pix = fitz.Pixmap(fitz.csGRAY, width, height, samples, False)
+        page.insert_image(page.rect, pixmap=pix)
+        page.insert_text((72, 72), f"Question {q}")
+    doc.save(str(path), deflate=True)
+    doc.close()
+
+
+def test_image_downsampling_reports_bytes_saved(tmp_path):
+    src = tmp_path / "scanned.pdf"
+    plain_out = tmp_path / "plain.pdf"
+    small_out = tmp_path / "small.pdf"
+    create_scanned_exam_pdf(src)
+
+    pm = PDFManager()
+    pm.extract_question_pages(str(src), str(plain_out))
+    assert 'image_bytes_saved' not in pm.last_extraction_stats
+
+    result = pm.extract_question_pages(str(src), str(small_out), image_dpi=72, image_workers=2)
+    assert result[3] is True  # questions survive the image rewrite
+
+    stats = pm.last_extraction_stats
+    assert stats['images_recompressed'] == 2
+    assert stats['image_bytes_saved'] > 0
+    assert small_out.stat().st_size < plain_out.stat().st_size
+
+    with fitz.open(str(small_out)) as doc:
+        xref, _, width, height, *_ = doc[1].get_images(full=True)[0]
+        assert width < 1650 and height < 2340
+
+
+def test_reused_image_is_sized_for_its_largest_placement(tmp_path):
+    import random
+    src = tmp_path / "reused.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 60), "Question 1")
+    pix = fitz.Pixmap(fitz.csGRAY, 1000, 1000, random.Random(0).randbytes(1000 * 1000), False)
+    xref = page.insert_image(fitz.Rect(50, 100, 550, 600), pixmap=pix)  # 144 dpi
+    page.insert_image(fitz.Rect(50, 650, 150, 750), xref=xref)  # 720 dpi
+    doc.save(str(src), deflate=True)
+    doc.close()
+
+    def output_width(image_dpi):
+        out = tmp_path / f"out_{image_dpi}.pdf"
+        PDFManager().extract_question_pages(str(src), str(out), image_dpi=image_dpi)
+        with fitz.open(str(out)) as doc:
+            return doc[0].get_images(full=True)[0][2]
+
+    # Already below 150 dpi where it is drawn largest: left alone
+    assert output_width(150) == 1000
+    assert output_width(72) == 500
+
+def test_linearized_output(tmp_path):
+    pikepdf = pytest.importorskip("pikepdf")
+    src = tmp_path / "exam.pdf"
+    out = tmp_path / "out.pdf"
+    create_exam_pdf(src)
+
+    pm = PDFManager()
+    pm.extract_question_pages(str(src), str(out), linearize=True)
+
+    assert pm.last_extraction_stats['linearized'] is True
+    with pikepdf.open(str(out)) as pdf:
+        assert pdf.is_linearized
+    # No temporary file is left next to the output
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([src.name, out.name])
+
+
+def test_progress_callback_reports_each_phase(tmp_path):
+    src = tmp_path / "exam.pdf"
+    create_exam_pdf(src, questions=3, filler_pages=2)
+    events = []
+
+    PDFManager().extract_question_pages(str(src), str(tmp_path / "out.pdf"), progress_callback=events.append)
+
+    phases = []
+    for info in events:
+        if not phases or phases[-1] != info['phase']:
+            phases.append(info['phase'])
+    assert phases == ['scan', 'copy', 'save', 'validate']
+
+    finals = {info['phase']: info for info in events if info['done'] == info['total']}
+    assert finals['scan']['total'] == 6
+    assert finals['copy']['total'] == 4
+    assert finals['validate']['eta_seconds'] == 0
+
+
+def test_validate_progress_is_throttled(tmp_path, monkeypatch):
+    import pdf_manager
+    src = tmp_path / "long.pdf"
+    create_exam_pdf(src, questions=50, filler_pages=0)
+    monkeypatch.setattr(pdf_manager, 'PROGRESS_INTERVAL', 3600)
+    events = []
+
+    PDFManager().validate_question_continuity(str(src), events.append)
+
+    # Only the start and end of the phase get through a long interval
+    assert [(info['phase'], info['done']) for info in events] == [('scan', 0), ('scan', 51)]
+
+
+def test_cancel_token_stops_extraction_and_removes_output(tmp_path):
+    from pdf_manager import CancelToken, OperationCancelled
+    src = tmp_path / "exam.pdf"
+    out = tmp_path / "out.pdf"
+    create_exam_pdf(src, questions=20)
+    token = CancelToken()
+
+    def cancel_during_validate(info):
+        if info['phase'] == 'validate':
+            token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        PDFManager().extract_question_pages(str(src), str(out), progress_callback=cancel_during_validate,
+                                            cancel_token=token)
+    assert not out.exists()
+
+
+def test_cancelled_token_leaves_existing_output_alone(tmp_path):
+    from pdf_manager import CancelToken, OperationCancelled
+    src = tmp_path / "exam.pdf"
+    out = tmp_path / "out.pdf"
+    create_exam_pdf(src)
+    out.write_bytes(b"previous output")
+    token = CancelToken()
+    token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        PDFManager().validate_question_continuity(str(src), cancel_token=token)
+    with pytest.raises(OperationCancelled):
+        PDFManager().extract_question_pages(str(src), str(out), cancel_token=token)
+    assert out.read_bytes() == b"previous output"
+
+
+def test_extraction_from_memory_to_buffer(tmp_path):
+    src = tmp_path / "exam.pdf"
+    create_exam_pdf(src)
+    out = io.BytesIO()
+
+    pm = PDFManager()
+    result = pm.extract_question_pages(memoryview(src.read_bytes()), out, linearize=True)
+
+    assert result[:4] == (6, 4, [1, 2, 3], True)
+    assert pm.last_extraction_stats['output_bytes'] == len(out.getvalue())
+    assert pm.last_extraction_stats['linearized'] is False
+    assert pm.validate_question_continuity(out) == (True, [], 3)
+    assert list(tmp_path.iterdir()) == [src]
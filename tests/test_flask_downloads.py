@@ -0,0 +1,327 @@
+import hashlib
+import io
+
+import fitz
+import pytest
+
+import app as flask_app
+from chunked_upload import ChunkedUploads
+from task_store import TaskStore
+
+
+def make_pdf_bytes(pages=3):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Question {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    task_store = TaskStore(tmp_path / "tasks.db")
+    monkeypatch.setattr(flask_app, 'task_store', task_store)
+    return task_store
+
+
+@pytest.fixture
+def client(store):
+    flask_app.app.config['TESTING'] = True
+    with flask_app.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def extract_task(tmp_path, store):
+    output = tmp_path / "extract_output.pdf"
+    output.write_bytes(make_pdf_bytes())
+    task_id = "test-extract-task"
+    store.create_task(task_id, 'completed', mode='extract_single', output_path=str(output),
+                      output_name='June 2013 solutions.pdf')
+    return task_id, output
+
+
+def test_download_supports_range_requests(client, extract_task):
+    task_id, output = extract_task
+    data = output.read_bytes()
+
+    full = client.get(f'/download/{task_id}/0')
+    assert full.status_code == 200
+    assert full.headers['Accept-Ranges'] == 'bytes'
+    assert full.data == data
+
+    partial = client.get(f'/download/{task_id}/0', headers={'Range': 'bytes=0-99'})
+    assert partial.status_code == 206
+    assert partial.data == data[:100]
+    assert partial.headers['Content-Range'] == f'bytes 0-99/{len(data)}'
+
+
+def test_merge_redirects_to_range_capable_download(client):
+    upload = client.post('/upload', data={
+        'pdfs': [(io.BytesIO(make_pdf_bytes(2)), 'a.pdf'), (io.BytesIO(make_pdf_bytes(1)), 'b.pdf')]
+    }, content_type='multipart/form-data')
+    assert upload.status_code == 302
+
+    merged = client.post('/merge')
+    assert merged.status_code == 303
+    location = merged.headers['Location']
+
+    response = client.get(location)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    with fitz.open(stream=response.data, filetype='pdf') as doc:
+        assert len(doc) == 3
+
+    partial = client.get(location, headers={'Range': 'bytes=-50'})
+    assert partial.status_code == 206
+    assert partial.data == response.data[-50:]
+
+    client.post('/new')
+
+
+def test_fast_web_view_is_disabled_without_pikepdf(client, monkeypatch):
+    monkeypatch.setattr(flask_app, 'PIKEPDF_AVAILABLE', False)
+    page = client.get('/extract').get_data(as_text=True)
+    assert 'id="singleLinearize" name="linearize" value="1" disabled' in page
+    assert 'pikepdf is not installed' in page
+
+    client.post('/upload', data={'pdfs': [(io.BytesIO(make_pdf_bytes(1)), 'a.pdf')]},
+                content_type='multipart/form-data')
+    monkeypatch.setattr('pdf_manager.PIKEPDF_AVAILABLE', False)
+    assert client.post('/merge', data={'linearize': '1'}).status_code == 303
+    with client.session_transaction() as flask_session:
+        assert any('Fast web view is not available' in message
+                   for _, message in flask_session.get('_flashes', []))
+    client.post('/new')
+
+
+def test_download_conditional_get_uses_content_hash(client, extract_task):
+    import hashlib
+    task_id, output = extract_task
+    digest = hashlib.sha256(output.read_bytes()).hexdigest()
+
+    response = client.get(f'/download/{task_id}/0')
+    assert response.headers['ETag'] == f'"{digest}"'
+    assert 'Last-Modified' in response.headers
+
+    not_modified = client.get(f'/download/{task_id}/0', headers={'If-None-Match': f'"{digest}"'})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+    since = client.get(f'/download/{task_id}/0', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert since.status_code == 304
+
+    # If-Range with the current validator resumes; a stale one gets the whole file
+    resumed = client.get(f'/download/{task_id}/0', headers={'Range': 'bytes=10-', 'If-Range': f'"{digest}"'})
+    assert resumed.status_code == 206
+    stale = client.get(f'/download/{task_id}/0', headers={'Range': 'bytes=10-', 'If-Range': '"stale"'})
+    assert stale.status_code == 200
+    assert stale.data == output.read_bytes()
+
+
+def test_download_all_streams_batch_outputs_as_zip(client, store, tmp_path):
+    import zipfile
+    outputs = []
+    for idx, pages in enumerate((2, 3)):
+        output = tmp_path / f"batch_output_{idx}.pdf"
+        output.write_bytes(make_pdf_bytes(pages))
+        outputs.append(output)
+
+    task_id = "test-batch-task"
+    store.create_task(task_id, 'completed', mode='extract_batch', results=[
+        {'output_name': 'Exam.pdf', 'output_path': str(outputs[0]), 'error': None},
+        {'output_name': '', 'output_path': '', 'error': 'Not a PDF'},
+        {'output_name': 'Exam.pdf', 'output_path': str(outputs[1]), 'error': None},
+    ])
+
+    response = client.get(f'/download-all/{task_id}')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert response.is_streamed
+
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert archive.namelist() == ['Exam.pdf', 'Exam (2).pdf']
+        assert archive.read('Exam.pdf') == outputs[0].read_bytes()
+        assert archive.read('Exam (2).pdf') == outputs[1].read_bytes()
+
+
+def test_download_all_gives_up_on_a_stalled_batch(client, store, tmp_path, monkeypatch):
+    monkeypatch.setattr(flask_app, 'ZIP_IDLE_SECONDS', 0)
+    output = tmp_path / "batch_output_0.pdf"
+    output.write_bytes(make_pdf_bytes())
+    store.create_task('stalled', 'processing', mode='extract_batch', results=[
+        {'output_name': 'Exam.pdf', 'output_path': str(output), 'error': None},
+    ])
+
+    response = client.get('/download-all/stalled')
+    with pytest.raises(TimeoutError):
+        response.get_data()
+
+
+def test_task_events_stream_resumes_from_last_event_id(client, store):
+    task_id = "test-events-task"
+    store.create_task(task_id, 'completed', mode='validate_batch', results=[])
+    store.push_event(task_id, 'file_started', {'index': 0, 'total': 1, 'name': 'a.pdf'})
+    store.push_event(task_id, 'file_finished', {'index': 0, 'total': 1, 'result': {'error': None}})
+    store.push_event(task_id, 'complete', {'status': 'completed'})
+
+    response = client.get(f'/api/task/{task_id}/events')
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert [line for line in body.splitlines() if line.startswith('event:')] == [
+        'event: file_started', 'event: file_finished', 'event: complete'
+    ]
+    assert 'data: {"index": 0, "total": 1, "name": "a.pdf"}' in body
+
+    resumed = client.get(f'/api/task/{task_id}/events', headers={'Last-Event-ID': '2'})
+    assert resumed.get_data(as_text=True) == 'id: 3\nevent: complete\ndata: {"status": "completed"}\n\n'
+
+    # Polling stays available and does not carry the event log
+    assert 'events' not in client.get(f'/api/task/{task_id}').get_json()
+
+
+def test_cancel_queued_task_drops_it_from_the_queue(client, store):
+    task_id = "test-cancel-task"
+    store.enqueue_task(task_id, 'validate_batch', {'files': []}, results=[])
+
+    response = client.post(f'/api/task/{task_id}/cancel')
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'cancelled'
+    assert store.claim_job('test-worker') is None
+    assert [event['event'] for event in store.get_events(task_id)] == ['cancelled']
+
+    again = client.post(f'/api/task/{task_id}/cancel')
+    assert again.status_code == 409
+
+
+def test_dispatcher_runs_jobs_queued_before_a_restart(client, store, monkeypatch):
+    import time
+    monkeypatch.setattr(flask_app, 'ORPHANED_JOB_SECONDS', 0)
+    # Queued directly, as if by a process that exited before handing it to a pool
+    store.enqueue_task('orphaned-task', 'validate_batch', {'files': []}, results=[])
+
+    deadline = time.time() + 10
+    while store.get_task('orphaned-task')['status'] != 'completed':
+        assert time.time() < deadline, "the dispatcher did not pick up the queued job"
+        time.sleep(0.1)
+
+
+def test_validate_runs_through_task_store(client, store):
+    response = client.post('/validate', data={
+        'mode': 'single', 'pdf': (io.BytesIO(make_pdf_bytes(3)), 'exam.pdf')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 302
+    task_id = response.headers['Location'].rsplit('/', 1)[-1]
+
+    events = client.get(f'/api/task/{task_id}/events').get_data(as_text=True)
+    assert 'event: complete' in events
+
+    task = client.get(f'/api/task/{task_id}').get_json()
+    assert task['status'] == 'completed'
+    assert (task['is_valid'], task['max_question']) == (True, 3)
+    client.post('/new')
+
+
+def test_streamed_batch_extract_uses_options_sent_before_files(client, store):
+    response = client.post('/extract?mode=batch', data={
+        'save_profile': 'fast',
+        'image_dpi': '',
+        'pdfs': [(io.BytesIO(make_pdf_bytes(2)), 'a.pdf'), (io.BytesIO(b''), ''),
+                 (io.BytesIO(make_pdf_bytes(3)), 'b.pdf')]
+    }, content_type='multipart/form-data')
+    assert response.status_code == 302
+    task_id = response.headers['Location'].rsplit('/', 1)[-1]
+
+    events = client.get(f'/api/task/{task_id}/events').get_data(as_text=True)
+    assert 'event: complete' in events
+
+    task = client.get(f'/api/task/{task_id}').get_json()
+    assert task['options']['save_profile'] == 'fast'
+    assert [(result['input_name'], result['max_question']) for result in task['results']] == [('a.pdf', 2), ('b.pdf', 3)]
+    assert all(result['error'] is None for result in task['results'])
+    client.post('/new')
+
+
+def test_streamed_batch_without_files_is_rejected(client, store):
+    response = client.post('/validate?mode=batch', data={'mode': 'batch', 'pdfs': (io.BytesIO(b''), '')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/validate')
+
+
+def test_chunked_upload_resumes_and_feeds_a_form(client, store, tmp_path, monkeypatch):
+    monkeypatch.setattr(flask_app, 'chunked_uploads',
+                        ChunkedUploads(flask_app.upload_store, tmp_path / "partial", chunk_size=1000))
+    data = make_pdf_bytes(3)
+    chunks = [data[start:start + 1000] for start in range(0, len(data), 1000)]
+
+    upload = client.post('/api/uploads', json={'filename': 'big exam.pdf', 'size': len(data)}).get_json()
+    upload_id = upload['upload_id']
+    assert upload['chunk_count'] == len(chunks) and upload['received'] == []
+
+    bad = client.put(f'/api/uploads/{upload_id}/chunks/0', data=chunks[0],
+                     headers={'X-Chunk-SHA256': hashlib.sha256(b'other').hexdigest()})
+    assert bad.status_code == 400
+    for index in range(len(chunks) - 1, 0, -1):
+        client.put(f'/api/uploads/{upload_id}/chunks/{index}', data=chunks[index],
+                   headers={'X-Chunk-SHA256': hashlib.sha256(chunks[index]).hexdigest()})
+
+    # After a dropped connection the client asks which chunks still need sending
+    assert client.get(f'/api/uploads/{upload_id}').get_json()['received'] == list(range(1, len(chunks)))
+    assert client.post(f'/api/uploads/{upload_id}/complete').status_code == 400
+    client.put(f'/api/uploads/{upload_id}/chunks/0', data=chunks[0],
+               headers={'X-Chunk-SHA256': hashlib.sha256(chunks[0]).hexdigest()})
+    completed = client.post(f'/api/uploads/{upload_id}/complete').get_json()
+    assert completed['sha256'] == hashlib.sha256(data).hexdigest()
+
+    response = client.post('/validate', data={'mode': 'single', 'pdf_upload_id': upload_id})
+    task_id = response.headers['Location'].rsplit('/', 1)[-1]
+    assert 'event: complete' in client.get(f'/api/task/{task_id}/events').get_data(as_text=True)
+    task = client.get(f'/api/task/{task_id}').get_json()
+    assert (task['file_name'], task['max_question']) == ('big exam.pdf', 3)
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 404
+    client.post('/new')
+
+
+def test_task_status_reads_page_progress_from_events(client, store):
+    store.create_task('running', 'processing', mode='validate_single')
+    assert client.get('/api/task/running').get_json()['page_progress'] is None
+
+    for done in (1, 2):
+        store.push_event('running', 'page_progress', {'phase': 'scan', 'done': done, 'total': 2})
+    assert client.get('/api/task/running').get_json()['page_progress']['done'] == 2
+
+
+def test_batch_upload_stops_once_its_task_is_cancelled(store, monkeypatch):
+    from pathlib import Path
+    monkeypatch.setattr(flask_app, 'EXTERNAL_WORKERS', True)
+    folder = Path('./uploads/test-cancelled-upload').resolve()
+    folder.mkdir(parents=True, exist_ok=True)
+
+    def save(path):
+        Path(path).write_bytes(make_pdf_bytes())
+        return 'sha'
+
+    def uploads():
+        yield 'a.pdf', save
+        store.request_cancel('cancelled-upload')
+        yield 'b.pdf', save
+        yield 'c.pdf', save
+
+    def describe_file(idx, filename):
+        return {'input_name': filename, 'input_path': str(folder / f"{idx}.pdf")}
+
+    assert flask_app.queue_batch_uploads('cancelled-upload', 'validate_batch', uploads(), describe_file, {}) == 1
+    # Nothing after the cancel is saved, and the file already staged is discarded
+    assert list(folder.iterdir()) == []
+
+
+def test_discarded_chunked_upload_is_left_to_the_janitor(client, store):
+    assert flask_app.chunked_uploads.remove_folder == flask_app.janitor.discard
+    upload = client.post('/api/uploads', json={'filename': 'a.pdf', 'size': 10}).get_json()
+    folder = flask_app.chunked_uploads.root / upload['upload_id']
+    assert folder.is_dir()
+
+    assert client.delete(f"/api/uploads/{upload['upload_id']}").status_code == 204
+    assert not folder.exists()
@@ -0,0 +1,107 @@
+import os
+import time
+
+from janitor import Janitor, TRASH_DIR_NAME, touch
+from upload_store import UploadStore
+
+
+def make_file(path, size, age, now):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (now - age, now - age))
+    return path
+
+
+def test_sweep_evicts_by_age_then_lru_within_quotas(tmp_path):
+    now = time.time()
+    uploads, thumbs = tmp_path / "uploads", tmp_path / "thumbs"
+    stale = make_file(uploads / "idle-session" / "exam.pdf", 10, age=100000, now=now)
+    oldest = make_file(uploads / "busy" / "a.pdf", 60, age=5000, now=now)
+    newer = make_file(thumbs / "busy" / "page.png", 30, age=4000, now=now)
+    running = make_file(uploads / "busy" / "batch_input.pdf", 60, age=10, now=now)
+    janitor = Janitor([uploads, thumbs], max_age=86400, min_age=600, session_quota=100, global_quota=1000)
+
+    stats = janitor.sweep(now)
+
+    assert stats['expired'] == 1 and stats['session_quota'] == 1
+    assert not stale.exists() and not (uploads / "idle-session").exists()
+    # Least recently used goes first; files in use by a running job are never evicted
+    assert not oldest.exists() and newer.exists() and running.exists()
+    assert not any((uploads / TRASH_DIR_NAME).iterdir())
+
+
+def test_global_quota_counts_hardlinked_uploads_once(tmp_path):
+    now = time.time()
+    uploads = tmp_path / "uploads"
+    store = UploadStore(uploads / ".blobs")
+    (uploads / "a").mkdir(parents=True)
+    (uploads / "b").mkdir()
+    digest = store.save([b"y" * 100], uploads / "a" / "shared.pdf")
+    store.link(digest, uploads / "b" / "shared.pdf")
+    for path in (uploads / "a" / "shared.pdf", uploads / "b" / "shared.pdf"):
+        os.utime(path, (now - 5000, now - 5000))
+    make_file(uploads / "b" / "own.pdf", 50, age=4000, now=now)
+
+    # 150 unique bytes: dropping one link of the shared file frees nothing, so
+    # eviction carries on to the next least recently used file
+    janitor = Janitor([uploads], upload_store=store, min_age=0, global_quota=120)
+    stats = janitor.sweep(now)
+
+    assert stats['global_quota'] == 2
+    assert [p.name for p in (uploads / "b").iterdir()] == ["own.pdf"]
+    assert not (uploads / "a" / "shared.pdf").exists()
+    # With its last session link gone the blob itself is pruned
+    assert stats['blobs'] == 1 and not store.has(digest)
+
+
+def test_discard_session_is_a_rename(tmp_path):
+    uploads = tmp_path / "uploads"
+    make_file(uploads / "s1" / "big.pdf", 10, age=0, now=time.time())
+    janitor = Janitor([uploads])
+
+    janitor.discard_session("s1")
+    janitor.discard_session("never-existed")
+
+    assert not (uploads / "s1").exists()
+    assert [p.name.split('-', 1)[1] for p in (uploads / TRASH_DIR_NAME).iterdir()] == ["s1"]
+
+    janitor.empty_trash()
+    assert not any((uploads / TRASH_DIR_NAME).iterdir())
+
+
+def test_files_of_unfinished_jobs_are_never_evicted(tmp_path):
+    now = time.time()
+    uploads = tmp_path / "uploads"
+    queued_input = make_file(uploads / "s1" / "queued.pdf", 60, age=100000, now=now)
+    idle = make_file(uploads / "s1" / "idle.pdf", 60, age=5000, now=now)
+    # A fresh atime (e.g. a read on a relatime mount) is not a use
+    os.utime(idle, (now, now - 5000))
+    janitor = Janitor([uploads], max_age=86400, min_age=600, session_quota=100,
+                      in_use=lambda: [str(queued_input)])
+
+    stats = janitor.sweep(now)
+
+    assert stats == {**stats, 'expired': 0, 'session_quota': 1}
+    assert queued_input.exists() and not idle.exists()
+
+
+def test_touch_marks_a_file_used(tmp_path):
+    now = time.time()
+    path = make_file(tmp_path / "uploads" / "s1" / "exam.pdf", 10, age=100000, now=now)
+    touch(path)
+    touch(tmp_path / "missing.pdf")
+
+    assert Janitor([tmp_path / "uploads"], max_age=86400).sweep()['expired'] == 0
+    assert path.exists()
+
+
+def test_only_one_janitor_per_root_sweeps(tmp_path):
+    first, second = Janitor([tmp_path / "uploads"]), Janitor([tmp_path / "uploads"])
+
+    assert first._acquire_sweep_lock()
+    assert first._acquire_sweep_lock()
+    assert not second._acquire_sweep_lock()
+
+    # The lock goes with its holder (on exit in practice)
+    first._sweep_lock_file.close()
+    assert second._acquire_sweep_lock()
@@ -79,4 +79,51 @@ def test_merge_ignores_missing_pdf_pages(tmp_path):
     # Should not raise and merged output should contain only 1 valid page
     pm.merge_all(str(out))
     reader = PdfReader(str(out))
-    assert len(reader.pages) == 1
\ No newline at end of file
+    assert len(reader.pages) == 1
+
+def test_parallel_merge_preserves_page_order(tmp_path, monkeypatch):
+    import fitz
+    import pdf_manager
+
+    # Small fan-in so the merge tree has more than one level
+    monkeypatch.setattr(pdf_manager, 'MERGE_FAN_IN', 2)
+
+    pm = PDFManager()
+    for name, pages in (("a", 3), ("b", 4), ("c", 2)):
+        doc = fitz.open()
+        for i in range(pages):
+            doc.new_page().insert_text((72, 72), f"{name}{i}")
+        doc.save(str(tmp_path / f"{name}.pdf"))
+        doc.close()
+        pm.add_pdf(str(tmp_path / f"{name}.pdf"))
+
+    # Drop one page so the plan is not simply every page of every source
+    pm.remove_page(pm.all_pages[1]['id'])
+    expected = [f"{pm.pdfs[p['pdf_id']]['name'][0]}{p['page_index']}" for p in pm.all_pages]
+
+    out = tmp_path / "merged_parallel.pdf"
+    pm.merge_all(str(out), parallel=True, workers=2, chunk_pages=2)
+
+    with fitz.open(str(out)) as doc:
+        assert [page.get_text().strip() for page in doc] == expected
+    # Temporary partial outputs are removed
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == []
+
+
+def test_merges_go_parallel_from_the_page_threshold(tmp_path, monkeypatch):
+    import pdf_manager
+    monkeypatch.setattr(pdf_manager, 'PARALLEL_MERGE_MIN_PAGES', 4)
+    parallel_merges = []
+    monkeypatch.setattr(PDFManager, '_merge_parallel',
+                        lambda self, plan, output_path, workers, chunk_pages: parallel_merges.append(len(plan)))
+
+    pm = PDFManager()
+    create_pdf(tmp_path / "a.pdf", pages=3)
+    pm.add_pdf(str(tmp_path / "a.pdf"))
+    pm.merge_all(str(tmp_path / "small.pdf"), chunk_pages=2)
+    assert parallel_merges == [] and (tmp_path / "small.pdf").exists()
+
+    pm.add_pdf(str(tmp_path / "a.pdf"))
+    pm.merge_all(str(tmp_path / "large.pdf"), chunk_pages=2)
+    pm.merge_all(str(tmp_path / "forced_serial.pdf"), parallel=False, chunk_pages=2)
+    assert parallel_merges == [6]
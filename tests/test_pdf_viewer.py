@@ -31,3 +31,59 @@ def test_generate_thumbnail_returns_photoimage(tmp_path):
         assert isinstance(thumb, tkinter.PhotoImage)
     finally:
         root.destroy()
+
+
+def test_render_page_png_uses_an_open_document(tmp_path):
+    import fitz
+    p = tmp_path / "sample.pdf"
+    create_sample_pdf(p)
+
+    with fitz.open(p) as doc:
+        png = PDFViewer.render_page_png(doc, 0, width=120)
+        assert png.startswith(b'\x89PNG')
+        assert fitz.Pixmap(png).width == 120
+        assert PDFViewer.render_page_png(doc, 5) is None
+
+
+def test_render_thumbnail_ppm_runs_in_a_worker_process(tmp_path):
+    import fitz
+    from concurrent.futures import ProcessPoolExecutor
+    from pdf_viewer import render_thumbnail_ppm
+    p = tmp_path / "sample.pdf"
+    create_sample_pdf(p)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        ppm = executor.submit(render_thumbnail_ppm, str(p), 0, 150).result()
+        missing = executor.submit(render_thumbnail_ppm, str(p), 3, 150).result()
+
+    assert ppm.startswith(b'P6')
+    assert fitz.Pixmap(ppm).width == 150
+    assert missing is None
+
+
+def test_photo_image_cache_evicts_least_recently_used_by_pixels():
+    from pdf_viewer import PhotoImageCache
+
+    class Image:
+        def __init__(self, width, height):
+            self._width, self._height = width, height
+
+        def width(self):
+            return self._width
+
+        def height(self):
+            return self._height
+
+    cache = PhotoImageCache(max_pixels=300)
+    cache.put('a', Image(10, 10))
+    cache.put('b', Image(10, 10))
+    cache.put('c', Image(10, 10))
+    assert cache.get('a') is not None  # a is now the most recently used
+    cache.put('d', Image(10, 10))
+
+    assert cache.get('b') is None
+    assert [key for key in 'acd' if cache.get(key)] == ['a', 'c', 'd']
+    assert cache.pixels == 300
+
+    cache.discard(lambda key: key in ('a', 'c'))
+    assert len(cache) == 1 and cache.pixels == 100
@@ -0,0 +1,219 @@
+import threading
+import time
+
+import fitz
+
+from task_store import TaskStore
+from worker import work
+
+
+def create_exam_pdf(path, questions=3):
+    doc = fitz.open()
+    for q in range(1, questions + 1):
+        doc.new_page().insert_text((72, 72), f"Question {q}")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_jobs_are_claimed_once_in_queue_order(tmp_path):
+    db = tmp_path / "tasks.db"
+    web, worker_a, worker_b = TaskStore(db), TaskStore(db), TaskStore(db)
+    web.enqueue_task('first', 'validate_single', {'n': 1})
+    web.enqueue_task('second', 'validate_single', {'n': 2})
+
+    assert worker_a.claim_job('a') == ('first', 'validate_single', {'n': 1})
+    assert worker_b.claim_job('b') == ('second', 'validate_single', {'n': 2})
+    assert worker_a.claim_job('a') is None
+
+    # A claimed job can no longer be dropped; the worker sees the request instead
+    assert web.request_cancel('first') is False
+    assert worker_a.is_cancel_requested('first')
+
+
+def test_task_updates_are_visible_across_connections(tmp_path):
+    db = tmp_path / "tasks.db"
+    writer, reader = TaskStore(db), TaskStore(db)
+    writer.create_task('t', mode='extract_batch', results=[])
+    writer.append_result('t', {'output_name': 'a.pdf'})
+    writer.update_task('t', status='completed', progress='1/1')
+    writer.push_event('t', 'complete', {'status': 'completed'})
+
+    assert reader.get_task('t') == {
+        'status': 'completed', 'mode': 'extract_batch', 'results': [{'output_name': 'a.pdf'}], 'progress': '1/1'
+    }
+    assert reader.get_events('t') == [{'id': 1, 'event': 'complete', 'data': {'status': 'completed'}}]
+    assert reader.get_task('missing') is None
+
+
+def test_worker_runs_queued_batch(tmp_path):
+    store = TaskStore(tmp_path / "tasks.db")
+    good = tmp_path / "good.pdf"
+    create_exam_pdf(good)
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    store.enqueue_task('batch', 'validate_batch', {'files': [
+        {'input_name': 'good.pdf', 'input_path': str(good)},
+        {'input_name': 'bad.pdf', 'input_path': str(bad)},
+    ]}, results=[])
+
+    assert work(store, 'test-worker', once=True) == 1
+
+    task = store.get_task('batch')
+    assert task['status'] == 'completed'
+    assert [(r['file_name'], r['is_valid'], r['error'] is None) for r in task['results']] == [
+        ('good.pdf', True, True), ('bad.pdf', False, False)
+    ]
+    assert store.get_events('batch')[-1]['event'] == 'complete'
+
+
+
+def test_batch_job_processes_files_while_upload_continues(tmp_path):
+    store = TaskStore(tmp_path / "tasks.db")
+    first, second = tmp_path / "first.pdf", tmp_path / "second.pdf"
+    create_exam_pdf(first, questions=2)
+    create_exam_pdf(second, questions=4)
+    store.enqueue_task('batch', 'validate_batch', {'files': [
+        {'input_name': 'first.pdf', 'input_path': str(first)},
+    ], 'uploading': True}, results=[])
+
+    worker = threading.Thread(target=work, args=(store, 'test-worker'), kwargs={'once': True})
+    worker.start()
+    deadline = time.monotonic() + 10
+    while not store.get_task('batch')['results'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    # The first file is done before the upload has even delivered the second
+    assert [r['max_question'] for r in store.get_task('batch')['results']] == [2]
+
+    store.add_job_file('batch', {'input_name': 'second.pdf', 'input_path': str(second)})
+    store.close_job_input('batch')
+    worker.join(10)
+
+    task = store.get_task('batch')
+    assert task['status'] == 'completed'
+    assert [r['max_question'] for r in task['results']] == [2, 4]
+
+def test_memo_is_single_flight_and_bounded(tmp_path, monkeypatch):
+    import task_store
+    db = tmp_path / "tasks.db"
+    first, second = TaskStore(db), TaskStore(db)
+
+    assert first.claim_memo('k', 'job-1') == ('owner', None)
+    assert second.claim_memo('k', 'job-2') == ('wait', None)
+    first.complete_memo('k', {'is_valid': True})
+    assert second.claim_memo('k', 'job-2') == ('hit', {'is_valid': True})
+
+    # A failed owner releases the key for the next job
+    assert first.claim_memo('other', 'job-1') == ('owner', None)
+    first.abandon_memo('other', 'job-1')
+    assert second.claim_memo('other', 'job-2') == ('owner', None)
+
+    monkeypatch.setattr(task_store, 'MEMO_MAX_ENTRIES', 2)
+    for key in ('a', 'b', 'c'):
+        first.claim_memo(key, 'job-1')
+        first.complete_memo(key, {'key': key})
+    assert first.claim_memo('a', 'job-1') == ('owner', None)  # Least recently used was evicted
+    assert first.claim_memo('c', 'job-1') == ('hit', {'key': 'c'})
+
+
+def test_identical_uploads_reuse_extraction(tmp_path):
+    store = TaskStore(tmp_path / "tasks.db")
+    source = tmp_path / "exam.pdf"
+    create_exam_pdf(source)
+    files = [
+        {'input_name': 'exam.pdf', 'input_path': str(source), 'sha256': 'same-content',
+         'output_path': str(tmp_path / f"out_{idx}.pdf")}
+        for idx in range(2)
+    ]
+    store.enqueue_task('batch', 'extract_batch', {'files': files, 'options': {'save_profile': 'fast'}}, results=[])
+
+    work(store, 'test-worker', once=True)
+
+    results = store.get_task('batch')['results']
+    assert [r['cached'] for r in results] == [False, True]
+    assert [r['new_pages'] for r in results] == [3, 3]
+    assert (tmp_path / "out_1.pdf").read_bytes() == (tmp_path / "out_0.pdf").read_bytes()
+
+
+def test_job_with_expired_lease_fails_its_task(tmp_path):
+    from jobs import fail_expired_jobs
+    from task_store import JOB_LEASE_SECONDS
+    store = TaskStore(tmp_path / "tasks.db")
+    store.enqueue_task('stuck', 'validate_single', {'input_path': 'x.pdf'})
+    store.claim_job('dead-worker')
+    store.claim_memo('key', 'stuck')
+
+    # A renewed lease keeps the job
+    store.renew_job('stuck')
+    assert store.expire_jobs() == []
+    assert store.expire_jobs(now=time.time() + JOB_LEASE_SECONDS + 1) == ['stuck']
+    assert store.expire_jobs(now=time.time() + JOB_LEASE_SECONDS + 1) == []
+    assert store.claim_memo('key', 'next-job') == ('owner', None)
+
+    store.enqueue_task('stuck-too', 'validate_single', {'input_path': 'x.pdf'})
+    store.claim_job('dead-worker')
+    store._connect().execute("UPDATE jobs SET claimed_at = 0 WHERE task_id = 'stuck-too'")
+    assert fail_expired_jobs(store) == 1
+    assert store.get_task('stuck-too')['status'] == 'error'
+    assert store.get_events('stuck-too')[-1]['event'] == 'failed'
+
+
+def test_queued_job_is_picked_up_after_restart(tmp_path):
+    store = TaskStore(tmp_path / "tasks.db")
+    store.enqueue_task('left-over', 'validate_batch', {'files': []}, results=[])
+
+    assert store.has_queued_jobs()
+    assert not store.has_queued_jobs(enqueued_before=time.time() - 60)
+    assert work(store, 'restarted-worker', once=True) == 1
+    assert store.get_task('left-over')['status'] == 'completed'
+    assert not store.has_queued_jobs()
+
+
+def test_purge_deletes_old_finished_tasks(tmp_path):
+    store = TaskStore(tmp_path / "tasks.db")
+    for task_id, status in (('old', 'completed'), ('running', 'processing'), ('recent', 'completed')):
+        store.create_task(task_id, status)
+        store.push_event(task_id, 'page_progress', {'done': 1})
+        store.push_event(task_id, 'complete', {'status': 'completed'})
+    store._connect().execute("UPDATE tasks SET updated_at = updated_at - 7200 WHERE id IN ('old', 'running')")
+
+    assert store.purge_tasks(max_age=3600, progress_max_age=600) == 1
+    assert store.get_task('old') is None and store.get_events('old') == []
+    assert [event['event'] for event in store.get_events('running')] == ['page_progress', 'complete']
+    assert [event['event'] for event in store.get_events('recent')] == ['page_progress', 'complete']
+
+    # Progress events of finished tasks go sooner than the tasks themselves
+    store.purge_tasks(max_age=3600, progress_max_age=-1)
+    assert store.get_task('recent') is not None
+    assert [event['event'] for event in store.get_events('recent')] == ['complete']
+
+
+def test_pending_memo_lives_as_long_as_its_owner_heartbeats(tmp_path, monkeypatch):
+    import task_store
+    monkeypatch.setattr(task_store, 'MEMO_HEARTBEAT_TIMEOUT', 0.2)
+    db = tmp_path / "tasks.db"
+    owner, other = TaskStore(db), TaskStore(db)
+
+    assert owner.claim_memo('slow', 'job-1') == ('owner', None)
+    for _ in range(3):
+        time.sleep(0.1)
+        owner.heartbeat_memo('slow', 'job-1')
+        assert other.claim_memo('slow', 'job-2') == ('wait', None)
+
+    # Heartbeats stopped: the owner is presumed dead and the key is free again
+    time.sleep(0.3)
+    assert other.claim_memo('slow', 'job-2') == ('owner', None)
+
+
+def test_memo_heartbeat_column_is_added_to_old_databases(tmp_path):
+    import sqlite3
+    db = tmp_path / "tasks.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE memo (key TEXT PRIMARY KEY, state TEXT NOT NULL, owner TEXT, result TEXT, "
+                 "created_at REAL NOT NULL, last_used REAL NOT NULL)")
+    conn.execute("INSERT INTO memo VALUES ('old', 'pending', 'job-0', NULL, ?, ?)", (time.time(), time.time()))
+    conn.commit()
+    conn.close()
+
+    store = TaskStore(db)
+    assert store.claim_memo('old', 'job-1') == ('wait', None)
+    assert store.claim_memo('new', 'job-1') == ('owner', None)
@@ -0,0 +1,66 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from chunked_upload import ChunkedUploads
+from upload_store import UploadStore
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    store = UploadStore(tmp_path / "blobs")
+    data = b"%PDF-1.4 same content" * 1000
+    session_a, session_b = tmp_path / "a", tmp_path / "b"
+    session_a.mkdir()
+    session_b.mkdir()
+
+    digest = store.save([data[:100], data[100:]], session_a / "exam.pdf")
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert store.save([data], session_b / "copy.pdf") == digest
+
+    assert (session_b / "copy.pdf").read_bytes() == data
+    assert [path.name for path in (tmp_path / "blobs").rglob("*") if path.is_file()] == [digest]
+    assert store.refcount(digest) == 2
+    assert os.path.samefile(session_a / "exam.pdf", store.blob_path(digest))
+
+
+def test_prune_removes_only_unreferenced_blobs(tmp_path):
+    store = UploadStore(tmp_path / "blobs")
+    kept = store.save([b"kept"], tmp_path / "kept.pdf")
+    dropped = store.save([b"dropped"], tmp_path / "dropped.pdf")
+    os.remove(tmp_path / "dropped.pdf")
+
+    assert store.prune(grace_seconds=60) == 0  # Too recent to prune
+    assert store.prune(grace_seconds=0) == 1
+    assert store.has(kept) and not store.has(dropped)
+
+    # Re-linking a known blob is enough to re-add it
+    store.link(kept, tmp_path / "again.pdf")
+    assert (tmp_path / "again.pdf").read_bytes() == b"kept"
+
+
+def test_linking_a_pruned_blob_raises_so_callers_store_it_again(tmp_path):
+    store = UploadStore(tmp_path / "blobs")
+    digest = store.save([b"content"], tmp_path / "first.pdf")
+    os.remove(tmp_path / "first.pdf")
+    store.prune(grace_seconds=0)
+
+    with pytest.raises(FileNotFoundError):
+        store.link(digest, tmp_path / "second.pdf")
+    assert store.save([b"content"], tmp_path / "second.pdf") == digest
+    assert (tmp_path / "second.pdf").read_bytes() == b"content"
+
+
+def test_chunks_must_match_their_expected_length(tmp_path):
+    uploads = ChunkedUploads(UploadStore(tmp_path / "blobs"), tmp_path / "partial", chunk_size=4)
+    upload = uploads.create('session', 'a.pdf', 6)
+    assert upload['chunk_count'] == 2
+
+    with pytest.raises(ValueError):
+        uploads.write_chunk(upload['upload_id'], 'session', 1, io.BytesIO(b'abc'), hashlib.sha256(b'abc').hexdigest())
+    assert uploads.write_chunk(upload['upload_id'], 'session', 1, io.BytesIO(b'ef'),
+                               hashlib.sha256(b'ef').hexdigest()) == [1]
+    # Uploads are private to the session that started them
+    assert uploads.status(upload['upload_id'], 'someone else') is None
+    assert uploads.status('../../etc', 'session') is None
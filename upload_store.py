@@ -0,0 +1,131 @@
+"""
+Upload Store - Content-addressed storage for uploaded PDFs
+
+Every distinct upload is stored once under <root>/<first two hex digits>/<sha256>.
+Session folders get hardlinks to those blobs, so the same PDF uploaded by many
+sessions (or many times by one) takes the space of one copy. A blob's hardlink
+count doubles as its reference count: deleting a session folder drops that
+session's references, and prune() removes blobs nobody references any more.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+DEFAULT_BLOB_DIR = os.environ.get('UPLOAD_BLOB_DIR', './uploads/.blobs')
+
+# prune() leaves blobs written or re-used this recently alone, so it cannot
+# race an upload that is about to link one
+PRUNE_GRACE_SECONDS = 300
+
+
+class UploadStore:
+    """
+    Deduplicating blob store with per-session hardlinks.
+
+    Content is hashed while it is written to a temporary file, which is then
+    renamed onto its digest; a blob that already exists is kept and the new
+    copy discarded. Where hardlinks are unavailable (another filesystem, or an
+    OS without them) sessions get a plain copy instead.
+    """
+
+    def __init__(self, root=DEFAULT_BLOB_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: Optional[str]) -> bool:
+        return bool(digest) and self.blob_path(digest).exists()
+
+    def write(self, chunks: Iterable[bytes]) -> str:
+        """Store content (hashing it during the write) and return its SHA-256"""
+        digest = hashlib.sha256()
+        fd, temp_name = tempfile.mkstemp(dir=self.root, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    out.write(chunk)
+            blob = self.blob_path(digest.hexdigest())
+            with self._lock:
+                if blob.exists():
+                    os.remove(temp_name)
+                    os.utime(blob)
+                else:
+                    blob.parent.mkdir(exist_ok=True)
+                    os.replace(temp_name, blob)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+        return digest.hexdigest()
+
+    def link(self, digest: str, destination) -> Path:
+        """
+        Make `destination` refer to a stored blob (a hardlink where possible).
+
+        Raises:
+            FileNotFoundError: The blob does not exist (or was just pruned);
+                store the content again with save()
+        """
+        destination = Path(destination)
+        blob = self.blob_path(digest)
+        # Under the lock prune() takes, so a blob found here is not deleted before it is linked
+        with self._lock:
+            if destination.exists():
+                if os.path.samefile(blob, destination):
+                    return destination
+                os.remove(destination)
+            try:
+                os.link(blob, destination)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                shutil.copyfile(blob, destination)
+        # A link shares the blob's old mtime; mark it used now so it is not evicted as stale
+        os.utime(destination)
+        return destination
+
+    def save(self, chunks: Iterable[bytes], destination) -> str:
+        """Store content and link it at `destination`; returns its SHA-256"""
+        digest = self.write(chunks)
+        self.link(digest, destination)
+        return digest
+
+    def refcount(self, digest: str) -> int:
+        """Number of session files linked to a blob"""
+        try:
+            return os.stat(self.blob_path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def prune(self, grace_seconds: float = PRUNE_GRACE_SECONDS) -> int:
+        """
+        Delete blobs no session links to any more.
+
+        Blobs handed out as copies (no hardlink support) always look
+        unreferenced, so they only live for the grace period.
+
+        Returns:
+            Number of blobs deleted
+        """
+        removed = 0
+        cutoff = time.time() - grace_seconds
+        with self._lock:
+            for blob in self.root.glob('??/*'):
+                try:
+                    info = os.stat(blob)
+                    if info.st_nlink <= 1 and info.st_mtime < cutoff:
+                        os.remove(blob)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
@@ -0,0 +1,106 @@
+"""
+Upload Stream - Read multipart/form-data uploads one part at a time
+
+Werkzeug's request.files only becomes available after the whole body has been
+received and spooled. StreamedUploadForm parses request.stream incrementally
+instead, so each file can be written to disk and handed to a job while later
+files are still uploading.
+"""
+from typing import Iterator, Tuple
+
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import BadRequest
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+
+# Bytes read from the request body (and written to disk) at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Largest non-file field kept in memory
+MAX_FIELD_SIZE = 500 * 1024
+
+# (field name, filename, iterator over the file's bytes)
+Upload = Tuple[str, str, Iterator[bytes]]
+
+
+class StreamedUploadForm:
+    """
+    Incremental multipart/form-data parser.
+
+    files() yields each file part as soon as its headers arrive; its chunk
+    iterator reads the body only as far as that part goes. Plain fields are
+    collected in `form` as they are parsed, so fields sent before a file part
+    are available when it is yielded. A chunk iterator that is not read to the
+    end is drained when the next part is requested.
+    """
+
+    def __init__(self, stream, boundary: bytes, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.form = MultiDict()
+        self._decoder = MultipartDecoder(boundary, max_form_memory_size=MAX_FIELD_SIZE)
+
+    @classmethod
+    def from_request(cls, request, chunk_size: int = UPLOAD_CHUNK_SIZE) -> 'StreamedUploadForm':
+        """Parser over a Flask/Werkzeug request's unread body"""
+        mimetype, options = parse_options_header(request.content_type)
+        if mimetype != 'multipart/form-data' or 'boundary' not in options:
+            raise BadRequest('Expected a multipart/form-data upload')
+        return cls(request.stream, options['boundary'].encode('latin-1'), chunk_size)
+
+    def _events(self):
+        while True:
+            data = self.stream.read(self.chunk_size)
+            self._decoder.receive_data(data or None)
+            while True:
+                event = self._decoder.next_event()
+                if isinstance(event, NeedData):
+                    break
+                if isinstance(event, Epilogue):
+                    return
+                yield event
+            if not data:
+                return
+
+    def _part_data(self, events) -> Iterator[bytes]:
+        for event in events:
+            if not isinstance(event, Data):
+                break
+            if event.data:
+                yield event.data
+            if not event.more_data:
+                break
+
+    def files(self) -> Iterator[Upload]:
+        """Yield (field name, filename, chunks) for each file part, in upload order"""
+        events = self._events()
+        for event in events:
+            if isinstance(event, Field):
+                value = b''.join(self._part_data(events))
+                self.form.add(event.name, value.decode('utf-8', 'replace'))
+            elif isinstance(event, File):
+                chunks = self._part_data(events)
+                yield event.name, event.filename, chunks
+                for _ in chunks:
+                    pass
+
+
+class BufferedUploadForm:
+    """The StreamedUploadForm interface over a request Werkzeug has already parsed"""
+
+    def __init__(self, request, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.form = request.form
+        self._files = request.files
+        self.chunk_size = chunk_size
+
+    def files(self) -> Iterator[Upload]:
+        for name, file in self._files.items(multi=True):
+            yield name, file.filename, iter(lambda file=file: file.stream.read(self.chunk_size), b'')
+
+
+def iter_uploads(upload_form, field_name: str) -> Iterator[Tuple[str, Iterator[bytes]]]:
+    """Yield (filename, chunks) for the non-empty files uploaded under field_name"""
+    for name, filename, chunks in upload_form.files():
+        if name == field_name and filename:
+            yield filename, chunks
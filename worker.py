@@ -0,0 +1,69 @@
+"""
+PDF Editor - Standalone job worker
+
+Claims queued extraction/validation jobs from the shared task store and runs
+them. Start the web app with EXTERNAL_WORKERS=1 and run as many of these as
+you want (from the same working directory, or with the same TASK_DB_PATH):
+
+    python worker.py
+"""
+import argparse
+import os
+import socket
+import time
+
+from jobs import MAINTENANCE_INTERVAL, maintain_store, run_job
+from task_store import DEFAULT_DB_PATH, TaskStore
+
+
+def work(store: TaskStore, worker_id: str, poll_interval: float = 0.5, once: bool = False) -> int:
+    """
+    Run queued jobs until interrupted.
+
+    Args:
+        store: Task store to claim jobs from
+        worker_id: Name recorded on claimed jobs
+        poll_interval: Seconds to wait when the queue is empty
+        once: Return as soon as the queue is empty instead of waiting
+
+    Returns:
+        Number of jobs run
+    """
+    jobs_run = 0
+    last_maintenance = None
+    while True:
+        if last_maintenance is None or time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+            last_maintenance = time.monotonic()
+            maintain_store(store)
+
+        job = store.claim_job(worker_id)
+        if job is None:
+            if once:
+                return jobs_run
+            time.sleep(poll_interval)
+            continue
+
+        task_id, kind, payload = job
+        print(f"[{worker_id}] {kind} {task_id}")
+        run_job(store, task_id, kind, payload)
+        jobs_run += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run PDF Editor background jobs")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Task store database path')
+    parser.add_argument('--poll', type=float, default=0.5, help='Seconds between polls of an empty queue')
+    parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+    args = parser.parse_args()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    store = TaskStore(args.db)
+    print(f"Worker {worker_id} using {args.db}")
+    try:
+        work(store, worker_id, args.poll, args.once)
+    except KeyboardInterrupt:
+        print("Worker stopped")
+
+
+if __name__ == '__main__':
+    main()